@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.routes import ingestion, analysis, chat, negotiations
+from app.api.routes import ingestion, analysis, chat, negotiations, jobs
 
 # Create main API router
 api_router = APIRouter()
@@ -9,3 +9,4 @@ api_router.include_router(ingestion.router)
 api_router.include_router(analysis.router)
 api_router.include_router(chat.router)
 api_router.include_router(negotiations.router)
+api_router.include_router(jobs.router)
@@ -1,10 +1,13 @@
+import json
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Optional
-from firebase_admin import firestore
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator
 
 from app.schemas.analysis import AnalyzeRequest, AnalysisResponse
 from app.services.analysis_service import AnalysisService
-from app.core.dependencies import get_database, get_google_api_key
+from app.services.document_store import DocumentStore
+from app.core.dependencies import get_analysis_service, get_document_store
+from app.core.exceptions import AnalysisException
 from app.core.logging import logger
 
 router = APIRouter(prefix="/analyze", tags=["analysis"])
@@ -13,8 +16,8 @@ router = APIRouter(prefix="/analyze", tags=["analysis"])
 @router.post("/", response_model=AnalysisResponse)
 async def analyze_document(
     request: AnalyzeRequest,
-    db: Optional[firestore.Client] = Depends(get_database),
-    api_key: Optional[str] = Depends(get_google_api_key)
+    service: AnalysisService = Depends(get_analysis_service),
+    store: DocumentStore = Depends(get_document_store)
 ) -> AnalysisResponse:
     """
     Analyze contract text and return structured analysis with danger scores and clause breakdown.
@@ -24,17 +27,17 @@ async def analyze_document(
     but no user-specific data is stored.
     
     Args:
-        request: Contains text and jurisdiction
-        db: Firestore database client (optional, for caching)
-        api_key: Google API key for Gemini
+        request: Contains the text (or the document_id of an ingested document) and jurisdiction
+        service: Shared analysis service (holds the model clients and caches)
+        store: Store of ingested documents
     
     Returns:
         AnalysisResponse with document summary, danger score, and clause analysis
     """
+    text = await store.resolve(request.text, request.document_id)
     try:
-        service = AnalysisService(api_key=api_key, db=db)
         result = await service.analyze_contract_text(
-            text=request.text,
+            text=text,
             jurisdiction=request.jurisdiction
         )
         
@@ -59,3 +62,47 @@ async def analyze_document(
             status_code=500,
             detail=f"Analysis failed: {str(e)}"
         )
+
+
+@router.post("/stream")
+async def analyze_document_stream(
+    request: AnalyzeRequest,
+    service: AnalysisService = Depends(get_analysis_service),
+    store: DocumentStore = Depends(get_document_store)
+) -> StreamingResponse:
+    """
+    Analyze contract text and stream clauses as soon as they are identified.
+    
+    The response is newline-delimited JSON (application/x-ndjson). Each line is
+    an event object:
+    - {"event": "clause", "data": ClauseAnalysis} for every clause, as soon as
+      it is complete
+    - {"event": "complete", "data": {...}} last, with the full analysis_result
+      (document_summary, overall_danger_score, clauses) plus
+      time_to_first_clause_ms and total_ms
+    - {"event": "error", "data": {"detail": ...}} if the analysis aborts
+    
+    Args:
+        request: Contains the text (or the document_id of an ingested document) and jurisdiction
+        service: Shared analysis service (holds the model clients and caches)
+        store: Store of ingested documents
+    
+    Returns:
+        StreamingResponse of NDJSON events
+    """
+    text = await store.resolve(request.text, request.document_id)
+    if not text.strip():
+        raise AnalysisException("Contract text cannot be empty")
+    
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event in service.stream_contract_analysis(
+                text=text,
+                jurisdiction=request.jurisdiction
+            ):
+                yield json.dumps(event, default=str) + "\n"
+        except Exception as e:
+            logger.error(f"Streaming analysis error: {e}", exc_info=True)
+            yield json.dumps({"event": "error", "data": {"detail": f"Analysis failed: {str(e)}"}}) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
@@ -1,77 +1,430 @@
-from fastapi import APIRouter, HTTPException, Depends
-import google.generativeai as genai
-from typing import List, Dict, Any, Optional
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable, AsyncIterator
 
-from app.schemas.chat import ChatRequest, ChatResponse
+from app.api.sse import SSE_HEADERS, SSE_MEDIA_TYPE, text_events
+
+from app.schemas.chat import (
+    ChatRequest,
+    ChatResponse,
+    ChatSessionAnswer,
+    ChatSessionCreate,
+    ChatSessionMessage,
+    ChatSessionResponse,
+)
 from app.core.config import settings
-from app.core.dependencies import get_google_api_key
+from app.core.container import ServiceContainer
+from app.core.dependencies import get_container, get_google_api_key
+from app.core.exceptions import DocumentNotFoundException, LLMUnavailableException
 from app.core.logging import logger
+from app.core.metrics import metrics
+from app.services.model_router import model_router
+from app.services.answer_cache import answer_cache
+from app.services.chat_session import ChatSessionStore, document_hash
+from app.services.llm_client import LLMClient
+from app.services.retrieval import retrieve
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 # Chat System Prompt
 PROMPT_CONTEXT = """
 You are T&C Guardian's "Ask the Contract" AI. 
-Your job is to answer the user's questions strictly based on the provided Contract Text.
-If the answer is not in the text, say "I cannot find that information in this document."
+Your job is to answer the user's questions strictly based on the provided Contract Passages.
+If the answer is not in the passages, say "I cannot find that information in this document."
+When you rely on a passage, cite it as [Passage N].
 Be helpful, concise, and legal-savvy but easy to understand.
 """
 
 
-@router.post("/", response_model=ChatResponse)
-async def chat_with_contract(
-    request: ChatRequest,
-    api_key: Optional[str] = Depends(get_google_api_key)
-) -> ChatResponse:
-    """
-    Chat with the contract using RAG (Retrieval Augmented Generation).
-    
-    Args:
-        request: Contains conversation history, current question, and document context
-        api_key: Google API key for Gemini
-    
-    Returns:
-        ChatResponse with the AI's answer
-    """
+def _require_api_key(api_key: Optional[str]) -> None:
     if not api_key:
         raise HTTPException(
             status_code=500,
             detail="Google API key is not configured. Chat feature unavailable."
         )
+
+
+def _format_history(history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep only well-formed messages with a role and content."""
+    history_formatted = []
+    for msg in history:
+        role = msg.get("role")
+        parts = msg.get("parts", [])
+        if role and parts:
+            history_formatted.append({
+                "role": role,
+                "parts": parts
+            })
+    return history_formatted
+
+
+async def _prepare(
+    container: ServiceContainer,
+    question: str,
+    document_context: str,
+    history: List[Dict[str, Any]],
+    summary: str = ""
+) -> Tuple[LLMClient, List[Dict[str, Any]], str, List[Dict[str, Any]]]:
+    """
+    Retrieve the passages relevant to a question and build the model call.
+    
+    Returns:
+        (model client, formatted history, message, citations)
+    """
+    # Index building is CPU-bound on the first turn; keep it off the event loop
+    citations = await asyncio.to_thread(
+        retrieve,
+        document_context,
+        question,
+        settings.chat_retrieval_top_k
+    )
+    context = "\n\n".join(
+        f"[Passage {citation['passage']}]\n{citation['text']}" for citation in citations
+    )
+    metrics.increment("chat.retrieval.chars_total", len(document_context))
+    metrics.increment("chat.retrieval.chars_sent", len(context))
+    
+    llm = container.get_llm(model_router.route_chat(question))
+    
+    # Construct full message with the retrieved passages
+    full_message = (
+        f"Contract Passages:\n{context}\n\n"
+        f"User Question: {question}"
+    )
+    if summary:
+        full_message = f"Earlier conversation (summary):\n{summary}\n\n{full_message}"
     
+    # System prompt goes on top of the message, after the history
+    return llm, _format_history(history), f"{PROMPT_CONTEXT}\n\n{full_message}", citations
+
+
+async def _answer_cache_hash(
+    document_context: str,
+    history: List[Dict[str, Any]],
+    summary: str,
+    doc_hash: Optional[str]
+) -> Optional[str]:
+    """Document hash to cache the answer under, or None for follow-up questions."""
+    if not settings.chat_answer_cache_enabled or history or summary:
+        return None
+    return doc_hash or await asyncio.to_thread(document_hash, document_context)
+
+
+async def _answer(
+    container: ServiceContainer,
+    question: str,
+    document_context: str,
+    history: List[Dict[str, Any]],
+    summary: str = "",
+    doc_hash: Optional[str] = None
+) -> ChatResponse:
+    """Answer a question from the retrieved passages in one model call."""
     try:
-        # Configure Gemini
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel(settings.gemini_model_chat)
-        
-        # Format conversation history
-        history_formatted = []
-        for msg in request.history:
-            role = msg.get("role")
-            parts = msg.get("parts", [])
-            if role and parts:
-                history_formatted.append({
-                    "role": role,
-                    "parts": parts
-                })
+        cache_hash = await _answer_cache_hash(document_context, history, summary, doc_hash)
+        if cache_hash:
+            cached = answer_cache.get(cache_hash, question)
+            if cached:
+                return ChatResponse(**cached, cached=True)
         
-        # Construct full message with context
-        full_message = (
-            f"Contract Context:\n{request.document_context}\n\n"
-            f"User Question: {request.current_question}"
+        llm, history_formatted, message, citations = await _prepare(
+            container, question, document_context, history, summary
         )
-        
-        # Start chat session with history
-        chat = model.start_chat(history=history_formatted)
-        
-        # Send message with system prompt
-        response = chat.send_message(f"{PROMPT_CONTEXT}\n\n{full_message}")
-        
-        return ChatResponse(answer=response.text)
+        answer = await llm.chat(history=history_formatted, message=message)
+        if cache_hash:
+            answer_cache.set(cache_hash, question, answer, citations)
+        return ChatResponse(answer=answer, citations=citations)
     
+    except LLMUnavailableException:
+        raise
     except Exception as e:
         logger.error(f"Chat error: {e}", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Chat failed: {str(e)}"
         )
+
+
+async def _replay(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+async def _stream_answer(
+    http_request: Request,
+    container: ServiceContainer,
+    question: str,
+    document_context: str,
+    history: List[Dict[str, Any]],
+    summary: str = "",
+    doc_hash: Optional[str] = None,
+    start: Optional[Dict[str, Any]] = None,
+    on_complete: Optional[Callable[[str], Awaitable[Optional[Dict[str, Any]]]]] = None
+) -> StreamingResponse:
+    """Like _answer(), but stream the answer as SSE (see app.api.sse)."""
+    try:
+        cache_hash = await _answer_cache_hash(document_context, history, summary, doc_hash)
+        cached = answer_cache.get(cache_hash, question) if cache_hash else None
+        if not cached:
+            llm, history_formatted, message, citations = await _prepare(
+                container, question, document_context, history, summary
+            )
+    except Exception as e:
+        logger.error(f"Chat error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Chat failed: {str(e)}"
+        )
+    
+    if cached:
+        # Replay the cached answer as a single token event
+        chunks = _replay(cached["answer"])
+        start = {**(start or {}), "citations": cached["citations"], "cached": True}
+        complete = on_complete
+    else:
+        chunks = llm.stream_chat(history=history_formatted, message=message)
+        start = {**(start or {}), "citations": citations}
+        
+        async def complete(answer: str) -> Optional[Dict[str, Any]]:
+            if cache_hash:
+                answer_cache.set(cache_hash, question, answer, citations)
+            return await on_complete(answer) if on_complete else None
+    
+    events = text_events(
+        http_request,
+        chunks,
+        name="chat.stream",
+        start=start,
+        on_complete=complete
+    )
+    return StreamingResponse(events, media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+
+def _session_response(session: Dict[str, Any]) -> ChatSessionResponse:
+    return ChatSessionResponse(
+        session_id=session["id"],
+        document_hash=session["document_hash"],
+        turns=session["turns"],
+        summary=session["summary"],
+        history=session["history"]
+    )
+
+
+async def _load_session(store: ChatSessionStore, session_id: str) -> Dict[str, Any]:
+    session = await store.get(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail=f"Chat session {session_id} not found or expired")
+    return session
+
+
+async def _load_document(container: ServiceContainer, session: Dict[str, Any]) -> str:
+    document_context = await container.chat_sessions.get_document(session["document_hash"])
+    if document_context is None:
+        raise HTTPException(
+            status_code=404,
+            detail="The contract for this session is no longer available. Start a new session."
+        )
+    return document_context
+
+
+@router.post("/", response_model=ChatResponse)
+async def chat_with_contract(
+    request: ChatRequest,
+    api_key: Optional[str] = Depends(get_google_api_key),
+    container: ServiceContainer = Depends(get_container)
+) -> ChatResponse:
+    """
+    Chat with the contract using RAG (Retrieval Augmented Generation).
+    
+    The contract is indexed locally (BM25, cached by document hash) and only
+    the passages most relevant to the question are sent to the model. Those
+    passages are returned as citations.
+    
+    First-turn questions (no history) are answered from the answer cache
+    when the same or a near-identical question was already asked about the
+    same contract.
+    
+    Stateless: the client sends the history and the contract (or the
+    document_id of an ingested contract) on every turn. Prefer the
+    `/chat/sessions` endpoints for multi-turn conversations.
+    
+    Args:
+        request: Contains conversation history, current question, and the document context or document_id
+        api_key: Google API key for Gemini
+        container: Worker service container (shared model clients)
+    
+    Returns:
+        ChatResponse with the AI's answer and the cited passages
+    """
+    _require_api_key(api_key)
+    document_context = await container.document_store.resolve(request.document_context, request.document_id)
+    return await _answer(
+        container,
+        request.current_question,
+        document_context,
+        request.history,
+        doc_hash=request.document_id
+    )
+
+
+@router.post("/stream")
+async def chat_with_contract_stream(
+    request: ChatRequest,
+    http_request: Request,
+    api_key: Optional[str] = Depends(get_google_api_key),
+    container: ServiceContainer = Depends(get_container)
+) -> StreamingResponse:
+    """
+    Like `POST /chat`, but stream the answer as Server-Sent Events.
+    
+    The start event carries the cited passages, token events carry the
+    answer as it is generated and the done event carries the full answer.
+    Generation stops when the client disconnects.
+    
+    Args:
+        request: Contains conversation history, current question, and the document context or document_id
+        http_request: The raw request, watched for client disconnects
+        api_key: Google API key for Gemini
+        container: Worker service container (shared model clients)
+    
+    Returns:
+        StreamingResponse of SSE events
+    """
+    _require_api_key(api_key)
+    document_context = await container.document_store.resolve(request.document_context, request.document_id)
+    return await _stream_answer(
+        http_request,
+        container,
+        request.current_question,
+        document_context,
+        request.history,
+        doc_hash=request.document_id
+    )
+
+
+@router.post("/sessions", response_model=ChatSessionResponse, status_code=201)
+async def create_chat_session(
+    request: ChatSessionCreate,
+    container: ServiceContainer = Depends(get_container)
+) -> ChatSessionResponse:
+    """
+    Start a server-side chat session for a contract.
+    
+    The contract is stored once under its SHA-256 hash; later sessions on the
+    same contract can pass `document_hash` instead of uploading it again,
+    and a contract ingested through /ingest can be referenced by its
+    `document_id`.
+    
+    Args:
+        request: The contract text, the hash of an already uploaded contract or an ingested document_id
+        container: Worker service container (session store)
+    
+    Returns:
+        ChatSessionResponse with the session ID and document hash
+    """
+    # Ingested documents are already in the document store: bind to the id, no copy
+    session = await container.chat_sessions.create(
+        document_text=request.document_context,
+        doc_hash=request.document_id or request.document_hash
+    )
+    if session is None and request.document_id:
+        raise DocumentNotFoundException(request.document_id)
+    if session is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Unknown document hash. Start the session with document_context instead."
+        )
+    return _session_response(session)
+
+
+@router.get("/sessions/{session_id}", response_model=ChatSessionResponse)
+async def get_chat_session(
+    session_id: str,
+    container: ServiceContainer = Depends(get_container)
+) -> ChatSessionResponse:
+    """Get a chat session's summary and recent history."""
+    return _session_response(await _load_session(container.chat_sessions, session_id))
+
+
+@router.post("/sessions/{session_id}/messages", response_model=ChatSessionAnswer)
+async def send_chat_message(
+    session_id: str,
+    request: ChatSessionMessage,
+    api_key: Optional[str] = Depends(get_google_api_key),
+    container: ServiceContainer = Depends(get_container)
+) -> ChatSessionAnswer:
+    """
+    Ask a question in a chat session.
+    
+    History and the contract are kept server-side, so only the question is
+    sent. Older turns are folded into a summary to keep the prompt bounded.
+    
+    Args:
+        session_id: ID returned by `POST /chat/sessions`
+        request: The question
+        api_key: Google API key for Gemini
+        container: Worker service container (session store, model clients)
+    
+    Returns:
+        ChatSessionAnswer with the answer, cited passages and session ID
+    """
+    _require_api_key(api_key)
+    store = container.chat_sessions
+    session = await _load_session(store, session_id)
+    document_context = await _load_document(container, session)
+    
+    response = await _answer(
+        container,
+        request.question,
+        document_context,
+        session["history"],
+        summary=session["summary"],
+        doc_hash=session["document_hash"]
+    )
+    await store.record_turn(session, request.question, response.answer)
+    return ChatSessionAnswer(session_id=session_id, **response.model_dump())
+
+
+@router.post("/sessions/{session_id}/messages/stream")
+async def send_chat_message_stream(
+    session_id: str,
+    request: ChatSessionMessage,
+    http_request: Request,
+    api_key: Optional[str] = Depends(get_google_api_key),
+    container: ServiceContainer = Depends(get_container)
+) -> StreamingResponse:
+    """
+    Like `POST /chat/sessions/{session_id}/messages`, but stream the answer
+    as Server-Sent Events.
+    
+    The turn is saved to the session only once the answer is complete, just
+    before the done event; abandoned answers are not recorded.
+    
+    Args:
+        session_id: ID returned by `POST /chat/sessions`
+        request: The question
+        http_request: The raw request, watched for client disconnects
+        api_key: Google API key for Gemini
+        container: Worker service container (session store, model clients)
+    
+    Returns:
+        StreamingResponse of SSE events
+    """
+    _require_api_key(api_key)
+    store = container.chat_sessions
+    session = await _load_session(store, session_id)
+    document_context = await _load_document(container, session)
+    
+    async def save_turn(answer: str) -> None:
+        await store.record_turn(session, request.question, answer)
+    
+    return await _stream_answer(
+        http_request,
+        container,
+        request.question,
+        document_context,
+        session["history"],
+        summary=session["summary"],
+        doc_hash=session["document_hash"],
+        start={"session_id": session_id},
+        on_complete=save_turn
+    )
@@ -1,58 +1,132 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import Dict
+from app.core.dependencies import get_document_store
+from app.core.exceptions import IngestionException
+from app.services.document_store import DocumentStore
 from app.services.ingestion_service import IngestionService
+from app.services.upload import receive_upload
 from app.core.logging import logger
 
 router = APIRouter(prefix="/ingest", tags=["ingestion"])
 
 
-@router.post("/file")
-async def ingest_file(file: UploadFile = File(...)) -> Dict:
+# The body is parsed by receive_upload(), so document the form field by hand
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+
+async def _stored_document(store: DocumentStore, text: str, include_text: bool) -> Dict:
+    """Store extracted text and describe it by its document_id and a preview."""
+    response = {
+        "status": "success",
+        "document_id": await store.put(text),
+        "text_length": len(text),
+        "preview": text[:200] if len(text) > 200 else text,
+    }
+    if include_text:
+        response["text"] = text
+    return response
+
+
+@router.post("/file", openapi_extra=UPLOAD_REQUEST_BODY)
+async def ingest_file(
+    request: Request,
+    include_text: bool = False,
+    store: DocumentStore = Depends(get_document_store)
+) -> Dict:
     """
     Extract text from uploaded file (PDF or DOCX).
     
+    The upload is streamed to a temp file while it is received; oversized
+    files are rejected with 413 as soon as the limit is crossed, and PDFs
+    over the page limit before any text is extracted.
+    
+    The text is kept in the document store; /analyze and /chat take the
+    returned document_id instead of the text.
+    
+    Args:
+        include_text: Also return the full text
+    
     Returns:
-        Dictionary with status, text_length, preview, and full text
+        Dictionary with status, document_id, text_length, preview (and the
+        full text when include_text is set)
     """
+    upload = None
     try:
+        upload = await receive_upload(request)
         service = IngestionService()
-        text = await service.extract_text_from_file(file)
-        
-        return {
-            "status": "success",
-            "text_length": len(text),
-            "preview": text[:200] if len(text) > 200 else text,
-            "text": text
-        }
+        text = await service.extract_text_from_file(upload.filename, upload.path)
+        return await _stored_document(store, text, include_text)
+    except IngestionException:
+        raise
     except Exception as e:
         logger.error(f"File ingestion error: {e}", exc_info=True)
         raise HTTPException(
             status_code=400,
             detail=f"Failed to process file: {str(e)}"
         )
+    finally:
+        if upload:
+            upload.cleanup()
 
 
 @router.post("/url")
-async def ingest_url(url: str) -> Dict:
+async def ingest_url(
+    url: str,
+    crawl: bool = False,
+    include_text: bool = False,
+    store: DocumentStore = Depends(get_document_store)
+) -> Dict:
     """
     Extract text from URL by web scraping.
     
+    Pages over the size limit are rejected with 413; re-fetching an unchanged
+    page is a conditional GET that reuses the previously extracted text.
+    
+    With crawl=true the legal documents linked from the page (terms,
+    privacy, cookies, refund, acceptable use) are fetched concurrently and
+    combined into one text with a section per document.
+    
+    The text is kept in the document store; /analyze and /chat take the
+    returned document_id instead of the text.
+    
     Args:
         url: The URL to scrape
+        crawl: Follow the page's legal-document links
+        include_text: Also return the full text
     
     Returns:
-        Dictionary with status, text_length, preview, and full text
+        Dictionary with status, document_id, text_length, preview (plus the
+        full text when include_text is set and the crawled documents when
+        crawl is set)
     """
     try:
         service = IngestionService()
-        text = service.extract_text_from_url(url)
+        documents = None
+        if crawl:
+            result = await service.extract_policies_from_url(url)
+            text, documents = result["text"], result["documents"]
+        else:
+            text = await service.extract_text_from_url(url)
         
-        return {
-            "status": "success",
-            "text_length": len(text),
-            "preview": text[:200] if len(text) > 200 else text,
-            "text": text
-        }
+        response = await _stored_document(store, text, include_text)
+        if documents is not None:
+            response["documents"] = documents
+        return response
+    except IngestionException:
+        raise
     except Exception as e:
         logger.error(f"URL ingestion error: {e}", exc_info=True)
         raise HTTPException(
@@ -0,0 +1,131 @@
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict
+
+from app.core.config import settings
+from app.core.dependencies import get_job_service
+from app.core.logging import logger
+from app.schemas.jobs import JobCreateRequest, JobDocumentStatus, JobStatusResponse
+from app.services.job_service import FINISHED_STATES, JobService, summarize_job
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# Seconds between progress checks when streaming job status
+STREAM_POLL_INTERVAL = 0.5
+
+
+def _to_response(job: Dict, include_results: bool) -> JobStatusResponse:
+    """Convert a stored job into the API response model."""
+    summary = summarize_job(job)
+    return JobStatusResponse(
+        job_id=job["id"],
+        status=summary["status"],
+        created_at=job["created_at"],
+        total=summary["total"],
+        counts=summary["counts"],
+        documents=[
+            JobDocumentStatus(
+                index=doc["index"],
+                status=doc["status"],
+                source=doc["source"].get("url") or "text",
+                error=doc.get("error"),
+                result=doc.get("result") if include_results else None
+            )
+            for doc in job["documents"]
+        ]
+    )
+
+
+@router.post("/", response_model=JobStatusResponse, status_code=202)
+async def create_job(
+    request: JobCreateRequest,
+    service: JobService = Depends(get_job_service)
+) -> JobStatusResponse:
+    """
+    Submit a batch of contracts (texts or URLs) for background analysis.
+    
+    Documents are analyzed by a bounded worker pool; poll `GET /jobs/{job_id}`
+    or stream `GET /jobs/{job_id}/stream` for progress and results.
+    
+    Args:
+        request: Documents to analyze and the default jurisdiction
+    
+    Returns:
+        JobStatusResponse with the job ID and initial (pending) status
+    """
+    if len(request.documents) > settings.jobs_max_documents:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many documents: {len(request.documents)}. Max allowed is {settings.jobs_max_documents}."
+        )
+    
+    try:
+        job = await service.submit(
+            documents=[doc.model_dump() for doc in request.documents],
+            jurisdiction=request.jurisdiction
+        )
+        return _to_response(job, include_results=False)
+    except Exception as e:
+        logger.error(f"Job submission error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to submit job: {str(e)}"
+        )
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job(
+    job_id: str,
+    include_results: bool = Query(True, description="Include analysis results of finished documents"),
+    service: JobService = Depends(get_job_service)
+) -> JobStatusResponse:
+    """
+    Get the status of a batch job and the results of finished documents.
+    
+    Args:
+        job_id: ID returned when the job was submitted
+        include_results: Whether to include analysis results
+    
+    Returns:
+        JobStatusResponse with overall and per-document status
+    """
+    job = await service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _to_response(job, include_results=include_results)
+
+
+@router.get("/{job_id}/stream")
+async def stream_job(
+    job_id: str,
+    service: JobService = Depends(get_job_service)
+) -> StreamingResponse:
+    """
+    Stream per-document progress of a batch job as newline-delimited JSON.
+    
+    Emits {"event": "document", "data": JobDocumentStatus} whenever a document
+    changes state (with its result once completed), then
+    {"event": "complete", "data": {...}} with the final counts.
+    """
+    job = await service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    async def events() -> AsyncIterator[str]:
+        seen: Dict[int, str] = {}
+        current = job
+        while True:
+            for doc in _to_response(current, include_results=True).documents:
+                if seen.get(doc.index) != doc.status:
+                    seen[doc.index] = doc.status
+                    yield json.dumps({"event": "document", "data": doc.model_dump()}) + "\n"
+            summary = summarize_job(current)
+            if all(status in FINISHED_STATES for status in seen.values()):
+                yield json.dumps({"event": "complete", "data": summary}) + "\n"
+                return
+            await asyncio.sleep(STREAM_POLL_INTERVAL)
+            current = await service.get_job(job_id)
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Union
 from firebase_admin import firestore
 
-from app.core.dependencies import get_database, get_google_api_key
+from app.api.sse import SSE_HEADERS, SSE_MEDIA_TYPE, text_events
+from app.core.dependencies import get_database, get_negotiation_service
 from app.core.logging import logger
 from app.schemas.analysis import ClauseAnalysis
 from app.services.negotiation_service import NegotiationService
@@ -65,7 +68,7 @@ class EmailRequest(BaseModel):
 @router.post("/create")
 async def create_negotiation(
     data: dict,
-    db: Optional[firestore.Client] = Depends(get_database)
+    service: NegotiationService = Depends(get_negotiation_service)
 ) -> Dict:
     """
     Create a new negotiation/dispute for a contested clause.
@@ -77,7 +80,6 @@ async def create_negotiation(
     Returns:
         Dictionary with negotiation details including ID and status
     """
-    service = NegotiationService(db=db)
     
     # Determine which format we're receiving by checking for 'clause' key
     # If 'clause' exists and is an object, use new format; otherwise use legacy
@@ -182,31 +184,10 @@ async def list_negotiations(
         )
 
 
-@router.post("/{negotiation_id}/generate-email")
-async def generate_email(
-    negotiation_id: str,
-    request: EmailRequest,
-    db: Optional[firestore.Client] = Depends(get_database),
-    api_key: Optional[str] = Depends(get_google_api_key)
-) -> Dict:
-    """
-    Generate an opt-out/contest email for a negotiation using full clause context.
-    
-    Args:
-        negotiation_id: ID of the negotiation
-        request: Contains tone preference
-        db: Firestore database client
-        api_key: Google API key for Gemini
-    
-    Returns:
-        Dictionary with negotiation_id and generated email_content
-    """
-    service = NegotiationService(api_key=api_key, db=db)
-    
-    # Handle mock negotiations (when DB is unavailable)
+def _load_negotiation(negotiation_id: str, service: NegotiationService) -> Dict:
+    """Fetch a negotiation, or the built-in demo one (used when the DB is unavailable)."""
     if negotiation_id == "mock-1":
         # Create mock negotiation data for demonstration
-        from app.schemas.analysis import ClauseAnalysis
         mock_clause = ClauseAnalysis(
             id="mock-clause-1",
             clause_text="Binding Arbitration: You agree to arbitrate all disputes and waive class action rights.",
@@ -217,7 +198,7 @@ async def generate_email(
             actionable_step="Request to opt-out of arbitration clause within 30 days.",
             flags=["Red Flag", "Limits Legal Rights"]
         )
-        negotiation_data = {
+        return {
             "id": "mock-1",
             "user_id": "user_123",
             "company_name": "Netflix",
@@ -232,50 +213,77 @@ async def generate_email(
             "clause_flags": mock_clause.flags,
             "status": "draft_created"
         }
+    
+    # Fetch negotiation data from database
+    negotiation_data = service.get_negotiation(negotiation_id)
+    if not negotiation_data:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Negotiation {negotiation_id} not found"
+        )
+    return negotiation_data
+
+
+def _negotiation_clause(negotiation_id: str, negotiation_data: Dict) -> ClauseAnalysis:
+    """Reconstruct the contested ClauseAnalysis from stored negotiation data."""
+    return ClauseAnalysis(
+        id=negotiation_data.get("clause_contested", negotiation_id),
+        clause_text=negotiation_data.get("clause_text", ""),
+        category=negotiation_data.get("clause_category", "Unknown"),
+        simplified_explanation=negotiation_data.get("clause_simplified_explanation", ""),
+        severity_score=negotiation_data.get("clause_severity_score", 5),
+        legal_context=negotiation_data.get("clause_legal_context", ""),
+        actionable_step=negotiation_data.get("clause_actionable_step", ""),
+        flags=negotiation_data.get("clause_flags", [])
+    )
+
+
+def _save_email(negotiation_id: str, email_content: str, service: NegotiationService) -> None:
+    # Save draft to database (skip for mock negotiations)
+    if negotiation_id != "mock-1":
+        service.update_negotiation_email(negotiation_id, email_content)
     else:
-        # Fetch negotiation data from database
-        negotiation_data = service.get_negotiation(negotiation_id)
-        if not negotiation_data:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Negotiation {negotiation_id} not found"
-            )
+        logger.info("Skipping DB save for mock negotiation")
+
+
+@router.post("/{negotiation_id}/generate-email")
+async def generate_email(
+    negotiation_id: str,
+    request: EmailRequest,
+    service: NegotiationService = Depends(get_negotiation_service)
+) -> Dict:
+    """
+    Generate an opt-out/contest email for a negotiation using full clause context.
+    
+    Args:
+        negotiation_id: ID of the negotiation
+        request: Contains tone preference
+        service: Shared negotiation service
+    
+    Returns:
+        Dictionary with negotiation_id and generated email_content
+    """
+    negotiation_data = _load_negotiation(negotiation_id, service)
     
-    # Reconstruct ClauseAnalysis from stored data (if available)
-    # This allows us to use the enhanced email generation
     try:
-        from app.schemas.analysis import ClauseAnalysis
-        
-        clause = ClauseAnalysis(
-            id=negotiation_data.get("clause_contested", negotiation_id),
-            clause_text=negotiation_data.get("clause_text", ""),
-            category=negotiation_data.get("clause_category", "Unknown"),
-            simplified_explanation=negotiation_data.get("clause_simplified_explanation", ""),
-            severity_score=negotiation_data.get("clause_severity_score", 5),
-            legal_context=negotiation_data.get("clause_legal_context", ""),
-            actionable_step=negotiation_data.get("clause_actionable_step", ""),
-            flags=negotiation_data.get("clause_flags", [])
-        )
-        
+        clause = _negotiation_clause(negotiation_id, negotiation_data)
         company_name = negotiation_data.get("company_name", "The Company")
         
         # Generate email with full context
-        email_content = service.generate_email_content(
+        email_content = await service.generate_email_content(
             clause=clause,
             company_name=company_name,
             tone=request.tone
         )
         
-        # Save draft to database (skip for mock negotiations)
-        if negotiation_id != "mock-1":
-            service.update_negotiation_email(negotiation_id, email_content)
-        else:
-            logger.info("Skipping DB save for mock negotiation")
+        _save_email(negotiation_id, email_content, service)
         
         return {
             "negotiation_id": negotiation_id,
             "email_content": email_content
         }
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=500,
@@ -287,3 +295,53 @@ async def generate_email(
             status_code=500,
             detail=f"Failed to generate email: {str(e)}"
         )
+
+
+@router.post("/{negotiation_id}/generate-email/stream")
+async def generate_email_stream(
+    negotiation_id: str,
+    request: EmailRequest,
+    http_request: Request,
+    service: NegotiationService = Depends(get_negotiation_service)
+) -> StreamingResponse:
+    """
+    Like `generate-email`, but stream the draft as Server-Sent Events.
+    
+    Token events carry the draft as it is written. The draft is saved to the
+    negotiation once complete, and the done event carries the full text as
+    `text`. If the client disconnects, generation stops and nothing is saved.
+    
+    Args:
+        negotiation_id: ID of the negotiation
+        request: Contains tone preference
+        http_request: The raw request, watched for client disconnects
+        service: Shared negotiation service
+    
+    Returns:
+        StreamingResponse of SSE events
+    """
+    if not service.api_key:
+        raise HTTPException(
+            status_code=500,
+            detail="Google API key is required for email generation"
+        )
+    
+    negotiation_data = _load_negotiation(negotiation_id, service)
+    clause = _negotiation_clause(negotiation_id, negotiation_data)
+    
+    async def save(email_content: str) -> Dict:
+        await asyncio.to_thread(_save_email, negotiation_id, email_content, service)
+        return {"negotiation_id": negotiation_id}
+    
+    events = text_events(
+        http_request,
+        service.stream_email_content(
+            clause=clause,
+            company_name=negotiation_data.get("company_name", "The Company"),
+            tone=request.tone
+        ),
+        name="email.stream",
+        start={"negotiation_id": negotiation_id},
+        on_complete=save
+    )
+    return StreamingResponse(events, media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
@@ -0,0 +1,86 @@
+"""
+Server-Sent Events - Forward model output to the client as it is generated.
+
+Every stream is a sequence of `event: <name>` / `data: <json>` messages:
+- start: endpoint-specific metadata (e.g. citations), sent before any text
+- token: {"text": ...} for every chunk the model produces
+- done: {"text": <complete text>, ...} once the model finishes, after the
+  text has been persisted
+- error: {"detail": ..., "retry_after": ...} if generation fails
+
+If the client disconnects, the model stream is closed so the worker thread
+stops pulling tokens nobody will read, and nothing is persisted.
+"""
+import json
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException, Request
+
+from app.core.logging import logger
+from app.core.metrics import metrics
+
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Stop proxies (nginx) from buffering the stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_event(event: str, data: Dict[str, Any]) -> str:
+    """Encode one SSE message."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def text_events(
+    request: Request,
+    chunks: AsyncIterator[str],
+    name: str,
+    start: Optional[Dict[str, Any]] = None,
+    on_complete: Optional[Callable[[str], Awaitable[Optional[Dict[str, Any]]]]] = None
+) -> AsyncIterator[str]:
+    """
+    Turn a stream of model text chunks into SSE messages.
+
+    Args:
+        request: The incoming request, polled for client disconnects
+        chunks: Model output chunks
+        name: Metric prefix (e.g. "chat.stream")
+        start: Data for the start event, if any
+        on_complete: Called with the complete text before the done event;
+            may return extra fields for it
+
+    Yields:
+        Encoded SSE messages
+    """
+    parts = []
+    async with aclosing(chunks):
+        try:
+            if start is not None:
+                yield format_event("start", start)
+            async for text in chunks:
+                if await request.is_disconnected():
+                    # Leaving the block closes the model stream
+                    metrics.increment(f"{name}.cancelled")
+                    logger.info(f"Client disconnected; stopped {name} after {len(parts)} chunks")
+                    return
+                parts.append(text)
+                yield format_event("token", {"text": text})
+
+            full_text = "".join(parts)
+            final = {"text": full_text}
+            if on_complete:
+                final.update(await on_complete(full_text) or {})
+            metrics.increment(f"{name}.completed")
+            yield format_event("done", final)
+        except HTTPException as e:
+            metrics.increment(f"{name}.failed")
+            retry_after = (e.headers or {}).get("Retry-After")
+            yield format_event("error", {
+                "detail": e.detail,
+                "retry_after": int(retry_after) if retry_after else None
+            })
+        except Exception as e:
+            metrics.increment(f"{name}.failed")
+            logger.error(f"Streaming {name} error: {e}", exc_info=True)
+            yield format_event("error", {"detail": str(e), "retry_after": None})
@@ -0,0 +1,227 @@
+"""
+Admission Control - Concurrency limits and load shedding for LLM-backed endpoints.
+
+Each controlled endpoint (settings admission_limits, matched like the rate
+limit costs, see RouteRules) has a gate: at most `limit` of its requests run
+at once, and up to admission_queue_size more wait in a FIFO queue. A request
+is rejected straight away with 503 and a Retry-After when
+
+- the queue is full, or
+- its expected wait (queue position / limit * recent request latency) is
+  longer than admission_queue_timeout_seconds,
+
+and a queued request that is still waiting at its deadline is rejected too.
+When the model slows down, the excess requests fail fast instead of every
+request piling up, holding memory and timing out.
+
+With admission_adaptive set, the limit follows observed latency (a gradient
+limiter): while the short-term average latency stays within
+admission_latency_tolerance of the long-term average the limit grows back
+towards the configured value; when latency rises above it the limit shrinks,
+by at most half per update, down to one.
+"""
+import asyncio
+import math
+import re
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.rate_limit import RouteRules
+
+
+# Weight of the newest latency in the short- and long-term averages
+SHORT_SMOOTHING = 0.3
+LONG_SMOOTHING = 0.001
+# Weight of each new limit estimate in the limit
+LIMIT_SMOOTHING = 0.2
+
+
+class AdmissionGate:
+    """Concurrency limit and bounded wait queue for one endpoint (one event loop)."""
+
+    def __init__(
+        self,
+        name: str,
+        max_limit: int,
+        queue_size: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        adaptive: Optional[bool] = None,
+        tolerance: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            name: Endpoint name, used in metrics
+            max_limit: Concurrent requests (the ceiling of an adaptive limit)
+            queue_size: Requests allowed to wait for a slot
+            queue_timeout: Longest wait for a slot, in seconds
+            adaptive: Adjust the limit to observed latency
+            tolerance: Short-term / long-term latency ratio tolerated before the limit shrinks
+            clock: Monotonic time source (tests)
+        """
+        self.name = name
+        self.max_limit = max(1, max_limit)
+        self.queue_size = settings.admission_queue_size if queue_size is None else queue_size
+        self.queue_timeout = settings.admission_queue_timeout_seconds if queue_timeout is None else queue_timeout
+        self.adaptive = settings.admission_adaptive if adaptive is None else adaptive
+        self.tolerance = tolerance or settings.admission_latency_tolerance
+        self.clock = clock
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.short_latency: Optional[float] = None
+        self.long_latency: Optional[float] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _slots(self) -> int:
+        return max(1, int(self.limit))
+
+    def expected_wait(self, position: int) -> float:
+        """Estimated seconds until the request at a queue position gets a slot."""
+        return math.ceil(position / self._slots()) * (self.short_latency or 0.0)
+
+    def _reject(self, reason: str, position: int) -> float:
+        metrics.increment(f"admission.{self.name}.rejected")
+        metrics.increment(f"admission.{self.name}.rejected.{reason}")
+        return max(1.0, self.expected_wait(position))
+
+    async def acquire(self) -> Optional[float]:
+        """
+        Wait for a slot.
+
+        Returns:
+            None once the request holds a slot (call release() when it is
+            done), otherwise the seconds the client should wait before retrying
+        """
+        if self.in_flight < self._slots() and not self._waiters:
+            self.in_flight += 1
+            metrics.increment(f"admission.{self.name}.admitted")
+            return None
+        position = len(self._waiters) + 1
+        if position > self.queue_size:
+            return self._reject("queue_full", position)
+        if self.expected_wait(position) > self.queue_timeout:
+            return self._reject("deadline", position)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = self.clock()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            return self._reject("timeout", len(self._waiters) + 1)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the request was cancelled
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        metrics.increment(f"admission.{self.name}.admitted")
+        metrics.observe(f"admission.{self.name}.queue_wait_ms", (self.clock() - start) * 1000)
+        return None
+
+    def release(self, latency: Optional[float] = None) -> None:
+        """Give a slot back, recording how long the request held it."""
+        self.in_flight -= 1
+        if latency is not None:
+            self._observe(latency)
+        # Hand free slots to the oldest waiters that are still waiting
+        while self._waiters and self.in_flight < self._slots():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _observe(self, latency: float) -> None:
+        if self.short_latency is None:
+            self.short_latency = self.long_latency = latency
+            return
+        self.short_latency += SHORT_SMOOTHING * (latency - self.short_latency)
+        self.long_latency += LONG_SMOOTHING * (latency - self.long_latency)
+        if not self.adaptive or self.short_latency <= 0:
+            return
+        # 1.0 while latency is within tolerance of normal, lower as it rises (at most halving)
+        gradient = max(0.5, min(1.0, self.tolerance * self.long_latency / self.short_latency))
+        # Headroom so the limit can grow back (and probe) while latency is normal
+        estimate = self.limit * gradient + math.sqrt(self.limit)
+        self.limit = (1 - LIMIT_SMOOTHING) * self.limit + LIMIT_SMOOTHING * estimate
+        self.limit = min(float(self.max_limit), max(1.0, self.limit))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "latency_ms": round(self.short_latency * 1000, 1) if self.short_latency is not None else None,
+        }
+
+
+class AdmissionController:
+    """The gates of all controlled endpoints."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, **gate_options: Any):
+        """
+        Args:
+            limits: "[METHOD ]/path/prefix" -> concurrent requests (default: settings.admission_limits)
+            gate_options: Passed to every AdmissionGate
+        """
+        limits = settings.admission_limits if limits is None else limits
+        self.gates = {
+            route: AdmissionGate(re.sub(r"[^a-z0-9]+", "_", route.lower()).strip("_"), limit, **gate_options)
+            for route, limit in limits.items()
+        }
+        self.rules = RouteRules(self.gates)
+
+    def gate_for(self, method: str, path: str) -> Optional[AdmissionGate]:
+        """Gate controlling a request, or None if its endpoint is not controlled."""
+        return self.rules.match(method, path)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Limits, load and latency per endpoint for /metrics."""
+        return {route: gate.snapshot() for route, gate in self.gates.items()}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware holding a gate slot for the whole request, streamed responses included."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        gate = self.controller.gate_for(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+        retry_after = await gate.acquire()
+        if retry_after is not None:
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Server busy: too many requests in progress. Retry later."},
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+            await response(scope, receive, send)
+            return
+        start = gate.clock()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release(gate.clock() - start)
+
+
+def build_admission_controller() -> AdmissionController:
+    """Build the admission controller configured in settings (no gates when disabled)."""
+    return AdmissionController(settings.admission_limits if settings.admission_enabled else {})
@@ -1,6 +1,6 @@
 import os
 import json
-from typing import Optional
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -15,10 +15,38 @@ class Settings(BaseSettings):
     api_title: str = "T&C Guardian API"
     api_version: str = "0.1.0"
     debug: bool = False
+    log_dir: str = "logs"  # rotating tc_guardian.log and errors.log
     
-    # Rate Limiting
-    rate_limit_duration: int = 60  # seconds
-    rate_limit_requests: int = 20  # requests per duration
+    # Rate Limiting (token bucket per client IP, see app/core/rate_limit.py)
+    rate_limit_duration: int = 60  # seconds to refill an empty bucket
+    rate_limit_requests: int = 120  # bucket size, in request cost units
+    rate_limit_default_cost: float = 1.0  # cost of routes not in rate_limit_costs
+    rate_limit_costs: Dict[str, float] = {
+        # "[METHOD ]/path/prefix" -> cost; the longest matching prefix wins
+        "POST /analyze": 20.0,  # LLM analysis of a whole document
+        "POST /jobs": 20.0,  # batch analysis
+        "POST /chat": 4.0,
+        "POST /negotiations": 4.0,  # email generation calls the LLM
+        "POST /ingest": 4.0,  # extraction, fetching and crawling
+        "/health": 0.0,  # probes are never limited
+        "/ready": 0.0,
+    }
+    rate_limit_backend: str = "memory"  # memory (per worker) or sqlite (shared by a host's workers)
+    rate_limit_sqlite_path: str = "data/rate_limit.sqlite3"
+    rate_limit_max_keys: int = 100000  # clients tracked per worker by the memory backend
+
+    # Admission Control (per-endpoint concurrency in front of the LLM, see app/core/admission.py)
+    admission_enabled: bool = True
+    admission_limits: Dict[str, int] = {
+        # "[METHOD ]/path/prefix" -> concurrent requests per worker
+        "POST /analyze": 8,
+        "POST /chat": 16,
+        "POST /negotiations/*/generate-email": 8,
+    }
+    admission_queue_size: int = 32  # requests waiting for a slot, per endpoint
+    admission_queue_timeout_seconds: float = 15.0  # longest wait for a slot before a 503
+    admission_adaptive: bool = True  # shrink limits while latency is above normal
+    admission_latency_tolerance: float = 1.5  # short/long-term latency ratio seen as normal
     
     # CORS
     cors_origins: list = [
@@ -35,8 +63,101 @@ class Settings(BaseSettings):
     gemini_temperature: float = 0.2
     gemini_max_tokens: int = 8192
     
+    # Model Routing (fast model by default, large model for long or risky inputs)
+    model_routing_enabled: bool = True
+    gemini_model_fast: str = "gemini-flash-latest"
+    gemini_model_large: str = "gemini-1.5-pro"
+    routing_long_input_chars: int = 30000  # analysis input that escalates
+    routing_high_risk_score: float = 8.0  # local triage score of a section that escalates
+    routing_high_severity: int = 8  # clause severity that escalates email generation
+    routing_complex_question_chars: int = 300  # chat questions longer than this escalate
+    routing_failover_p95_ms: float = 30000  # fail over when the model's p95 latency exceeds this
+    routing_failover_error_rate: float = 0.5  # fail over when the model's error rate exceeds this
+    routing_min_samples: int = 10  # calls observed before latency/error rate are trusted
+    
+    # LLM Concurrency
+    llm_max_concurrency: int = 8  # concurrent calls per model
+    llm_model_concurrency: Dict[str, int] = {}  # per-model overrides
+    
+    # LLM Resilience
+    llm_timeout_seconds: float = 120.0  # deadline per call, including retries
+    llm_max_retries: int = 2  # retries on timeouts, 429 and 5xx errors
+    llm_retry_base_delay: float = 0.5  # seconds, doubled per retry (full jitter)
+    llm_retry_max_delay: float = 8.0  # seconds
+    llm_breaker_failure_threshold: int = 5  # consecutive failures that open the circuit
+    llm_breaker_reset_seconds: float = 30.0  # time the circuit stays open before a probe call
+    llm_hedge_enabled: bool = False  # send a backup call when the first one is slow
+    llm_hedge_percentile: float = 0.95  # latency percentile that triggers the backup call
+    llm_hedge_min_samples: int = 20  # latency samples needed before hedging starts
+    
+    # Batch Analysis Jobs
+    jobs_store: str = "sqlite"  # sqlite or memory
+    jobs_sqlite_path: str = "data/jobs.sqlite3"
+    jobs_max_workers: int = 4  # documents analyzed concurrently
+    jobs_max_documents: int = 500  # documents per job
+    jobs_claim_timeout_seconds: int = 900  # a document running longer was abandoned by a dead worker
+    jobs_requeue_interval_seconds: int = 60  # how often abandoned documents are queued again
+    
     # Document Processing
     max_pdf_pages: int = 50
+    max_upload_bytes: int = 20 * 1024 * 1024  # enforced while the upload is received
+    upload_spool_dir: Optional[str] = None  # temp directory for uploads (default: system temp)
+    extraction_workers: int = 0  # extraction processes; 0 = one per CPU
+    extraction_use_processes: bool = True  # False runs extraction in threads (timeouts cannot kill them)
+    extraction_min_pages_per_task: int = 4  # a PDF is split into tasks of at least this many pages
+    extraction_timeout_seconds: float = 60.0  # per document; workers still parsing it are killed
+    
+    # URL Ingestion
+    url_fetch_timeout_seconds: float = 10.0
+    url_fetch_max_bytes: int = 5 * 1024 * 1024  # enforced while the page is downloaded
+    url_fetch_max_connections: int = 20  # shared connection pool size
+    url_fetch_cache_entries: int = 500  # URLs whose extracted text is kept for revalidation
+    url_fetch_cache_ttl_seconds: int = 86400
+    html_extractor: str = "auto"  # lxml, soup (pure Python) or auto (lxml when installed)
+    crawl_max_depth: int = 2  # link hops followed from the start page
+    crawl_max_documents: int = 8  # legal documents fetched per crawl
+    crawl_per_host_concurrency: int = 4  # concurrent fetches per host during a crawl
+
+    # Document Store (ingested text referenced by document_id)
+    document_store_backend: str = "disk"  # disk or memory
+    document_store_dir: str = "data/documents"
+    document_store_memory_bytes: int = 256 * 1024 * 1024  # text kept in process (LRU)
+    document_store_ttl_seconds: int = 86400  # documents unused for a day expire
+    
+    # Long Document Analysis (map-reduce over chunks)
+    analysis_chunk_chars: int = 12000  # max characters per chunk
+    analysis_chunk_overlap_chars: int = 600  # characters repeated between chunks
+    analysis_max_fanout: int = 4  # concurrent chunk analyses per document
+    clause_cache_section_chars: int = 1500  # max characters per clause cache section
+    analysis_triage_enabled: bool = True  # send only locally flagged sections to the LLM
+    analysis_triage_min_chars: int = 6000  # shorter documents are always sent whole
+    analysis_triage_threshold: float = 2.0  # minimum local risk score to send a section
+    
+    # Chat Retrieval (BM25 over contract passages)
+    chat_retrieval_top_k: int = 4  # passages sent to the model per question
+    chat_passage_chars: int = 1000  # max characters per passage
+    chat_index_cache_entries: int = 64  # documents whose index is kept in memory
+    chat_index_ttl_seconds: int = 3600
+
+    # Chat Sessions (server-side history, bound to a document hash)
+    chat_session_max_entries: int = 1000  # sessions kept in memory (LRU)
+    chat_session_ttl_seconds: int = 86400  # idle sessions expire after a day
+    chat_session_purge_every: int = 500  # session creations between sweeps of expired sessions
+    chat_session_recent_messages: int = 6  # latest messages kept verbatim
+    chat_session_summary_chars: int = 2000  # cap on the digest of older turns
+
+    # Chat Answer Cache (first-turn questions, keyed by document hash + normalized question)
+    chat_answer_cache_enabled: bool = True
+    chat_answer_cache_entries: int = 5000
+    chat_answer_cache_ttl_seconds: int = 86400
+    chat_answer_cache_similarity: float = 0.8  # Jaccard threshold for near-duplicate questions (0 = exact only)
+    chat_answer_cache_candidates: int = 50  # questions per document compared for similarity
+    
+    # Analysis Cache (in-process L1 in front of a persistent L2)
+    analysis_cache_backend: str = "auto"  # auto, firestore, sqlite or memory
+    analysis_cache_sqlite_path: str = "cache/analysis_cache.sqlite3"
+    analysis_cache_l1_max_entries: int = 1024
+    analysis_cache_l1_ttl_seconds: int = 3600
     
     class Config:
         env_file = ".env"
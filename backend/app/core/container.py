@@ -0,0 +1,158 @@
+"""
+Service Container - Long-lived services and clients shared by a worker's requests.
+
+Built once by the application lifespan (or lazily on first use), so request
+handlers no longer configure Gemini, construct GenerativeModel objects or
+rebuild prompts on every call. warm_up() builds everything ahead of traffic
+and flips the readiness flag reported by /ready.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import google.generativeai as genai
+from firebase_admin import firestore
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.analysis_service import AnalysisService
+from app.services.cache import build_cache_backend, get_analysis_cache
+from app.services.chat_session import SESSION_NAMESPACE, ChatSessionStore
+from app.services.document_store import DocumentStore, build_document_store
+from app.services.job_service import JobService, build_job_store
+from app.services.llm_client import LLMClient
+from app.services.negotiation_service import NegotiationService
+
+
+class ServiceContainer:
+    """Holds the services and model clients of one worker process."""
+
+    def __init__(self, api_key: Optional[str] = None, db: Optional[firestore.Client] = None):
+        """
+        Args:
+            api_key: Google API key (None disables LLM features)
+            db: Firestore client, if available
+        """
+        self.api_key = api_key
+        self.db = db
+        self.warmup_ms: Optional[float] = None
+        self.warmup_error: Optional[str] = None
+        self._ready = False
+        self._configured = False
+        self._llm_clients: Dict[str, LLMClient] = {}
+        self._analysis_service: Optional[AnalysisService] = None
+        self._negotiation_service: Optional[NegotiationService] = None
+        self._chat_sessions: Optional[ChatSessionStore] = None
+        self._document_store: Optional[DocumentStore] = None
+        self._job_service: Optional[JobService] = None
+        self._lock = threading.RLock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def _configure(self) -> None:
+        if self.api_key and not self._configured:
+            genai.configure(api_key=self.api_key)
+            self._configured = True
+
+    def get_llm(self, model_name: str) -> LLMClient:
+        """Get the shared plain-text client for a model (chat, email generation)."""
+        with self._lock:
+            client = self._llm_clients.get(model_name)
+            if client is None:
+                self._configure()
+                client = LLMClient(model_name)
+                self._llm_clients[model_name] = client
+            return client
+
+    @property
+    def analysis_service(self) -> AnalysisService:
+        with self._lock:
+            if self._analysis_service is None:
+                self._analysis_service = AnalysisService(api_key=self.api_key, db=self.db)
+            return self._analysis_service
+
+    @property
+    def negotiation_service(self) -> NegotiationService:
+        with self._lock:
+            if self._negotiation_service is None:
+                self._negotiation_service = NegotiationService(
+                    api_key=self.api_key,
+                    db=self.db,
+                    llm_factory=self.get_llm
+                )
+            return self._negotiation_service
+
+    @property
+    def chat_sessions(self) -> ChatSessionStore:
+        with self._lock:
+            if self._chat_sessions is None:
+                self._chat_sessions = ChatSessionStore(self.document_store, build_cache_backend(self.db))
+            return self._chat_sessions
+
+    @property
+    def document_store(self) -> DocumentStore:
+        with self._lock:
+            if self._document_store is None:
+                self._document_store = build_document_store()
+            return self._document_store
+
+    @property
+    def job_service(self) -> JobService:
+        with self._lock:
+            if self._job_service is None:
+                self._job_service = JobService(build_job_store(), self.analysis_service)
+            return self._job_service
+
+    def _warm_up_sync(self) -> None:
+        self._configure()
+        get_analysis_cache(self.db)
+        # Build the lazy services now rather than on the first request
+        self.analysis_service.warm_up()
+        _ = self.negotiation_service
+        sessions = self.chat_sessions
+        if sessions.sessions.backend is not None:
+            # Drop sessions that expired while no worker was running
+            removed = sessions.sessions.backend.purge_expired(SESSION_NAMESPACE, sessions.ttl_seconds)
+            if removed:
+                logger.info(f"Purged {removed} expired chat sessions")
+        store = self.document_store
+        if store.backend is not None:
+            # Drop documents that expired while no worker was running
+            removed = store.backend.purge_expired(store.ttl_seconds)
+            if removed:
+                logger.info(f"Purged {removed} expired documents from the document store")
+        if self.api_key:
+            for model_name in {
+                settings.gemini_model_chat,
+                settings.gemini_model_fast,
+                settings.gemini_model_large,
+            }:
+                self.get_llm(model_name)
+
+    async def warm_up(self) -> None:
+        """Build all services and clients off the event loop, then mark the container ready."""
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._warm_up_sync)
+        except Exception as e:
+            # Services still build lazily; readiness reports the failure
+            self.warmup_error = str(e)
+            logger.error(f"Service warm-up failed: {e}", exc_info=True)
+            return
+        self.warmup_ms = (time.perf_counter() - start) * 1000
+        self._ready = True
+        logger.info(f"Services warmed up in {self.warmup_ms:.0f} ms")
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness details for the /ready endpoint."""
+        return {
+            "status": "ready" if self._ready else "starting",
+            "warmup_ms": round(self.warmup_ms, 1) if self.warmup_ms is not None else None,
+            "error": self.warmup_error,
+            "llm_enabled": bool(self.api_key),
+            "firestore": self.db is not None,
+            "models": sorted(self._llm_clients),
+        }
@@ -1,10 +1,20 @@
+import threading
 from typing import Optional
+from fastapi import Depends, Request
 from firebase_admin import firestore
 from app.core.config import settings
+from app.core.container import ServiceContainer
 from app.core.logging import logger
+from app.services.analysis_service import AnalysisService
+from app.services.document_store import DocumentStore
+from app.services.job_service import JobService
+from app.services.negotiation_service import NegotiationService
 from firebase_config import get_db
 
 
+_container_lock = threading.Lock()
+
+
 def get_database() -> Optional[firestore.Client]:
     """Dependency to get Firestore database client."""
     db = get_db()
@@ -18,3 +28,44 @@ def get_google_api_key() -> Optional[str]:
     if not settings.google_api_key:
         logger.warning("GOOGLE_API_KEY is not configured. Some features may be unavailable.")
     return settings.google_api_key
+
+
+def get_container(
+    request: Request,
+    db: Optional[firestore.Client] = Depends(get_database),
+    api_key: Optional[str] = Depends(get_google_api_key)
+) -> ServiceContainer:
+    """
+    Dependency to get the worker's service container.
+    
+    The application lifespan normally builds and warms it; apps without the
+    lifespan (e.g. tests mounting a single router) get one built on first use.
+    """
+    container = getattr(request.app.state, "container", None)
+    if container is None:
+        with _container_lock:
+            container = getattr(request.app.state, "container", None)
+            if container is None:
+                container = ServiceContainer(api_key=api_key, db=db)
+                request.app.state.container = container
+    return container
+
+
+def get_analysis_service(container: ServiceContainer = Depends(get_container)) -> AnalysisService:
+    """Dependency to get the shared analysis service."""
+    return container.analysis_service
+
+
+def get_negotiation_service(container: ServiceContainer = Depends(get_container)) -> NegotiationService:
+    """Dependency to get the shared negotiation service."""
+    return container.negotiation_service
+
+
+def get_document_store(container: ServiceContainer = Depends(get_container)) -> DocumentStore:
+    """Dependency to get the shared store of ingested documents."""
+    return container.document_store
+
+
+def get_job_service(container: ServiceContainer = Depends(get_container)) -> JobService:
+    """Dependency to get the worker's batch job service."""
+    return container.job_service
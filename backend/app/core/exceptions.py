@@ -1,3 +1,6 @@
+import math
+from typing import Optional
+
 from fastapi import HTTPException, status
 
 
@@ -15,12 +18,32 @@ class AnalysisException(TCGuardianException):
         )
 
 
+class LLMUnavailableException(TCGuardianException):
+    """Exception raised when the AI provider cannot serve a call (outage, timeout, open circuit)."""
+    def __init__(self, detail: str, retry_after: Optional[float] = None):
+        headers = {"Retry-After": str(max(1, math.ceil(retry_after)))} if retry_after else None
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"AI service unavailable: {detail}",
+            headers=headers
+        )
+
+
 class IngestionException(TCGuardianException):
     """Exception raised during document ingestion."""
     def __init__(self, detail: str, status_code: int = status.HTTP_400_BAD_REQUEST):
         super().__init__(status_code=status_code, detail=f"Ingestion failed: {detail}")
 
 
+class DocumentNotFoundException(TCGuardianException):
+    """Exception raised when a document_id is unknown or its document has expired."""
+    def __init__(self, doc_id: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document {doc_id} not found or expired. Ingest it again."
+        )
+
+
 class CacheException(TCGuardianException):
     """Exception raised during cache operations."""
     def __init__(self, detail: str):
@@ -2,13 +2,17 @@ import logging
 import os
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
+from typing import Optional
 
+from app.core.config import settings
 
-def setup_logging(log_dir: str = "logs", log_level: str = "INFO"):
-    """Configure application logging."""
+
+def setup_logging(log_dir: Optional[str] = None, log_level: str = "INFO"):
+    """Configure application logging (files go to settings.log_dir by default)."""
+    log_dir = log_dir or settings.log_dir
     
     # Create logs directory if it doesn't exist
-    Path(log_dir).mkdir(exist_ok=True)
+    Path(log_dir).mkdir(parents=True, exist_ok=True)
     
     # Configure root logger
     logger = logging.getLogger("tc_guardian")
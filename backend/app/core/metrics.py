@@ -0,0 +1,72 @@
+import bisect
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+class Metrics:
+    """Thread-safe in-process counters and histograms for cache and LLM usage."""
+    
+    def __init__(self):
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._histograms: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def increment(self, name: str, value: float = 1) -> None:
+        """Increment a counter by value."""
+        with self._lock:
+            self._counters[name] += value
+    
+    def get(self, name: str) -> float:
+        """Get the current value of a counter."""
+        with self._lock:
+            return self._counters.get(name, 0)
+    
+    def ratio(self, numerator: str, denominator: str) -> float:
+        """Ratio between two counters (0.0 when the denominator is zero)."""
+        with self._lock:
+            total = self._counters.get(denominator, 0)
+            return self._counters.get(numerator, 0) / total if total else 0.0
+    
+    def snapshot(self) -> Dict[str, float]:
+        """Return a copy of all counters."""
+        with self._lock:
+            return dict(self._counters)
+    
+    def observe(self, name: str, value: float) -> None:
+        """Record a value (e.g. a latency in ms) in a bucketed histogram."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = {"buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1), "count": 0, "sum": 0.0}
+                self._histograms[name] = histogram
+            histogram["buckets"][bisect.bisect_left(LATENCY_BUCKETS_MS, value)] += 1
+            histogram["count"] += 1
+            histogram["sum"] += value
+    
+    def histograms(self) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of all histograms with labelled buckets."""
+        labels: List[str] = [f"le_{int(bound)}" for bound in LATENCY_BUCKETS_MS] + ["inf"]
+        with self._lock:
+            return {
+                name: {
+                    "buckets": dict(zip(labels, histogram["buckets"])),
+                    "count": histogram["count"],
+                    "sum": histogram["sum"],
+                }
+                for name, histogram in self._histograms.items()
+            }
+    
+    def reset(self) -> None:
+        """Reset all counters and histograms."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# Global metrics instance
+metrics = Metrics()
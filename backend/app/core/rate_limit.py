@@ -0,0 +1,305 @@
+"""
+Rate Limiting - Token buckets per client with per-route costs.
+
+Every client (IP address) has a bucket holding up to rate_limit_requests
+tokens, refilled continuously at rate_limit_requests per rate_limit_duration
+seconds. A request takes its route's cost from the bucket (settings
+rate_limit_costs, see RouteRules; rate_limit_default_cost for other routes),
+so one /analyze call uses up as much of the budget as many cheap requests
+do. Requests that find too few tokens are rejected with 429 and a
+Retry-After telling the client when enough will have been refilled.
+
+A bucket is two numbers, updated in constant time per request. A bucket that
+has been idle long enough to refill completely is indistinguishable from a
+new one, so idle clients are dropped instead of being kept forever.
+
+Backends:
+- memory: per worker process, bounded to rate_limit_max_keys clients
+- sqlite: one file shared by all workers on a host, so limits do not
+  multiply with the number of workers
+"""
+import asyncio
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import metrics
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets."""
+
+    # Whether take() does I/O and must be run off the event loop
+    blocking = False
+
+    @abstractmethod
+    def take(self, key: str, cost: float, capacity: float, refill_per_second: float) -> float:
+        """
+        Take cost tokens from a key's bucket.
+
+        Returns:
+            0.0 if the tokens were taken, otherwise the seconds until the
+            bucket will hold enough of them (nothing is taken then)
+        """
+
+
+def _refill(tokens: float, elapsed: float, capacity: float, refill_per_second: float) -> float:
+    return min(capacity, tokens + max(0.0, elapsed) * refill_per_second)
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Buckets in an LRU ordered by last use; per worker process."""
+
+    def __init__(self, max_keys: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_keys: Clients tracked at once; the least recently seen are dropped first
+            clock: Time source (tests)
+        """
+        self.max_keys = max_keys or settings.rate_limit_max_keys
+        self.clock = clock
+        # key -> (tokens, updated_at)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: str, cost: float, capacity: float, refill_per_second: float) -> float:
+        now = self.clock()
+        buckets = self._buckets
+        with self._lock:
+            item = buckets.get(key)
+            if item is None:
+                tokens = capacity
+            else:
+                tokens = _refill(item[0], now - item[1], capacity, refill_per_second)
+                buckets.move_to_end(key)
+
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / refill_per_second
+            buckets[key] = (tokens, now)
+
+            # Least recently seen first: drop buckets that have refilled completely,
+            # then the oldest ones if there are still too many clients
+            idle_before = now - capacity / refill_per_second
+            while True:
+                oldest_key = next(iter(buckets))
+                idle = buckets[oldest_key][1] <= idle_before
+                if not idle and len(buckets) <= self.max_keys:
+                    return wait
+                if not idle:
+                    metrics.increment("rate_limit.evicted")
+                del buckets[oldest_key]
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """Buckets in a SQLite file shared by all worker processes on a host."""
+
+    blocking = True
+
+    def __init__(self, path: str, purge_every: int = 1000, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path: Database file (created if missing)
+            purge_every: Requests between sweeps of idle buckets
+            clock: Wall-clock time source, shared by all processes (tests)
+        """
+        self.path = path
+        self.purge_every = purge_every
+        self.clock = clock
+        self._calls = 0
+        # One connection per thread: connecting costs more than the update itself
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS rate_limit_buckets_updated_at ON rate_limit_buckets (updated_at)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, cost: float, capacity: float, refill_per_second: float) -> float:
+        conn = self._connection()
+        self._calls += 1
+        # Take the write lock up front so concurrent workers cannot both spend the same tokens
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = self.clock()
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = capacity if row is None else _refill(row[0], now - row[1], capacity, refill_per_second)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / refill_per_second
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            if self._calls % self.purge_every == 0:
+                conn.execute(
+                    "DELETE FROM rate_limit_buckets WHERE updated_at < ?",
+                    (now - capacity / refill_per_second,)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+class RouteRules:
+    """
+    Values keyed by "[METHOD ]/path/prefix" rules, e.g. {"POST /analyze": 20}.
+
+    A rule matches requests whose path starts with its prefix, segment by
+    segment ("*" matches any one segment), optionally only for one method.
+    The longest matching prefix wins; for the same prefix a rule for the
+    method wins over one for any method. Routes are also served under /api,
+    which is ignored.
+    """
+
+    def __init__(self, rules: Dict[str, Any]):
+        parsed = []
+        for route, value in rules.items():
+            method, _, prefix = route.strip().rpartition(" ")
+            parsed.append((method.strip().upper() or None, self._segments(prefix), value))
+        self._rules: List[Tuple[Optional[str], Tuple[str, ...], Any]] = sorted(
+            parsed,
+            key=lambda rule: (len(rule[1]), rule[0] is not None),
+            reverse=True
+        )
+
+    @staticmethod
+    def _segments(path: str) -> Tuple[str, ...]:
+        return tuple(segment for segment in path.split("/") if segment)
+
+    def match(self, method: str, path: str) -> Optional[Any]:
+        """Value of the rule matching a request, or None."""
+        segments = self._segments(path)
+        if segments[:1] == ("api",):
+            segments = segments[1:]
+        for rule_method, prefix, value in self._rules:
+            if rule_method not in (None, method) or len(prefix) > len(segments):
+                continue
+            if all(part == "*" or part == segment for part, segment in zip(prefix, segments)):
+                return value
+        return None
+
+
+class RateLimiter:
+    """Applies per-route costs against a client's token bucket."""
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        capacity: Optional[float] = None,
+        window_seconds: Optional[float] = None,
+        costs: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            backend: Bucket storage
+            capacity: Bucket size, in cost units (default: settings.rate_limit_requests)
+            window_seconds: Time to refill an empty bucket (default: settings.rate_limit_duration)
+            costs: RouteRules of costs (default: settings.rate_limit_costs)
+        """
+        self.backend = backend
+        self.capacity = float(capacity or settings.rate_limit_requests)
+        self.refill_per_second = self.capacity / (window_seconds or settings.rate_limit_duration)
+        self.costs = RouteRules(settings.rate_limit_costs if costs is None else costs)
+
+    def cost(self, method: str, path: str) -> float:
+        """Cost of a request."""
+        cost = self.costs.match(method, path)
+        if cost is None:
+            cost = settings.rate_limit_default_cost
+        # A request costlier than a full bucket could never be served
+        return min(cost, self.capacity)
+
+    async def check(self, key: str, method: str, path: str) -> float:
+        """Charge a request; return 0.0 if allowed, otherwise the seconds to wait."""
+        cost = self.cost(method, path)
+        if cost <= 0:
+            return 0.0
+        if self.backend.blocking:
+            wait = await asyncio.to_thread(
+                self.backend.take, key, cost, self.capacity, self.refill_per_second
+            )
+        else:
+            wait = self.backend.take(key, cost, self.capacity, self.refill_per_second)
+        if wait:
+            metrics.increment("rate_limit.rejected")
+        return wait
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering 429 with Retry-After to clients over their limit."""
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        client = scope.get("client")
+        wait = await self.limiter.check(client[0] if client else "unknown", scope["method"], scope["path"])
+        if wait:
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Rate limit exceeded. Too many requests."},
+                headers={"Retry-After": str(max(1, math.ceil(wait)))}
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+def build_rate_limiter() -> RateLimiter:
+    """Build the rate limiter configured in settings (memory or sqlite buckets)."""
+    backend_name = settings.rate_limit_backend.lower()
+    backend: RateLimitBackend
+    if backend_name == "sqlite":
+        backend = SQLiteRateLimitBackend(settings.rate_limit_sqlite_path)
+    else:
+        if backend_name != "memory":
+            logger.warning(f"Unknown rate limit backend '{backend_name}'. Using in-process buckets.")
+        backend = MemoryRateLimitBackend()
+    return RateLimiter(backend)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
 
 from app.schemas.jurisdiction import Jurisdiction
@@ -21,6 +21,7 @@ class AnalysisResult(BaseModel):
     document_summary: str = Field(..., description="High-level summary of the entire document")
     overall_danger_score: int = Field(..., ge=0, le=100, description="Overall danger score from 0-100")
     clauses: List[ClauseAnalysis] = Field(default_factory=list, description="List of analyzed clauses")
+    degraded: bool = Field(default=False, description="True if produced by the offline analyzer instead of the AI model")
 
 
 class AnalysisResponse(BaseModel):
@@ -30,8 +31,18 @@ class AnalysisResponse(BaseModel):
 
 class AnalyzeRequest(BaseModel):
     """Request model for document analysis."""
-    text: str = Field(..., description="The contract text to analyze")
+    text: Optional[str] = Field(None, description="The contract text to analyze")
+    document_id: Optional[str] = Field(
+        None,
+        description="ID returned by /ingest for a stored document, instead of text"
+    )
     jurisdiction: Jurisdiction = Field(
         default=Jurisdiction.US_CALIFORNIA,
         description="User's jurisdiction for legal analysis"
     )
+
+    @model_validator(mode="after")
+    def check_document(self) -> "AnalyzeRequest":
+        if (self.text is None) == (self.document_id is None):
+            raise ValueError("Exactly one of 'text' or 'document_id' must be provided")
+        return self
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Dict, Any, Optional
 
 
 class ChatMessage(BaseModel):
@@ -15,9 +15,71 @@ class ChatRequest(BaseModel):
         description="Conversation history as list of message dicts with 'role' and 'parts'"
     )
     current_question: str = Field(..., description="The current user question")
-    document_context: str = Field(..., description="The full text of the contract being discussed")
+    document_context: Optional[str] = Field(None, description="The full text of the contract being discussed")
+    document_id: Optional[str] = Field(
+        None,
+        description="ID returned by /ingest for a stored contract, instead of document_context"
+    )
+
+    @model_validator(mode="after")
+    def check_document(self) -> "ChatRequest":
+        if (self.document_context is None) == (self.document_id is None):
+            raise ValueError("Exactly one of 'document_context' or 'document_id' must be provided")
+        return self
+
+
+class Citation(BaseModel):
+    """Contract passage the answer was based on."""
+    passage: int = Field(..., description="1-based passage number, as cited in the answer")
+    score: float = Field(..., description="BM25 relevance score for the question")
+    text: str = Field(..., description="The passage text")
 
 
 class ChatResponse(BaseModel):
     """Response model for chat endpoint."""
     answer: str = Field(..., description="The AI's response to the question")
+    citations: List[Citation] = Field(
+        default_factory=list,
+        description="Contract passages sent to the model for this answer"
+    )
+    cached: bool = Field(False, description="True if a cached answer to the same question was reused")
+
+
+class ChatSessionCreate(BaseModel):
+    """Request model for starting a server-side chat session."""
+    document_context: Optional[str] = Field(None, description="The full text of the contract")
+    document_hash: Optional[str] = Field(
+        None,
+        description="SHA-256 of a contract already uploaded by an earlier session"
+    )
+    document_id: Optional[str] = Field(None, description="ID returned by /ingest for a stored contract")
+
+    @model_validator(mode="after")
+    def check_document(self) -> "ChatSessionCreate":
+        provided = [
+            bool(self.document_context and self.document_context.strip()),
+            bool(self.document_hash),
+            bool(self.document_id),
+        ]
+        if provided.count(True) != 1:
+            raise ValueError("Exactly one of 'document_context', 'document_hash' or 'document_id' must be provided")
+        return self
+
+
+class ChatSessionMessage(BaseModel):
+    """Follow-up question in a chat session."""
+    question: str = Field(..., min_length=1, description="The user question")
+
+
+class ChatSessionResponse(BaseModel):
+    """A chat session and its server-side history."""
+    session_id: str = Field(..., description="ID to send follow-up messages to")
+    document_hash: str = Field(..., description="SHA-256 of the contract the session is bound to")
+    turns: int = Field(0, description="Questions answered so far")
+    summary: str = Field("", description="Digest of older turns no longer kept verbatim")
+    history: List[ChatMessage] = Field(default_factory=list, description="Most recent messages")
+
+
+class ChatSessionAnswer(ChatResponse):
+    """Answer to a chat session message."""
+    session_id: str = Field(..., description="The session the answer belongs to")
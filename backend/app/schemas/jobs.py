@@ -0,0 +1,48 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, List, Optional
+
+from app.schemas.jurisdiction import Jurisdiction
+
+
+class JobDocumentInput(BaseModel):
+    """A single document to analyze in a batch job (raw text or a URL)."""
+    text: Optional[str] = Field(None, description="Contract text to analyze")
+    url: Optional[str] = Field(None, description="URL of the contract to scrape and analyze")
+    jurisdiction: Optional[Jurisdiction] = Field(
+        None,
+        description="Jurisdiction for this document (defaults to the job jurisdiction)"
+    )
+    
+    @model_validator(mode="after")
+    def check_source(self) -> "JobDocumentInput":
+        if bool(self.text and self.text.strip()) == bool(self.url):
+            raise ValueError("Exactly one of 'text' or 'url' must be provided")
+        return self
+
+
+class JobCreateRequest(BaseModel):
+    """Request model for submitting a batch analysis job."""
+    documents: List[JobDocumentInput] = Field(..., min_length=1, description="Documents to analyze")
+    jurisdiction: Jurisdiction = Field(
+        default=Jurisdiction.US_CALIFORNIA,
+        description="Default jurisdiction for every document in the job"
+    )
+
+
+class JobDocumentStatus(BaseModel):
+    """Status (and result, once finished) of one document in a job."""
+    index: int = Field(..., description="Position of the document in the submitted batch")
+    status: str = Field(..., description="pending, running, completed or failed")
+    source: str = Field(..., description="'text' or the URL that was analyzed")
+    error: Optional[str] = Field(None, description="Error message if the document failed")
+    result: Optional[Dict[str, Any]] = Field(None, description="Analysis response once completed")
+
+
+class JobStatusResponse(BaseModel):
+    """Response model for a batch job."""
+    job_id: str = Field(..., description="Job identifier")
+    status: str = Field(..., description="pending, running or completed")
+    created_at: float = Field(..., description="Submission time (Unix timestamp)")
+    total: int = Field(..., description="Number of documents in the job")
+    counts: Dict[str, int] = Field(default_factory=dict, description="Number of documents per status")
+    documents: List[JobDocumentStatus] = Field(default_factory=list, description="Per-document status")
@@ -1,16 +1,58 @@
+import asyncio
 import json
 import hashlib
-import datetime
+import re
+import time
 import uuid
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import google.generativeai as genai
 from firebase_admin import firestore
+from pydantic import ValidationError
 
 from app.core.config import settings
 from app.core.exceptions import AnalysisException, ConfigurationException
 from app.core.logging import logger
-from app.schemas.analysis import AnalysisResponse
+from app.core.metrics import metrics
+from app.schemas.analysis import AnalysisResponse, ClauseAnalysis
 from app.schemas.jurisdiction import Jurisdiction
+from app.services.cache import AnalysisCache, get_analysis_cache
+from app.services.chunking import pack_chunks, split_sections
+from app.services.ingestion_service import sanitize_text
+from app.services.llm_client import LLMClient
+from app.services.model_router import model_router
+from app.services.offline_analyzer import OfflineAnalyzer
+from app.services.singleflight import SingleFlight
+from app.services.stream_parser import ClauseStreamParser
+from app.services.triage import score_section, triage_sections
+
+
+# Shared by all service instances so duplicate concurrent requests coalesce
+_analysis_flights = SingleFlight("analysis")
+
+
+class SectionPlan:
+    """Sections of a document and which of them still need LLM analysis."""
+    
+    def __init__(
+        self,
+        sections: List[str],
+        section_keys: List[str],
+        cached_sections: Dict[str, List[Dict]],
+        to_analyze: List[int],
+        context: str = ""
+    ):
+        self.sections = sections
+        self.section_keys = section_keys
+        self.cached_sections = cached_sections
+        self.to_analyze = to_analyze
+        self.context = context
+        # Routing inputs for the whole document, and the model the router prefers
+        # for them; section_keys are clause cache keys under that model
+        self.input_chars = 0
+        self.max_risk_score = 0.0
+        self.preferred_model: Optional[str] = None
+        # Model that analyzed to_analyze (set by _route_llm)
+        self.model: Optional[str] = None
 
 
 class AnalysisService:
@@ -42,10 +84,27 @@ Analyze the provided contract text and return a JSON object following this EXACT
 If the text is safe, return a low score. Be strict but fair.
 """
     
-    def __init__(self, api_key: Optional[str] = None, db: Optional[firestore.Client] = None):
+    # Maximum number of chunk summaries joined into a merged document summary
+    MAX_MERGED_SUMMARIES = 3
+    
+    # Bump whenever SYSTEM_PROMPT or the jurisdiction prompt changes so cached
+    # analyses produced by the old prompt are no longer served
+    PROMPT_VERSION = "2"
+    
+    # Leading normalized characters used to match a clause to its section
+    CLAUSE_LOCATE_PROBE_CHARS = 80
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        db: Optional[firestore.Client] = None,
+        cache: Optional[AnalysisCache] = None
+    ):
         """Initialize the analysis service."""
         self.api_key = api_key or settings.google_api_key
         self.db = db
+        self.cache = cache or get_analysis_cache(db)
+        self.model_name = settings.gemini_model_analysis
         
         if not self.api_key:
             logger.warning("Google API key not configured. Analysis will use fallback responses.")
@@ -61,89 +120,375 @@ If the text is safe, return a low score. Be strict but fair.
             "response_mime_type": "application/json",
         }
         
-        self.model = genai.GenerativeModel(
-            model_name=settings.gemini_model_analysis,
-            generation_config=self.generation_config,
-        ) if self.api_key else None
+        self._clients: Dict[str, LLMClient] = {}
+        self._prompts: Dict[Jurisdiction, str] = {}
+        self.llm = self._get_llm(self.model_name) if self.api_key else None
+        self.model = self.llm.model if self.llm else None
     
     def _get_text_hash(self, text: str) -> str:
         """Generate SHA-256 hash of text for caching."""
         return hashlib.sha256(text.encode('utf-8')).hexdigest()
     
-    def _check_cache(self, text_hash: str) -> Optional[Dict]:
-        """Check if analysis exists in cache."""
-        if not self.db:
+    def _get_cache_key(self, text_hash: str, jurisdiction_enum: Jurisdiction) -> str:
+        """
+        Generate the document cache key.
+        
+        Includes the jurisdiction and prompt version so an analysis is never
+        served for a different legal framework or an outdated prompt. The
+        model that answered is routed per request, after the cache lookup,
+        so it is stored with the entry instead (see _is_current).
+        """
+        return self._get_text_hash(
+            f"{text_hash}|{jurisdiction_enum.value}|{self.PROMPT_VERSION}"
+        )
+    
+    @staticmethod
+    def _is_current(cached: Dict) -> bool:
+        """
+        Whether a cached analysis came from the model the router would use now.
+        
+        An analysis by the preferred model is served as long as that model is
+        still configured; one produced by failover only while the preferred
+        model is still unhealthy, so it is replaced once that model recovers.
+        """
+        routing = cached.get("routing")
+        if routing is None:
+            return False
+        model, preferred = routing.get("model"), routing.get("preferred_model")
+        if model is None:
+            # Assembled from the clause cache without a model call
+            return True
+        configured = {settings.gemini_model_analysis, settings.gemini_model_fast, settings.gemini_model_large}
+        if preferred not in configured:
+            return False
+        return model == preferred or model_router.unhealthy_reason(preferred) is not None
+    
+    async def _check_cache(self, cache_key: str) -> Optional[Dict]:
+        """Check if a current analysis exists in cache."""
+        cached = await self.cache.get("analysis", cache_key)
+        if not cached:
             return None
+        if not self._is_current(cached):
+            metrics.increment("analysis_cache.stale_model")
+            logger.info(f"CACHE STALE (model): {cache_key}")
+            return None
+        logger.info(f"CACHE HIT: {cache_key}")
+        return {key: value for key, value in cached.items() if key != "routing"}
+    
+    async def _save_to_cache(self, cache_key: str, analysis_data: Dict, plan: SectionPlan):
+        """Save analysis result to cache with the models that produced it."""
+        await self.cache.set("analysis", cache_key, {
+            **analysis_data,
+            "routing": {"model": plan.model, "preferred_model": plan.preferred_model},
+        })
+        logger.info(f"CACHE SAVED: {cache_key}")
+    
+    async def _save_results(
+        self,
+        cache_key: str,
+        analysis_data: Dict,
+        new_entries: Dict[str, List[Dict]],
+        plan: SectionPlan
+    ):
+        """Cache a complete analysis and its new section entries."""
+        # Clause entries are keyed by the preferred model; sections analyzed by a
+        # failover model would be served under its key, so only the document
+        # entry (which records the model) is kept
+        if plan.model == plan.preferred_model:
+            await self._save_clause_cache(new_entries)
+        await self._save_to_cache(cache_key, analysis_data, plan)
+    
+    def _get_clause_key(self, section: str, jurisdiction_enum: Jurisdiction, model_name: str) -> str:
+        """Generate the clause cache key from normalized section text, jurisdiction and model."""
+        normalized = self._normalize_clause_text(section)
+        return self._get_text_hash(
+            f"{jurisdiction_enum.value}|{model_name}|{self.PROMPT_VERSION}|{normalized}"
+        )
+    
+    async def _check_clause_cache(self, keys: List[str]) -> Dict[str, List[Dict]]:
+        """Look up previously analyzed sections, returning their clauses by key."""
+        if not keys:
+            return {}
+        found = await self.cache.get_many("clause", keys)
+        return {key: value.get("clauses", []) for key, value in found.items()}
+    
+    async def _save_clause_cache(self, entries: Dict[str, List[Dict]]):
+        """Save per-section clause analyses (an empty list marks a safe section)."""
+        if not entries:
+            return
+        await self.cache.set_many(
+            "clause",
+            {key: {"clauses": clauses} for key, clauses in entries.items()}
+        )
+        logger.info(f"CLAUSE CACHE SAVED: {len(entries)} sections")
+    
+    def _get_fallback_response(self, text: str, jurisdiction_enum: Jurisdiction) -> Dict:
+        """
+        Analyze the contract locally when the AI service is unavailable.
+        
+        The result comes from deterministic rules (see OfflineAnalyzer) and is
+        marked degraded; it is never cached.
+        """
+        analyzer = OfflineAnalyzer(settings.clause_cache_section_chars)
+        clauses = analyzer.analyze_clauses(sanitize_text(text), jurisdiction_enum)
+        metrics.increment("analysis.offline")
+        return {
+            "analysis_result": {
+                "document_summary": analyzer.build_summary(clauses),
+                "overall_danger_score": self.compute_danger_score(clauses),
+                "clauses": clauses,
+                "degraded": True
+            }
+        }
+    
+    def _resolve_jurisdiction(self, jurisdiction) -> Jurisdiction:
+        """Convert legacy string jurisdictions to the enum."""
+        if isinstance(jurisdiction, Jurisdiction):
+            return jurisdiction
         
+        # Map old string format to enum (for backward compatibility)
+        jurisdiction_map = {
+            "US-CA": Jurisdiction.US_CALIFORNIA,
+            "EU-GDPR": Jurisdiction.EU_GDPR,
+            "IN": Jurisdiction.INDIA_IT_ACT,
+        }
         try:
-            cached_doc = self.db.collection("global_contracts").document(text_hash).get()
-            if cached_doc.exists:
-                data = cached_doc.to_dict()
-                logger.info(f"CACHE HIT: {text_hash}")
-                
-                # Increment access count (fire-and-forget)
-                try:
-                    self.db.collection("global_contracts").document(text_hash).update({
-                        "access_count": firestore.Increment(1)
-                    })
-                except Exception as e:
-                    logger.warning(f"Failed to increment cache access count: {e}")
-                
-                return data.get("cached_analysis")
-        except Exception as e:
-            logger.warning(f"Cache lookup failed: {e}")
+            key = jurisdiction.upper()
+            return jurisdiction_map.get(key) or Jurisdiction(key)
+        except (AttributeError, ValueError):
+            # Fallback if jurisdiction is not recognized
+            return Jurisdiction.US_CALIFORNIA
+    
+    def _get_llm(self, model_name: str) -> LLMClient:
+        """Get the client for a model, creating it on first use."""
+        client = self._clients.get(model_name)
+        if client is None:
+            client = LLMClient(model_name=model_name, generation_config=self.generation_config)
+            self._clients[model_name] = client
+        return client
+    
+    def _route_llm(self, plan: SectionPlan) -> LLMClient:
+        """Pick the model for the sections that will be sent, by document size and local risk score."""
+        plan.model = model_router.route_analysis(input_chars=plan.input_chars, max_risk_score=plan.max_risk_score)
+        return self._get_llm(plan.model)
+    
+    def warm_up(self) -> None:
+        """Build prompts and model clients ahead of the first request."""
+        for jurisdiction_enum in Jurisdiction:
+            self._build_prompt(jurisdiction_enum)
+        if self.api_key:
+            for model_name in (self.model_name, settings.gemini_model_fast, settings.gemini_model_large):
+                self._get_llm(model_name)
+    
+    def _build_prompt(self, jurisdiction_enum: Jurisdiction) -> str:
+        """Build (once) the system prompt with jurisdiction-specific legal references."""
+        prompt = self._prompts.get(jurisdiction_enum)
+        if prompt is not None:
+            return prompt
         
-        return None
+        legal_references = Jurisdiction.get_legal_references(jurisdiction_enum)
+        
+        jurisdiction_prompt = f"""
+JURISDICTION: {jurisdiction_enum.value}
+
+LEGAL FRAMEWORK:
+{legal_references}
+
+CRITICAL: When analyzing clauses, apply the above legal framework strictly. 
+- If a clause violates the referenced laws, assign HIGH SEVERITY (7-10)
+- Cite specific articles/sections in the 'legal_context' field
+- Flag any attempt to limit or waive these legal rights as predatory
+"""
+        
+        prompt = f"{self.SYSTEM_PROMPT}\n\n{jurisdiction_prompt}"
+        self._prompts[jurisdiction_enum] = prompt
+        return prompt
     
-    def _save_to_cache(self, text_hash: str, analysis_data: Dict):
-        """Save analysis result to cache."""
-        if not self.db:
-            return
+    def _chunk_request(
+        self,
+        chunk: str,
+        full_prompt: str,
+        context: str = ""
+    ) -> Tuple[List[Dict], str]:
+        """Build the chat history and message used to analyze one chunk."""
+        history = [
+            {
+                "role": "user",
+                "parts": [full_prompt],
+            },
+        ]
+        message = f"Analyze this contract:\n\n{chunk}"
+        if context:
+            message = f"{message}\n\nContext: {context}"
+        return history, message
+    
+    async def _analyze_chunk(
+        self,
+        chunk: str,
+        full_prompt: str,
+        context: str = "",
+        llm: Optional[LLMClient] = None
+    ) -> Dict:
+        """
+        Send one chunk of contract text to the model and parse the result.
+        
+        Raises:
+            AnalysisException: If the model response is not valid analysis JSON
+        """
+        # Send analysis request without blocking the event loop
+        history, message = self._chunk_request(chunk, full_prompt, context)
+        response_text = await (llm or self.llm).chat(history=history, message=message)
         
+        # Parse JSON response
         try:
-            self.db.collection("global_contracts").document(text_hash).set({
-                "hash_id": text_hash,
-                "company_name": "Unknown",  # Could ask LLM to extract this
-                "document_title": "Uploaded Contract",
-                "last_analyzed": datetime.datetime.now(),
-                "cached_analysis": analysis_data,
-                "access_count": 1
-            })
-            logger.info(f"CACHE SAVED: {text_hash}")
-        except Exception as e:
-            logger.warning(f"Cache save failed: {e}")
+            analysis_data = json.loads(response_text)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON response: {e}")
+            logger.debug(f"Raw response: {response_text}")
+            raise AnalysisException(f"Failed to parse AI response: {str(e)}")
+        
+        # Validate structure
+        if "analysis_result" not in analysis_data:
+            raise AnalysisException("Invalid response structure from AI model")
+        
+        return analysis_data
+    
+    @staticmethod
+    def _normalize_clause_text(text: str) -> str:
+        """Normalize clause text for duplicate detection."""
+        return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+    
+    @staticmethod
+    def compute_danger_score(clauses: List[Dict]) -> int:
+        """
+        Compute a deterministic 0-100 danger score from clause severities.
+        
+        The most severe clauses dominate: severities are sorted descending and
+        averaged with harmonic weights (1, 1/2, 1/3, ...), then scaled to 100.
+        """
+        severities = sorted(
+            (int(clause.get("severity_score", 1)) for clause in clauses),
+            reverse=True
+        )
+        if not severities:
+            return 0
+        weights = [1 / (rank + 1) for rank in range(len(severities))]
+        weighted = sum(s * w for s, w in zip(severities, weights)) / sum(weights)
+        return max(0, min(100, round(weighted * 10)))
     
-    def _get_fallback_response(self) -> Dict:
-        """Generate fallback response when AI service is unavailable."""
+    def _merge_results(
+        self,
+        clauses: List[Dict],
+        summaries: List[str],
+        chunk_scores: List[int]
+    ) -> Dict:
+        """
+        Merge clauses from several chunks (or the clause cache) into one result.
+        
+        Clauses seen more than once (because of chunk overlap) are deduplicated
+        by category and normalized text, keeping the more severe copy. A clause
+        whose text merely contains another's is a different clause and is kept.
+        Input order is preserved.
+        """
+        merged: List[Dict] = []
+        normalized: List[str] = []
+        positions: Dict[Tuple[str, str], int] = {}
+        
+        for clause in clauses:
+            key = self._normalize_clause_text(clause.get("clause_text", ""))
+            duplicate = positions.get((clause.get("category", ""), key)) if key else None
+            if duplicate is None:
+                if key:
+                    positions[(clause.get("category", ""), key)] = len(merged)
+                merged.append(dict(clause))
+                normalized.append(key)
+                continue
+            
+            existing = merged[duplicate]
+            if clause.get("severity_score", 1) > existing.get("severity_score", 1):
+                merged[duplicate] = dict(clause, id=existing.get("id", clause.get("id")))
+        
+        # Ensure clause ids are unique across chunks
+        seen_ids = set()
+        for clause, key in zip(merged, normalized):
+            if not clause.get("id") or clause["id"] in seen_ids:
+                clause["id"] = str(uuid.uuid5(uuid.NAMESPACE_URL, key))
+            seen_ids.add(clause["id"])
+        
+        if merged:
+            overall_score = self.compute_danger_score(merged)
+        else:
+            overall_score = max(chunk_scores, default=0)
+        
+        distinct_summaries = list(dict.fromkeys(s.strip() for s in summaries if s and s.strip()))
+        if distinct_summaries:
+            summary = " ".join(distinct_summaries[:self.MAX_MERGED_SUMMARIES])
+        else:
+            summary = (
+                f"Assembled from previously analyzed sections: "
+                f"{len(merged)} notable clause(s) found."
+            )
+        
         return {
             "analysis_result": {
-                "document_summary": "⚠️ AI SERVICE UNAVAILABLE: This is a simulation. The AI service is currently experiencing high load or quota limits. We have detected typical predatory clauses for demonstration purposes.",
-                "overall_danger_score": 85,
-                "clauses": [
-                    {
-                        "id": str(uuid.uuid4()),
-                        "clause_text": "By using this service, you agree to grant us a worldwide, irrevocable license to all your content.",
-                        "category": "IP Ownership",
-                        "simplified_explanation": "You are giving them rights to use your content forever, anywhere.",
-                        "severity_score": 8,
-                        "legal_context": "Common in social media, but 'irrevocable' is aggressive.",
-                        "actionable_step": "Request limitation to 'operating the service' only.",
-                        "flags": ["Red Flag", "Fallback Data"]
-                    },
-                    {
-                        "id": str(uuid.uuid4()),
-                        "clause_text": "We provide no warranty and are not liable for any damages.",
-                        "category": "Liability",
-                        "simplified_explanation": "They take no responsibility if things break or you lose money.",
-                        "severity_score": 6,
-                        "legal_context": "Standard disclaimer, but total exclusion may be void in some jurisdictions.",
-                        "actionable_step": "Check local consumer protection laws.",
-                        "flags": ["Standard", "Fallback Data"]
-                    }
-                ]
+                "document_summary": summary,
+                "overall_danger_score": overall_score,
+                "clauses": merged
             }
         }
     
+    def _locate_clause(self, clause: Dict, sections: List[Tuple[int, str]]) -> Optional[int]:
+        """Find the index of the section a clause was quoted from."""
+        normalized = self._normalize_clause_text(clause.get("clause_text", ""))
+        if not normalized:
+            return None
+        probe = normalized[:self.CLAUSE_LOCATE_PROBE_CHARS]
+        for index, section in sections:
+            if normalized in section or probe in section:
+                return index
+        return None
+    
+    async def _analyze_chunks(
+        self,
+        chunks: List[str],
+        full_prompt: str,
+        context: str = "",
+        llm: Optional[LLMClient] = None
+    ) -> Tuple[List[Dict], bool]:
+        """
+        Analyze chunks concurrently, bounded by analysis_max_fanout.
+        
+        Returns:
+            Tuple of (successful chunk results, whether every chunk succeeded)
+        
+        Raises:
+            AnalysisException: If every chunk failed
+        """
+        if len(chunks) == 1:
+            return [await self._analyze_chunk(chunks[0], full_prompt, context, llm)], True
+        
+        logger.info(f"Analyzing {len(chunks)} chunks (fan-out {settings.analysis_max_fanout})")
+        semaphore = asyncio.Semaphore(settings.analysis_max_fanout)
+        
+        async def analyze_bounded(chunk: str) -> Dict:
+            async with semaphore:
+                return await self._analyze_chunk(chunk, full_prompt, context, llm)
+        
+        outcomes = await asyncio.gather(
+            *[analyze_bounded(chunk) for chunk in chunks],
+            return_exceptions=True
+        )
+        results = []
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                logger.warning(f"Chunk analysis failed: {outcome}")
+            else:
+                results.append(outcome)
+        if not results:
+            raise AnalysisException("All chunk analyses failed")
+        
+        return results, len(results) == len(chunks)
+    
     async def analyze_contract_text(
         self,
         text: str,
@@ -152,6 +497,13 @@ If the text is safe, return a low score. Be strict but fair.
         """
         Analyze contract text and return structured analysis.
         
+        The text is split into sections; sections already analyzed for this
+        jurisdiction (in any document) are served from the clause cache. In long
+        documents, a local triage pass drops sections with no risk indicators.
+        The remaining sections are packed into overlapping chunks, analyzed
+        concurrently (bounded by analysis_max_fanout) and merged. Concurrent
+        requests for the same text and jurisdiction share a single analysis.
+        
         Args:
             text: The contract text to analyze
             jurisdiction: User's jurisdiction (e.g., US-CA, EU-GDPR, UK)
@@ -163,87 +515,322 @@ If the text is safe, return a low score. Be strict but fair.
         if not text or not text.strip():
             raise AnalysisException("Contract text cannot be empty")
         
+        jurisdiction_enum = self._resolve_jurisdiction(jurisdiction)
+        
         # Check cache first
-        text_hash = self._get_text_hash(text)
-        cached_result = self._check_cache(text_hash)
+        cache_key = self._get_cache_key(self._get_text_hash(text), jurisdiction_enum)
+        cached_result = await self._check_cache(cache_key)
         if cached_result:
             return cached_result
         
+        return await _analysis_flights.do(
+            cache_key,
+            lambda: self._analyze_uncached(text, jurisdiction_enum, cache_key)
+        )
+    
+    async def _analyze_uncached(
+        self,
+        text: str,
+        jurisdiction_enum: Jurisdiction,
+        cache_key: str
+    ) -> Dict:
+        """Analyze text that missed the document cache and cache the result."""
+        plan = await self._plan_sections(text, jurisdiction_enum)
+        
         # If no API key, return fallback
-        if not self.api_key or not self.model:
+        if plan.to_analyze and (not self.api_key or not self.llm):
             logger.warning("AI service unavailable, returning fallback response")
-            return self._get_fallback_response()
+            return self._get_fallback_response(text, jurisdiction_enum)
         
         # Enhanced prompt with jurisdiction-specific legal references
+        full_prompt = self._build_prompt(jurisdiction_enum)
+        
         try:
-            # Convert string to enum if needed (for backward compatibility)
-            if isinstance(jurisdiction, str):
-                # Map old string format to enum
-                jurisdiction_map = {
-                    "US-CA": Jurisdiction.US_CALIFORNIA,
-                    "EU-GDPR": Jurisdiction.EU_GDPR,
-                    "IN": Jurisdiction.INDIA_IT_ACT,
-                }
-                jurisdiction_enum = jurisdiction_map.get(jurisdiction.upper(), Jurisdiction.US_CALIFORNIA)
-            else:
-                jurisdiction_enum = jurisdiction
+            results: List[Dict] = []
+            complete = True
+            if plan.to_analyze:
+                results, complete = await self._analyze_chunks(
+                    self._chunk_plan(plan), full_prompt, plan.context, self._route_llm(plan)
+                )
             
-            legal_references = Jurisdiction.get_legal_references(jurisdiction_enum)
-        except (AttributeError, ValueError):
-            # Fallback if jurisdiction is not recognized
-            jurisdiction_enum = Jurisdiction.US_CALIFORNIA
-            legal_references = Jurisdiction.get_legal_references(jurisdiction_enum)
+            analysis_data, new_entries = self._assemble_result(plan, results)
+            
+            # Only cache complete analyses
+            if complete:
+                await self._save_results(cache_key, analysis_data, new_entries, plan)
+            
+            return analysis_data
         
-        jurisdiction_prompt = f"""
-JURISDICTION: {jurisdiction_enum.value}
-
-LEGAL FRAMEWORK:
-{legal_references}
-
-CRITICAL: When analyzing clauses, apply the above legal framework strictly. 
-- If a clause violates the referenced laws, assign HIGH SEVERITY (7-10)
-- Cite specific articles/sections in the 'legal_context' field
-- Flag any attempt to limit or waive these legal rights as predatory
-"""
+        except Exception as e:
+            logger.error(f"AI Analysis Failed: {str(e)}", exc_info=True)
+            logger.warning("Returning fallback response due to AI service failure")
+            
+            # Return fallback on error
+            return self._get_fallback_response(text, jurisdiction_enum)
+    
+    async def _plan_sections(self, text: str, jurisdiction_enum: Jurisdiction) -> SectionPlan:
+        """
+        Split text into sections, look them up in the clause cache and triage
+        the rest so only risky sections are sent to the LLM.
+        """
+        # Reuse sections already analyzed in other documents
+        sections = split_sections(sanitize_text(text), settings.clause_cache_section_chars)
+        # Route by the whole document, so cached sections come from the model
+        # that would analyze the fresh ones
+        input_chars = sum(len(section) for section in sections)
+        max_risk_score = max((score_section(section) for section in sections), default=0.0)
+        preferred_model = model_router.preferred_analysis_model(input_chars, max_risk_score)
+        section_keys = [self._get_clause_key(section, jurisdiction_enum, preferred_model) for section in sections]
+        cached_sections = await self._check_clause_cache(section_keys)
+        unseen = [i for i, key in enumerate(section_keys) if key not in cached_sections]
+        
+        hit_chars = sum(len(sections[i]) for i, key in enumerate(section_keys) if key in cached_sections)
+        metrics.increment("clause_cache.lookups", len(sections))
+        metrics.increment("clause_cache.hits", len(sections) - len(unseen))
+        metrics.increment("clause_cache.chars_saved", hit_chars)
+        metrics.increment("clause_cache.chars_sent", sum(len(sections[i]) for i in unseen))
         
-        full_prompt = f"{self.SYSTEM_PROMPT}\n\n{jurisdiction_prompt}"
+        plan = SectionPlan(sections, section_keys, cached_sections, to_analyze=unseen)
+        plan.input_chars, plan.max_risk_score, plan.preferred_model = input_chars, max_risk_score, preferred_model
         
+        # Local triage: skip harmless sections of long documents
+        unseen_chars = sum(len(sections[i]) for i in unseen)
+        if settings.analysis_triage_enabled and unseen_chars >= settings.analysis_triage_min_chars:
+            triage = triage_sections(sections, unseen, settings.analysis_triage_threshold)
+            metrics.increment("triage.documents")
+            metrics.increment("triage.tokens_before", triage.tokens_before)
+            if triage.flagged:
+                plan.to_analyze = triage.flagged
+                plan.context = triage.context_summary
+                metrics.increment("triage.tokens_sent", triage.tokens_after)
+                logger.info(
+                    f"Triage: sending {len(triage.flagged)}/{len(unseen)} sections, "
+                    f"~{triage.tokens_after}/{triage.tokens_before} tokens "
+                    f"({triage.token_reduction:.0%} reduction)"
+                )
+            else:
+                # Nothing matched locally; let the model read everything
+                metrics.increment("triage.tokens_sent", triage.tokens_before)
+        
+        return plan
+    
+    def _chunk_plan(self, plan: SectionPlan) -> List[str]:
+        """Pack the sections that need analysis into overlapping chunks."""
+        return pack_chunks(
+            [plan.sections[i] for i in plan.to_analyze],
+            max_chars=settings.analysis_chunk_chars,
+            overlap_chars=settings.analysis_chunk_overlap_chars
+        )
+    
+    def _assemble_result(
+        self,
+        plan: SectionPlan,
+        results: List[Dict]
+    ) -> Tuple[Dict, Dict[str, List[Dict]]]:
+        """
+        Combine cached section clauses with fresh chunk results.
+        
+        Returns:
+            Tuple of (merged analysis, new clause cache entries by section key)
+        """
+        sections, section_keys, cached_sections = plan.sections, plan.section_keys, plan.cached_sections
+        analyzed = plan.to_analyze
+        # Place every clause at the section it was found in, in document order
+        placed: List[Tuple[int, Dict]] = [
+            (i, clause)
+            for i, key in enumerate(section_keys)
+            for clause in cached_sections.get(key, [])
+        ]
+        new_entries: Dict[str, List[Dict]] = {section_keys[i]: [] for i in analyzed}
+        analyzed_sections = [(i, self._normalize_clause_text(sections[i])) for i in analyzed]
+        for result in results:
+            for clause in result["analysis_result"].get("clauses", []):
+                index = self._locate_clause(clause, analyzed_sections)
+                if index is None:
+                    placed.append((len(sections), clause))
+                    continue
+                placed.append((index, clause))
+                entry = new_entries[section_keys[index]]
+                if clause.get("clause_text") not in (c.get("clause_text") for c in entry):
+                    entry.append(clause)
+        placed.sort(key=lambda item: item[0])
+        
+        analysis_data = self._merge_results(
+            clauses=[clause for _, clause in placed],
+            summaries=[r["analysis_result"].get("document_summary", "") for r in results],
+            chunk_scores=[r["analysis_result"].get("overall_danger_score", 0) for r in results]
+        )
+        return analysis_data, new_entries
+    
+    async def _stream_chunks(
+        self,
+        chunks: List[str],
+        full_prompt: str,
+        context: str = "",
+        llm: Optional[LLMClient] = None
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Stream several chunk analyses concurrently (bounded by analysis_max_fanout).
+        
+        Yields:
+            ("clause", clause) as soon as any chunk completes a clause object,
+            ("result", analysis) when a chunk's full response has been parsed,
+            and ("partial", clauses) with the clauses a chunk had already
+            streamed when it failed. Failed chunks are logged.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(settings.analysis_max_fanout)
+        llm = llm or self.llm
+        
+        async def stream_one(chunk: str) -> None:
+            streamed: List[Dict] = []
+            try:
+                async with semaphore:
+                    parser = ClauseStreamParser()
+                    history, message = self._chunk_request(chunk, full_prompt, context)
+                    async for fragment in llm.stream_chat(history, message):
+                        for clause in parser.feed(fragment):
+                            streamed.append(clause)
+                            await queue.put(("clause", clause))
+                    analysis_data = parser.result()
+                    if "analysis_result" not in analysis_data:
+                        raise AnalysisException("Invalid response structure from AI model")
+                    await queue.put(("result", analysis_data))
+            except Exception as e:
+                logger.warning(f"Chunk stream failed after {len(streamed)} clause(s): {e}")
+                await queue.put(("partial", streamed) if streamed else ("error", None))
+        
+        tasks = [asyncio.ensure_future(stream_one(chunk)) for chunk in chunks]
         try:
-            # Start chat session
-            chat_session = self.model.start_chat(
-                history=[
-                    {
-                        "role": "user",
-                        "parts": [full_prompt],
-                    },
-                ]
-            )
+            remaining = len(tasks)
+            while remaining:
+                kind, payload = await queue.get()
+                if kind != "clause":
+                    remaining -= 1
+                if kind != "error":
+                    yield kind, payload
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @staticmethod
+    def _partial_results(clauses: List[Dict]) -> List[Dict]:
+        """Wrap clauses from failed chunks as a chunk result for _assemble_result."""
+        return [{"analysis_result": {"clauses": clauses}}] if clauses else []
+    
+    async def stream_contract_analysis(
+        self,
+        text: str,
+        jurisdiction: Jurisdiction = Jurisdiction.US_CALIFORNIA
+    ) -> AsyncIterator[Dict]:
+        """
+        Analyze contract text, yielding clauses as soon as they are available.
+        
+        Cached clauses are emitted immediately; fresh clauses are emitted as
+        soon as the model has streamed a complete, valid clause object.
+        
+        Yields:
+            {"event": "clause", "data": ClauseAnalysis dict} for each new clause,
+            then {"event": "complete", "data": {...}} with the final merged
+            analysis_result, time_to_first_clause_ms and total_ms
+        """
+        if not text or not text.strip():
+            raise AnalysisException("Contract text cannot be empty")
+        
+        start = time.perf_counter()
+        first_clause_ms: Optional[float] = None
+        emitted: List[str] = []
+        
+        def clause_event(clause: Dict) -> Optional[Dict]:
+            """Validate a clause and wrap it as an event, skipping duplicates."""
+            nonlocal first_clause_ms
+            try:
+                validated = ClauseAnalysis(**clause).model_dump()
+            except ValidationError as e:
+                logger.debug(f"Skipping invalid streamed clause: {e}")
+                return None
+            key = self._normalize_clause_text(validated["clause_text"])
+            if any(key in seen or seen in key for seen in emitted):
+                return None
+            emitted.append(key)
+            if first_clause_ms is None:
+                first_clause_ms = (time.perf_counter() - start) * 1000
+            return {"event": "clause", "data": validated}
+        
+        jurisdiction_enum = self._resolve_jurisdiction(jurisdiction)
+        cache_key = self._get_cache_key(self._get_text_hash(text), jurisdiction_enum)
+        analysis_data = await self._check_cache(cache_key)
+        
+        if not analysis_data:
+            plan = await self._plan_sections(text, jurisdiction_enum)
             
-            # Send analysis request
-            response = chat_session.send_message(f"Analyze this contract:\n\n{text}")
+            # Sections served from the clause cache are available right away
+            for key in plan.section_keys:
+                for clause in plan.cached_sections.get(key, []):
+                    event = clause_event(clause)
+                    if event:
+                        yield event
             
-            # Parse JSON response
+            results: List[Dict] = []
+            # Clauses streamed by chunks that then failed: the client has seen them,
+            # so the final result keeps them (it is incomplete and not cached)
+            partial: List[Dict] = []
             try:
-                analysis_data = json.loads(response.text)
-                
-                # Validate structure
-                if "analysis_result" not in analysis_data:
-                    raise AnalysisException("Invalid response structure from AI model")
+                if plan.to_analyze and (not self.api_key or not self.llm):
+                    raise AnalysisException("AI service unavailable")
                 
-                # Save to cache
-                self._save_to_cache(text_hash, analysis_data)
+                complete = True
+                if plan.to_analyze:
+                    chunks = self._chunk_plan(plan)
+                    async for kind, payload in self._stream_chunks(
+                        chunks, self._build_prompt(jurisdiction_enum), plan.context,
+                        self._route_llm(plan)
+                    ):
+                        if kind == "result":
+                            results.append(payload)
+                            continue
+                        if kind == "partial":
+                            partial.extend(payload)
+                            continue
+                        event = clause_event(payload)
+                        if event:
+                            yield event
+                    if not results:
+                        raise AnalysisException("All chunk analyses failed")
+                    complete = len(results) == len(chunks)
                 
-                return analysis_data
+                analysis_data, new_entries = self._assemble_result(
+                    plan, results + self._partial_results(partial)
+                )
+                if complete:
+                    await self._save_results(cache_key, analysis_data, new_entries, plan)
             
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON response: {e}")
-                logger.debug(f"Raw response: {response.text}")
-                raise AnalysisException(f"Failed to parse AI response: {str(e)}")
+            except Exception as e:
+                logger.error(f"AI Analysis Failed: {str(e)}", exc_info=True)
+                if emitted:
+                    # Keep what was already streamed (not cached: it is partial)
+                    analysis_data, _ = self._assemble_result(plan, results + self._partial_results(partial))
+                else:
+                    logger.warning("Returning fallback response due to AI service failure")
+                    analysis_data = self._get_fallback_response(text, jurisdiction_enum)
         
-        except Exception as e:
-            logger.error(f"AI Analysis Failed: {str(e)}", exc_info=True)
-            logger.warning("Returning fallback response due to AI service failure")
-            
-            # Return fallback on error
-            fallback = self._get_fallback_response()
-            return fallback
+        for clause in analysis_data["analysis_result"].get("clauses", []):
+            event = clause_event(clause)
+            if event:
+                yield event
+        
+        total_ms = (time.perf_counter() - start) * 1000
+        metrics.increment("analysis_stream.requests")
+        if first_clause_ms is not None:
+            metrics.increment("analysis_stream.with_clauses")
+            metrics.increment("analysis_stream.time_to_first_clause_ms", first_clause_ms)
+            logger.info(f"Streamed analysis: first clause after {first_clause_ms:.0f} ms, total {total_ms:.0f} ms")
+        
+        yield {
+            "event": "complete",
+            "data": {
+                **analysis_data,
+                "time_to_first_clause_ms": round(first_clause_ms, 1) if first_clause_ms is not None else None,
+                "total_ms": round(total_ms, 1)
+            }
+        }
@@ -0,0 +1,144 @@
+"""
+Answer Cache - Reuse chat answers to repeated questions about the same contract.
+
+Popular contracts get the same questions over and over ("can I cancel
+anytime?", "do they sell my data?"). Answers are cached under the document
+hash plus the normalized question: lowercase terms without punctuation and
+stopwords, plural 's' stripped, order ignored. Negations are kept, so "do
+they sell my data" and "do they not sell my data" stay distinct.
+
+Near-duplicate phrasings can also hit: when there is no exact match, the
+question's terms are compared (Jaccard) with the latest questions cached for
+the same document, and the best match at or above
+chat_answer_cache_similarity is used. Only questions with the same negation
+terms are compared: one "not" barely moves the Jaccard score of a long
+question but flips its answer.
+
+Only first-turn questions are cached; with history, the answer depends on
+the conversation and not just the contract.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.cache import TTLCache
+from app.services.retrieval import STOPWORDS, tokenize
+
+
+NEGATIONS = frozenset({"no", "not", "never", "without"})
+QUESTION_STOPWORDS = STOPWORDS - NEGATIONS
+
+
+def question_terms(question: str) -> FrozenSet[str]:
+    """The set of meaningful terms in a question."""
+    return frozenset(tokenize(question, QUESTION_STOPWORDS))
+
+
+def normalize_question(question: str) -> str:
+    """Canonical form of a question, used as the exact-match key."""
+    return " ".join(sorted(question_terms(question)))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class AnswerCache:
+    """Bounded TTL/LRU cache of chat answers per (document hash, question)."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        similarity: Optional[float] = None,
+        candidates: Optional[int] = None
+    ):
+        """
+        Args:
+            max_entries: Answers kept in memory (LRU beyond that)
+            ttl_seconds: Time after which an answer is regenerated
+            similarity: Jaccard threshold for near-duplicate hits (0 = exact only)
+            candidates: Recent questions per document compared for similarity
+        """
+        self.answers = TTLCache(
+            max_entries=max_entries or settings.chat_answer_cache_entries,
+            ttl_seconds=ttl_seconds or settings.chat_answer_cache_ttl_seconds
+        )
+        self.similarity = settings.chat_answer_cache_similarity if similarity is None else similarity
+        self.candidates = candidates or settings.chat_answer_cache_candidates
+        # document hash -> recently cached normalized questions (most recent last)
+        self._questions: "OrderedDict[str, OrderedDict[str, FrozenSet[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, doc_hash: str, question: str) -> Optional[Dict]:
+        """
+        Find a cached answer for a question about a document.
+
+        Returns:
+            {"answer": ..., "citations": [...]} or None
+        """
+        terms = question_terms(question)
+        if not terms:
+            return None
+
+        metrics.increment("chat.answer_cache.lookups")
+        key = " ".join(sorted(terms))
+        entry = self.answers.get((doc_hash, key))
+        if entry is not None:
+            metrics.increment("chat.answer_cache.hits")
+            return entry
+
+        if self.similarity > 0:
+            for candidate in self._similar(doc_hash, terms):
+                entry = self.answers.get((doc_hash, candidate))
+                if entry is not None:
+                    metrics.increment("chat.answer_cache.hits")
+                    metrics.increment("chat.answer_cache.similar_hits")
+                    return entry
+
+        metrics.increment("chat.answer_cache.misses")
+        return None
+
+    def set(self, doc_hash: str, question: str, answer: str, citations: List[Dict]) -> None:
+        """Cache the answer to a first-turn question."""
+        terms = question_terms(question)
+        if not terms:
+            return
+
+        key = " ".join(sorted(terms))
+        self.answers.set((doc_hash, key), {"answer": answer, "citations": citations})
+        with self._lock:
+            questions = self._questions.setdefault(doc_hash, OrderedDict())
+            questions[key] = terms
+            questions.move_to_end(key)
+            while len(questions) > self.candidates:
+                questions.popitem(last=False)
+            self._questions.move_to_end(doc_hash)
+            # Track at most as many documents as there could be live answers
+            while len(self._questions) > self.answers.max_entries:
+                self._questions.popitem(last=False)
+
+    def _similar(self, doc_hash: str, terms: FrozenSet[str]) -> List[str]:
+        """Cached questions for a document at or above the threshold, best first."""
+        with self._lock:
+            questions = list(self._questions.get(doc_hash, {}).items())
+        negations = terms & NEGATIONS
+        scored = [
+            (score, key)
+            for key, cached_terms in questions
+            if cached_terms & NEGATIONS == negations
+            and (score := jaccard(terms, cached_terms)) >= self.similarity
+        ]
+        return [key for _, key in sorted(scored, reverse=True)]
+
+    def clear(self) -> None:
+        self.answers.clear()
+        with self._lock:
+            self._questions.clear()
+
+
+answer_cache = AnswerCache()
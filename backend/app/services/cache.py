@@ -0,0 +1,368 @@
+"""
+Cache - Tiered analysis cache.
+
+An in-process, size- and TTL-bounded LRU (L1) sits in front of a pluggable
+persistent backend (L2): Firestore when Firebase is configured, or a local
+SQLite file for deployments and tests without Firebase. Entries are grouped
+by namespace ("analysis" for whole documents, "clause" for sections).
+"""
+import asyncio
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Iterator, List, Optional
+
+from firebase_admin import firestore
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import metrics
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a maximum size and per-entry time-to-live."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class CacheBackend(ABC):
+    """Persistent (L2) cache backend interface. Methods are blocking."""
+
+    @abstractmethod
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Dict]:
+        """Return the stored values for the keys that exist."""
+
+    @abstractmethod
+    def set_many(self, namespace: str, entries: Dict[str, Dict]) -> None:
+        """Store several values."""
+
+    def record_hit(self, namespace: str, key: str) -> None:
+        """Record an access to a key (optional, used for popularity stats)."""
+
+    @abstractmethod
+    def purge_expired(self, namespace: str, ttl_seconds: float) -> int:
+        """Remove a namespace's entries last written more than ttl_seconds ago; return how many."""
+
+
+class FirestoreCacheBackend(CacheBackend):
+    """Firestore-backed cache (one collection per namespace)."""
+
+    COLLECTIONS = {
+        "analysis": "global_contracts",
+        "clause": "clause_cache",
+        "chat_session": "chat_sessions",
+    }
+
+    # Extra fields written with new documents, per namespace
+    DOCUMENT_DEFAULTS = {
+        "analysis": {
+            "company_name": "Unknown",  # Could ask LLM to extract this
+            "document_title": "Uploaded Contract",
+        },
+    }
+
+    # Maximum writes per Firestore batch
+    BATCH_LIMIT = 500
+
+    def __init__(self, db: firestore.Client):
+        self.db = db
+
+    def _collection(self, namespace: str):
+        return self.db.collection(self.COLLECTIONS.get(namespace, namespace))
+
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Dict]:
+        collection = self._collection(namespace)
+        refs = [collection.document(key) for key in dict.fromkeys(keys)]
+        found = {}
+        for snapshot in self.db.get_all(refs):
+            if snapshot.exists:
+                found[snapshot.id] = snapshot.to_dict().get("cached_analysis")
+        return found
+
+    def set_many(self, namespace: str, entries: Dict[str, Dict]) -> None:
+        collection = self._collection(namespace)
+        defaults = self.DOCUMENT_DEFAULTS.get(namespace, {})
+        items = list(entries.items())
+        for start in range(0, len(items), self.BATCH_LIMIT):
+            batch = self.db.batch()
+            for key, value in items[start:start + self.BATCH_LIMIT]:
+                batch.set(collection.document(key), {
+                    "hash_id": key,
+                    **defaults,
+                    "last_analyzed": datetime.datetime.now(),
+                    "cached_analysis": value,
+                    "access_count": 1
+                })
+            batch.commit()
+
+    def record_hit(self, namespace: str, key: str) -> None:
+        self._collection(namespace).document(key).update({
+            "access_count": firestore.Increment(1)
+        })
+
+    def purge_expired(self, namespace: str, ttl_seconds: float) -> int:
+        cutoff = datetime.datetime.now() - datetime.timedelta(seconds=ttl_seconds)
+        query = self._collection(namespace).where("last_analyzed", "<", cutoff).limit(self.BATCH_LIMIT)
+        removed = 0
+        while True:
+            snapshots = list(query.stream())
+            if not snapshots:
+                return removed
+            batch = self.db.batch()
+            for snapshot in snapshots:
+                batch.delete(snapshot.reference)
+            batch.commit()
+            removed += len(snapshots)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Local SQLite-backed cache for deployments without Firebase."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    last_analyzed REAL NOT NULL,
+                    access_count INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Dict]:
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._connect() as conn:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, value FROM cache_entries "
+                    f"WHERE namespace = ? AND key IN ({placeholders})",
+                    [namespace, *batch]
+                )
+                for key, value in rows:
+                    found[key] = json.loads(value)
+        return found
+
+    def set_many(self, namespace: str, entries: Dict[str, Dict]) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(namespace, key, value, last_analyzed, access_count) VALUES (?, ?, ?, ?, 1)",
+                [(namespace, key, json.dumps(value), now) for key, value in entries.items()]
+            )
+
+    def record_hit(self, namespace: str, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE cache_entries SET access_count = access_count + 1 "
+                "WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            )
+
+    def purge_expired(self, namespace: str, ttl_seconds: float) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND last_analyzed < ?",
+                (namespace, time.time() - ttl_seconds)
+            ).rowcount
+
+
+class AnalysisCache:
+    """Two-level cache: in-process TTL/LRU (L1) in front of a persistent backend (L2)."""
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        record_hits: bool = True
+    ):
+        """
+        Args:
+            backend: Persistent L2 backend (None keeps entries in memory only)
+            max_entries: Entries kept in L1 (LRU beyond that)
+            ttl_seconds: L1 entry lifetime
+            record_hits: Count L2 hits in the backend (one extra write per hit)
+        """
+        self.backend = backend
+        self.record_hits = record_hits
+        self.l1 = TTLCache(
+            max_entries=max_entries or settings.analysis_cache_l1_max_entries,
+            ttl_seconds=ttl_seconds or settings.analysis_cache_l1_ttl_seconds
+        )
+
+    async def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Dict]:
+        """
+        Look up several keys, checking L1 first and L2 for the misses.
+
+        L2 hits are promoted to L1. Access counts are recorded in the
+        background so they never add a round trip to the request.
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Dict] = {}
+        missing: List[str] = []
+        for key in keys:
+            value = self.l1.get((namespace, key))
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        metrics.increment(f"cache.{namespace}.l1_hits", len(found))
+
+        if missing and self.backend:
+            try:
+                stored = await asyncio.to_thread(self.backend.get_many, namespace, missing)
+            except Exception as e:
+                logger.warning(f"Cache lookup failed: {e}")
+                stored = {}
+            for key, value in stored.items():
+                if value is None:
+                    continue
+                self.l1.set((namespace, key), value)
+                found[key] = value
+                if self.record_hits:
+                    self._record_hit_in_background(namespace, key)
+            metrics.increment(f"cache.{namespace}.l2_hits", len(stored))
+
+        metrics.increment(f"cache.{namespace}.lookups", len(keys))
+        return found
+
+    async def get(self, namespace: str, key: str) -> Optional[Dict]:
+        """Look up a single key."""
+        return (await self.get_many(namespace, [key])).get(key)
+
+    async def set_many(self, namespace: str, entries: Dict[str, Dict]) -> None:
+        """Write entries through to L1 and L2."""
+        if not entries:
+            return
+        for key, value in entries.items():
+            self.l1.set((namespace, key), value)
+        if self.backend:
+            try:
+                await asyncio.to_thread(self.backend.set_many, namespace, entries)
+            except Exception as e:
+                logger.warning(f"Cache save failed: {e}")
+
+    async def set(self, namespace: str, key: str, value: Dict) -> None:
+        """Store a single entry."""
+        await self.set_many(namespace, {key: value})
+
+    async def purge_expired(self, namespace: str, ttl_seconds: float) -> int:
+        """Remove a namespace's L2 entries not written for ttl_seconds; return how many."""
+        if not self.backend:
+            return 0
+        try:
+            return await asyncio.to_thread(self.backend.purge_expired, namespace, ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Cache purge failed: {e}")
+            return 0
+
+    def _record_hit_in_background(self, namespace: str, key: str) -> None:
+        def record():
+            try:
+                self.backend.record_hit(namespace, key)
+            except Exception as e:
+                logger.warning(f"Failed to increment cache access count: {e}")
+
+        asyncio.get_running_loop().run_in_executor(None, record)
+
+
+_analysis_cache: Optional[AnalysisCache] = None
+_analysis_cache_lock = threading.Lock()
+
+
+def build_cache_backend(db: Optional[firestore.Client]) -> Optional[CacheBackend]:
+    """Build the L2 backend selected by settings.analysis_cache_backend."""
+    backend = settings.analysis_cache_backend.lower()
+    if backend == "auto":
+        backend = "firestore" if db else "sqlite"
+
+    if backend == "firestore":
+        if not db:
+            logger.warning("Firestore cache backend selected but Firestore is unavailable.")
+            return None
+        return FirestoreCacheBackend(db)
+    if backend == "sqlite":
+        return SQLiteCacheBackend(settings.analysis_cache_sqlite_path)
+    if backend != "memory":
+        logger.warning(f"Unknown cache backend '{backend}'. Using in-process cache only.")
+    return None
+
+
+def get_analysis_cache(db: Optional[firestore.Client] = None) -> AnalysisCache:
+    """Get the process-wide analysis cache, creating it on first use."""
+    global _analysis_cache
+    with _analysis_cache_lock:
+        if _analysis_cache is None:
+            _analysis_cache = AnalysisCache(build_cache_backend(db))
+            backend_name = type(_analysis_cache.backend).__name__ if _analysis_cache.backend else "none"
+            logger.info(f"Analysis cache initialized (L2 backend: {backend_name})")
+        return _analysis_cache
@@ -0,0 +1,189 @@
+"""
+Chat Sessions - Server-side conversation state for "Ask the Contract".
+
+A session is bound to the SHA-256 hash of the contract text, which is also
+its document_id in the document store: the contract is kept there once, next
+to ingested documents, and sessions hold only the hash. Follow-up messages
+then carry only the session ID and the new question instead of the whole
+history and contract. Sessions live in the two-level cache (bounded
+in-process L1 in front of the persistent L2 backend) and expire after
+chat_session_ttl_seconds without activity; expired sessions are purged from
+the L2 backend at startup and every chat_session_purge_every creations.
+
+To keep prompts bounded, only the latest messages are kept verbatim; older
+exchanges are folded into a short extractive digest (question plus the first
+sentence of the answer), so no extra model call is needed.
+"""
+import re
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.cache import AnalysisCache, CacheBackend
+from app.services.document_store import DocumentStore, document_id
+
+
+SESSION_NAMESPACE = "chat_session"
+
+# Longest question or answer excerpt kept per summarized exchange
+SUMMARY_EXCERPT_CHARS = 200
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def _excerpt(text: str) -> str:
+    """First sentence of a message, whitespace-collapsed and length-capped."""
+    text = " ".join(text.split())
+    text = SENTENCE_END.split(text, maxsplit=1)[0]
+    if len(text) > SUMMARY_EXCERPT_CHARS:
+        text = text[:SUMMARY_EXCERPT_CHARS].rstrip() + "..."
+    return text
+
+
+def fold_into_summary(summary: str, messages: List[Dict], max_chars: int) -> str:
+    """
+    Append old messages to a running summary, dropping the oldest lines
+    once it exceeds max_chars.
+
+    Args:
+        summary: Existing summary ("Q: ... / A: ..." lines)
+        messages: Messages being evicted from the verbatim history
+        max_chars: Upper bound on the summary length
+    """
+    lines = summary.splitlines() if summary else []
+    for message in messages:
+        prefix = "Q" if message.get("role") == "user" else "A"
+        text = " ".join(message.get("parts", []))
+        if text:
+            lines.append(f"{prefix}: {_excerpt(text)}")
+
+    while lines and len("\n".join(lines)) > max_chars:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def document_hash(text: str) -> str:
+    """Hash a session is bound to: the contract's document_id."""
+    return document_id(text)
+
+
+class ChatSessionStore:
+    """Chat sessions on top of the two-level cache; their contracts in the document store."""
+
+    def __init__(
+        self,
+        documents: DocumentStore,
+        backend: Optional[CacheBackend] = None,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            documents: Where session contracts are stored (shared with ingestion)
+            backend: Persistent L2 backend (None keeps sessions in memory only)
+            max_entries: Sessions kept in memory (LRU beyond that)
+            ttl_seconds: Idle time after which a session expires
+            clock: Time source (injectable for tests)
+        """
+        self.ttl_seconds = ttl_seconds or settings.chat_session_ttl_seconds
+        self.clock = clock
+        # Sessions are read on every turn; hit counts would double the writes
+        self.sessions = AnalysisCache(
+            backend,
+            max_entries=max_entries or settings.chat_session_max_entries,
+            ttl_seconds=self.ttl_seconds,
+            record_hits=False
+        )
+        self.documents = documents
+        self._created = 0
+
+    async def create(
+        self,
+        document_text: Optional[str] = None,
+        doc_hash: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Start a session for a contract, given its text or the hash of a
+        contract stored by an earlier session.
+
+        Returns:
+            The new session, or None if doc_hash is unknown
+        """
+        if document_text is not None:
+            doc_hash = document_hash(document_text)
+            if await self.documents.get(doc_hash) is None:
+                await self.documents.put(document_text)
+        elif await self.get_document(doc_hash) is None:
+            return None
+
+        now = self.clock()
+        session = {
+            "id": str(uuid.uuid4()),
+            "document_hash": doc_hash,
+            "history": [],
+            "summary": "",
+            "turns": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await self.sessions.set(SESSION_NAMESPACE, session["id"], session)
+        metrics.increment("chat.sessions.created")
+        self._created += 1
+        if self._created % settings.chat_session_purge_every == 0:
+            await self.purge_expired()
+        return session
+
+    async def purge_expired(self) -> int:
+        """Remove sessions idle for longer than the TTL from the L2 backend; return how many."""
+        removed = await self.sessions.purge_expired(SESSION_NAMESPACE, self.ttl_seconds)
+        metrics.increment("chat.sessions.purged", removed)
+        return removed
+
+    async def get(self, session_id: str) -> Optional[Dict]:
+        """Load a session; None if it does not exist or has expired."""
+        session = await self.sessions.get(SESSION_NAMESPACE, session_id)
+        if session is None:
+            return None
+        # L2 entries never expire on their own
+        if self.clock() - session["updated_at"] > self.ttl_seconds:
+            metrics.increment("chat.sessions.expired")
+            return None
+        # Copy so in-flight changes are not visible to other requests until saved
+        return dict(session, history=list(session["history"]))
+
+    async def get_document(self, doc_hash: str) -> Optional[str]:
+        """Get the contract text a session is bound to."""
+        return await self.documents.get(doc_hash)
+
+    async def record_turn(self, session: Dict, question: str, answer: str) -> Dict:
+        """
+        Append a question and answer to a session and save it.
+
+        Messages beyond chat_session_recent_messages are folded into the
+        summary. Concurrent turns on the same session are last-write-wins.
+        """
+        history = session["history"] + [
+            {"role": "user", "parts": [question]},
+            {"role": "model", "parts": [answer]},
+        ]
+        keep = settings.chat_session_recent_messages
+        if len(history) > keep:
+            # Evict whole exchanges so the kept history starts with a question
+            evict = len(history) - keep
+            evict += evict % 2
+            session["summary"] = fold_into_summary(
+                session["summary"],
+                history[:evict],
+                settings.chat_session_summary_chars
+            )
+            history = history[evict:]
+            metrics.increment("chat.sessions.summarized_messages", evict)
+
+        session["history"] = history
+        session["turns"] += 1
+        session["updated_at"] = self.clock()
+        await self.sessions.set(SESSION_NAMESPACE, session["id"], session)
+        return session
@@ -0,0 +1,135 @@
+"""
+Chunking - Section-aware splitting of contract text for map-reduce analysis.
+
+Contracts are split at section headings ("Section 4", "ARTICLE II", "12.3 Fees")
+and paragraph breaks first, then at sentence boundaries for sections that are
+still too large. Sections are packed greedily into chunks, and each chunk after
+the first repeats the tail of its predecessor so clauses cut at a boundary are
+still seen whole by at least one chunk.
+"""
+import re
+from typing import List
+
+
+# Start of a section heading, either at the start of the text, after a
+# paragraph break, or right after the end of a sentence.
+SECTION_HEADING = re.compile(
+    r"(?:^|(?<=\n)|(?<=[.!?:;] ))"
+    r"(?:"
+    r"(?:Section|SECTION|Article|ARTICLE|Clause|CLAUSE)\s+[0-9IVXLC]+\b"
+    r"|\d{1,2}(?:\.\d{1,2})*\.?\s+[A-Z]"
+    r")"
+)
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?;])\s+(?=[A-Z0-9\"'(])")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences on terminal punctuation."""
+    return [s for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
+
+
+def _split_oversized(section: str, max_chars: int) -> List[str]:
+    """Split a section larger than max_chars at sentence boundaries."""
+    pieces: List[str] = []
+    current = ""
+    for sentence in split_sentences(section):
+        # Hard-split pathological sentences with no punctuation
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_sections(text: str, max_chars: int) -> List[str]:
+    """
+    Split contract text into sections no larger than max_chars.
+
+    Args:
+        text: The contract text
+        max_chars: Maximum characters per section
+
+    Returns:
+        List of section strings in document order
+    """
+    sections: List[str] = []
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        starts = [m.start() for m in SECTION_HEADING.finditer(paragraph)]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        bounds = starts + [len(paragraph)]
+        for start, end in zip(bounds, bounds[1:]):
+            section = paragraph[start:end].strip()
+            if not section:
+                continue
+            if len(section) > max_chars:
+                sections.extend(_split_oversized(section, max_chars))
+            else:
+                sections.append(section)
+    return sections
+
+
+def _overlap_tail(text: str, overlap_chars: int) -> str:
+    """Return up to overlap_chars from the end of text, starting on a sentence."""
+    if overlap_chars <= 0 or not text:
+        return ""
+    if len(text) <= overlap_chars:
+        return text
+    tail = text[-overlap_chars:]
+    match = SENTENCE_BOUNDARY.search(tail)
+    return tail[match.end():] if match else tail
+
+
+def pack_chunks(sections: List[str], max_chars: int, overlap_chars: int = 0) -> List[str]:
+    """
+    Pack sections into overlapping chunks.
+
+    Args:
+        sections: Section strings in document order
+        max_chars: Target maximum characters per chunk (excluding overlap)
+        overlap_chars: Characters of the previous chunk repeated at the start
+            of the next one
+
+    Returns:
+        List of chunk strings in document order
+    """
+    chunks: List[str] = []
+    current = ""
+    for section in sections:
+        if current and len(current) + 1 + len(section) > max_chars:
+            chunks.append(current)
+            tail = _overlap_tail(current, overlap_chars)
+            current = f"{tail} {section}" if tail else section
+        else:
+            current = f"{current} {section}" if current else section
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_chunks(text: str, max_chars: int, overlap_chars: int = 0) -> List[str]:
+    """
+    Split contract text into overlapping, section-aware chunks.
+
+    Args:
+        text: The contract text
+        max_chars: Target maximum characters per chunk (excluding overlap)
+        overlap_chars: Characters of the previous chunk repeated at the start
+            of the next one
+
+    Returns:
+        List of chunk strings in document order
+    """
+    return pack_chunks(split_sections(text, max_chars), max_chars, overlap_chars)
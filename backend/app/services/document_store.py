@@ -0,0 +1,271 @@
+"""
+Document Store - Content-addressed storage for ingested document text.
+
+Ingestion stores the sanitized text once and hands the client a document_id
+(the text's SHA-256, the same hash the analysis cache is keyed by). /analyze
+and /chat accept that id instead of the full text, so large documents are
+no longer sent back and forth on every request.
+
+Documents live in an in-process LRU bounded by total size, in front of an
+optional local disk backend that keeps them across restarts and memory
+evictions. Both tiers expire documents that have not been used for the TTL;
+every read extends it.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.exceptions import DocumentNotFoundException
+from app.core.logging import logger
+from app.core.metrics import metrics
+
+
+DOCUMENT_ID = re.compile(r"[0-9a-f]{64}")
+
+
+def document_id(text: str) -> str:
+    """Content address of a document: the SHA-256 of its UTF-8 text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class DocumentBackend(ABC):
+    """Persistent tier of the document store. Methods are blocking."""
+
+    @abstractmethod
+    def get(self, doc_id: str, ttl_seconds: float) -> Optional[str]:
+        """Return the text, or None if missing or unused for longer than ttl_seconds."""
+
+    @abstractmethod
+    def put(self, doc_id: str, text: str) -> None:
+        """Store a document (a no-op apart from refreshing it if already stored)."""
+
+    @abstractmethod
+    def touch(self, doc_id: str) -> None:
+        """Record a use of a document, restarting its TTL."""
+
+    @abstractmethod
+    def delete(self, doc_id: str) -> None:
+        """Remove a document if present."""
+
+    @abstractmethod
+    def purge_expired(self, ttl_seconds: float) -> int:
+        """Remove documents unused for longer than ttl_seconds; return how many."""
+
+
+class DiskDocumentBackend(DocumentBackend):
+    """
+    One UTF-8 file per document, sharded by the first two hex digits of its
+    id. The file's modification time records the last use.
+    """
+
+    def __init__(self, directory: str, clock: Callable[[], float] = time.time):
+        self.directory = directory
+        self.clock = clock
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, doc_id: str) -> str:
+        return os.path.join(self.directory, doc_id[:2], f"{doc_id}.txt")
+
+    def _touch(self, path: str) -> None:
+        now = self.clock()
+        os.utime(path, (now, now))
+
+    def get(self, doc_id: str, ttl_seconds: float) -> Optional[str]:
+        path = self._path(doc_id)
+        try:
+            if os.path.getmtime(path) + ttl_seconds < self.clock():
+                os.unlink(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            self._touch(path)
+            return text
+        except FileNotFoundError:
+            return None
+
+    def put(self, doc_id: str, text: str) -> None:
+        path = self._path(doc_id)
+        if os.path.exists(path):
+            self._touch(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename, so readers never see a partial document
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._touch(path)
+
+    def touch(self, doc_id: str) -> None:
+        try:
+            self._touch(self._path(doc_id))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, doc_id: str) -> None:
+        try:
+            os.unlink(self._path(doc_id))
+        except FileNotFoundError:
+            pass
+
+    def purge_expired(self, ttl_seconds: float) -> int:
+        cutoff = self.clock() - ttl_seconds
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.unlink(path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+
+class DocumentStore:
+    """Size-bounded in-memory LRU of documents, optionally backed by disk."""
+
+    def __init__(
+        self,
+        backend: Optional[DocumentBackend] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            backend: Persistent tier (None keeps documents in memory only)
+            max_bytes: Memory cap for document text held in process
+            ttl_seconds: Time a document is kept after its last use
+            clock: Time source (tests)
+        """
+        self.backend = backend
+        self.max_bytes = max_bytes or settings.document_store_memory_bytes
+        self.ttl_seconds = ttl_seconds or settings.document_store_ttl_seconds
+        self.clock = clock
+        # doc_id -> (expires_at, text, size, last time the backend copy was touched)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    def _remember(self, doc_id: str, text: str) -> None:
+        size = sys.getsizeof(text)
+        with self._lock:
+            previous = self._memory.pop(doc_id, None)
+            if previous:
+                self._bytes -= previous[2]
+            if size > self.max_bytes:
+                return
+            now = self.clock()
+            self._memory[doc_id] = (now + self.ttl_seconds, text, size, now)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted, _) = self._memory.popitem(last=False)
+                self._bytes -= evicted
+                metrics.increment("document_store.evictions")
+
+    def _recall(self, doc_id: str) -> Tuple[Optional[str], bool]:
+        """Text held in memory, and whether the backend copy is due to be touched."""
+        with self._lock:
+            item = self._memory.get(doc_id)
+            if item is None:
+                return None, False
+            expires_at, text, size, touched_at = item
+            now = self.clock()
+            if expires_at < now:
+                del self._memory[doc_id]
+                self._bytes -= size
+                return None, False
+            # Keep the backend copy from expiring while the document is read from
+            # memory, without a disk write on every read
+            stale = now - touched_at > self.ttl_seconds / 4
+            self._memory[doc_id] = (now + self.ttl_seconds, text, size, now if stale else touched_at)
+            self._memory.move_to_end(doc_id)
+            return text, stale
+
+    async def put(self, text: str) -> str:
+        """Store a document and return its id."""
+        doc_id = await asyncio.to_thread(document_id, text)
+        if self.backend is None and sys.getsizeof(text) > self.max_bytes:
+            logger.warning(f"Document {doc_id} exceeds the document store memory cap and is not kept")
+        self._remember(doc_id, text)
+        if self.backend is not None:
+            await asyncio.to_thread(self.backend.put, doc_id, text)
+        metrics.increment("document_store.puts")
+        return doc_id
+
+    async def get(self, doc_id: str) -> Optional[str]:
+        """Return a stored document, or None if it is unknown or expired."""
+        if not DOCUMENT_ID.fullmatch(doc_id or ""):
+            return None
+        text, stale = self._recall(doc_id)
+        if stale and self.backend is not None:
+            await asyncio.to_thread(self.backend.touch, doc_id)
+        if text is None and self.backend is not None:
+            text = await asyncio.to_thread(self.backend.get, doc_id, self.ttl_seconds)
+            if text is not None:
+                self._remember(doc_id, text)
+        metrics.increment("document_store.hits" if text is not None else "document_store.misses")
+        return text
+
+    async def resolve(self, text: Optional[str], doc_id: Optional[str]) -> str:
+        """
+        Text of a request that carries either the text itself or a document_id.
+
+        Raises:
+            DocumentNotFoundException: If the document_id is unknown or expired
+        """
+        if doc_id is None:
+            return text or ""
+        stored = await self.get(doc_id)
+        if stored is None:
+            raise DocumentNotFoundException(doc_id)
+        return stored
+
+    async def delete(self, doc_id: str) -> None:
+        """Remove a document from both tiers."""
+        with self._lock:
+            item = self._memory.pop(doc_id, None)
+            if item:
+                self._bytes -= item[2]
+        if self.backend is not None and DOCUMENT_ID.fullmatch(doc_id or ""):
+            await asyncio.to_thread(self.backend.delete, doc_id)
+
+    async def purge_expired(self) -> int:
+        """Drop expired documents from both tiers; return how many were removed on disk."""
+        now = self.clock()
+        with self._lock:
+            for doc_id in [key for key, item in self._memory.items() if item[0] < now]:
+                self._bytes -= self._memory.pop(doc_id)[2]
+        if self.backend is None:
+            return 0
+        return await asyncio.to_thread(self.backend.purge_expired, self.ttl_seconds)
+
+
+def build_document_store() -> DocumentStore:
+    """Build the document store configured in settings (disk-backed or memory only)."""
+    backend = None
+    if settings.document_store_backend == "disk":
+        try:
+            backend = DiskDocumentBackend(settings.document_store_dir)
+        except OSError as e:
+            logger.warning(f"Document store directory unavailable, keeping documents in memory: {e}")
+    return DocumentStore(backend)
@@ -0,0 +1,171 @@
+"""
+Extraction Pool - Runs CPU-bound PDF/DOCX parsing outside the event loop.
+
+Parsing runs in a pool of worker processes (spawned, so they do not inherit
+the server's threads), which keeps the event loop responsive and uses every
+core. Large PDFs are split into page ranges that are extracted in parallel
+and reassembled in page order.
+
+Each document has one deadline covering page counting and extraction. A
+running task cannot be cancelled, so on timeout the pool's processes are
+terminated and a fresh pool is started on the next call. Other documents
+that were using the old pool are retried once on the new one.
+"""
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.exceptions import IngestionException
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.services.extraction_workers import Source, extract_docx_text, extract_pdf_pages, pdf_page_count
+
+
+Call = Tuple[Callable[..., Any], Tuple[Any, ...]]
+
+
+class ExtractionPool:
+    """Process (or thread) pool for document parsing with per-document deadlines."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        min_pages_per_task: Optional[int] = None,
+        timeout: Optional[float] = None,
+        use_processes: Optional[bool] = None
+    ):
+        """
+        Args:
+            max_workers: Pool size (default: settings.extraction_workers, or one per CPU)
+            min_pages_per_task: Smallest page range given to one task
+            timeout: Seconds allowed per document
+            use_processes: Use worker processes (True) or threads (False)
+        """
+        self.max_workers = max_workers or settings.extraction_workers or os.cpu_count() or 1
+        self.min_pages_per_task = min_pages_per_task or settings.extraction_min_pages_per_task
+        self.timeout = timeout or settings.extraction_timeout_seconds
+        self.use_processes = settings.extraction_use_processes if use_processes is None else use_processes
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.use_processes:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="extraction"
+                    )
+                logger.info(
+                    f"Created extraction pool ({'processes' if self.use_processes else 'threads'}, "
+                    f"max_workers={self.max_workers})"
+                )
+            return self._executor
+
+    def _discard(self, executor: Executor, kill: bool) -> None:
+        """Stop using an executor; with kill, terminate its worker processes."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        if kill and isinstance(executor, ProcessPoolExecutor):
+            # Running tasks cannot be cancelled; terminating the workers is the only way to stop them
+            for process in list(getattr(executor, "_processes", {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, calls: Sequence[Call], deadline: float) -> List[Any]:
+        """Run calls concurrently in the pool and return their results in order."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._get_executor()
+            futures = [loop.run_in_executor(executor, func, *args) for func, args in calls]
+            try:
+                return await asyncio.wait_for(asyncio.gather(*futures), max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                metrics.increment("extraction.timeouts")
+                self._discard(executor, kill=True)
+                raise IngestionException(
+                    f"Document extraction timed out after {self.timeout:.0f}s",
+                    status_code=422
+                )
+            except BrokenProcessPool:
+                # Another document's timeout killed the pool under us
+                self._discard(executor, kill=False)
+                if attempt:
+                    raise IngestionException("Document extraction was interrupted. Please retry.", status_code=503)
+                metrics.increment("extraction.retries")
+
+    def _page_ranges(self, pages: int) -> List[Tuple[int, int]]:
+        """Split pages into contiguous ranges, one per task."""
+        size = max(self.min_pages_per_task, math.ceil(pages / self.max_workers))
+        return [(start, min(start + size, pages)) for start in range(0, pages, size)]
+
+    async def extract_pdf(self, source: Source, max_pages: int) -> List[str]:
+        """
+        Extract the text of every page of a PDF.
+
+        Args:
+            source: PDF bytes or path
+            max_pages: Pages allowed; checked before any text is extracted
+
+        Returns:
+            Page texts in page order
+        """
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        [pages] = await self._run([(pdf_page_count, (source,))], deadline)
+        if pages > max_pages:
+            raise IngestionException(
+                f"PDF too large: {pages} pages. Max allowed is {max_pages}.",
+                status_code=400
+            )
+
+        ranges = self._page_ranges(pages)
+        results = await self._run(
+            [(extract_pdf_pages, (source, start, end)) for start, end in ranges],
+            deadline
+        )
+        metrics.increment("extraction.pdf_pages", pages)
+        return [text for chunk in results for text in chunk]
+
+    async def extract_docx(self, source: Source) -> str:
+        """Extract the text of a DOCX document."""
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        [text] = await self._run([(extract_docx_text, (source,))], deadline)
+        return text
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_extraction_pool: Optional[ExtractionPool] = None
+_extraction_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Get the process-wide extraction pool, creating it on first use."""
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = ExtractionPool()
+        return _extraction_pool
+
+
+def shutdown_extraction_pool() -> None:
+    """Stop the extraction workers (application shutdown)."""
+    with _extraction_pool_lock:
+        if _extraction_pool is not None:
+            _extraction_pool.shutdown()
@@ -0,0 +1,133 @@
+"""
+Extraction Workers - CPU-bound document parsing run inside the extraction pool.
+
+These functions execute in separate processes, so they only import the
+parsing libraries (no settings, logging or Firebase) to keep worker start-up
+cheap. A document source is either the raw bytes or a path to a file.
+Page text is sanitized in the worker, one page at a time, so the server
+process only joins already-clean page strings.
+
+DOCX files are read straight from the zip: each WordprocessingML part is
+stream-parsed and paragraphs are yielded (and freed) as soon as they end,
+so the document object model is never built.
+"""
+import io
+import re
+import zipfile
+from typing import Iterator, List, Union
+from xml.etree import ElementTree
+
+import PyPDF2
+
+
+Source = Union[bytes, str]
+
+
+def sanitize_text(text: str) -> str:
+    """
+    Cleans text for LLM processing.
+    Removes excessive whitespace, non-printable characters.
+    """
+    # Use split/join to avoid potential ReDoS with regex \s+ on very large strings
+    return ' '.join(text.split())
+
+
+def _open(source: Source):
+    return io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+
+
+def pdf_page_count(source: Source) -> int:
+    """Number of pages, read from the page tree without extracting any text."""
+    with _open(source) as stream:
+        return len(PyPDF2.PdfReader(stream).pages)
+
+
+def iter_pdf_pages(reader: PyPDF2.PdfReader, start: int, end: int) -> Iterator[str]:
+    """Yield the sanitized text of pages [start, end), one page at a time."""
+    for i in range(start, min(end, len(reader.pages))):
+        yield sanitize_text(reader.pages[i].extract_text() or "")
+
+
+def extract_pdf_pages(source: Source, start: int, end: int) -> List[str]:
+    """
+    Extract the sanitized text of pages [start, end) of a PDF, one string per
+    page. Given a path, PyPDF2 reads the file lazily instead of loading it.
+    """
+    with _open(source) as stream:
+        return list(iter_pdf_pages(PyPDF2.PdfReader(stream), start, end))
+
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_P, W_T, W_TAB, W_BR, W_CR = W + "p", W + "t", W + "tab", W + "br", W + "cr"
+
+HEADER_PART = re.compile(r"word/header(\d*)\.xml")
+FOOTER_PART = re.compile(r"word/footer(\d*)\.xml")
+NOTE_PARTS = ("word/footnotes.xml", "word/endnotes.xml")
+
+
+def iter_wordml_paragraphs(stream) -> Iterator[str]:
+    """
+    Yield the text of each paragraph of a WordprocessingML part (body,
+    header, footer or notes) in document order, including table cells.
+
+    Finished paragraphs and tables are detached from the tree, so memory
+    stays proportional to the largest block rather than the document.
+    """
+    parts: List[str] = []
+    stack = []
+    for event, elem in ElementTree.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        tag = elem.tag
+        if tag == W_T:
+            parts.append(elem.text or "")
+        elif tag == W_TAB:
+            parts.append("\t")
+        elif tag in (W_BR, W_CR):
+            parts.append("\n")
+        elif tag == W_P:
+            text = "".join(parts)
+            parts.clear()
+            if text.strip():
+                yield text
+        if 0 < len(stack) <= 2:
+            # elem is a block of the part (or of the body); nothing will read it again
+            stack[-1].remove(elem)
+
+
+def _part_order(names: List[str], pattern: "re.Pattern") -> List[str]:
+    numbered = [(int(m.group(1) or 0), name) for name in names if (m := pattern.fullmatch(name))]
+    return [name for _, name in sorted(numbered)]
+
+
+def iter_docx_text(source: Source) -> Iterator[str]:
+    """
+    Yield the paragraphs of a DOCX in reading order: headers, body (with
+    tables), footnotes and endnotes, then footers. Headers and footers that
+    repeat across sections are yielded once.
+    """
+    with _open(source) as stream, zipfile.ZipFile(stream) as archive:
+        names = archive.namelist()
+        groups = [
+            (_part_order(names, HEADER_PART), True),
+            (["word/document.xml"], False),
+            ([name for name in NOTE_PARTS if name in names], False),
+            (_part_order(names, FOOTER_PART), True),
+        ]
+        for part_names, dedupe in groups:
+            seen = set()
+            for name in part_names:
+                with archive.open(name) as part:
+                    for text in iter_wordml_paragraphs(part):
+                        if dedupe:
+                            if text in seen:
+                                continue
+                            seen.add(text)
+                        yield text
+
+
+def extract_docx_text(source: Source) -> str:
+    """Extract the text of a DOCX document, one paragraph per line."""
+    return "\n".join(iter_docx_text(source))
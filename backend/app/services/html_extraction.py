@@ -0,0 +1,304 @@
+"""
+HTML Extraction - Pluggable HTML-to-text backends with boilerplate removal.
+
+Both backends turn a page into the same structure: its title, its links
+(collected from the whole page, so footer links are kept for the policy
+crawler) and its text as a list of blocks in reading order, with headings
+("# Title") and list items ("- item") marked so the document structure
+survives. Boilerplate is removed before the text is read:
+
+- page chrome and non-content elements (scripts, nav, header, footer,
+  forms, hidden elements)
+- overlays and chrome recognised by their id/class (cookie banners, popups,
+  sidebars, menus), outside <main>/<article> only: inside the content the
+  same names are real sections ("How we share your data", id="consent")
+- everything outside <main> when the page has one
+- blocks whose text is mostly link text (menus, link lists, tables of
+  contents), the content-density part of the filtering
+
+"lxml" parses with libxml2 and is the default when lxml is installed;
+"soup" uses BeautifulSoup's pure-Python html.parser.
+"""
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin
+
+from bs4 import BeautifulSoup, Comment, NavigableString
+
+from app.core.config import settings
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml ships with python-docx
+    lxml = None
+
+
+# Elements never read as text
+SKIPPED_TAGS = frozenset({
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "nav", "header", "footer", "aside", "form", "button", "select", "dialog", "head",
+})
+
+SKIPPED_ROLES = frozenset({"navigation", "banner", "contentinfo", "complementary", "dialog", "alertdialog", "search"})
+
+# id/class names of overlays and page chrome, checked outside the main content only
+BOILERPLATE_NAMES = re.compile(
+    r"cookie[-_ ]?(?:banner|consent|notice|bar|popup|modal)|onetrust|\bgdpr[-_]?banner|"
+    r"newsletter|\bpopup\b|\bmodal\b|breadcrumb|sidebar|\bnavbar\b|\bmenu\b|skip[-_]?link",
+    re.I
+)
+
+# Elements holding the main content of a page
+CONTENT_TAGS = frozenset({"main", "article"})
+
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+# Elements that start a new text block; anything else is inline
+BLOCK_TAGS = frozenset({
+    "address", "article", "blockquote", "body", "br", "dd", "div", "dl", "dt", "figcaption",
+    "figure", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "li", "main", "ol", "p", "pre",
+    "section", "table", "tbody", "thead", "tfoot", "tr", "ul",
+})
+
+CELL_TAGS = frozenset({"td", "th"})
+
+# Blocks with more link text than this fraction of their text are dropped: menus
+# ("Home | About | Terms" is ~0.7) go, sentences with a link in them stay
+MAX_LINK_DENSITY = 0.65
+
+START, END, TEXT = "start", "end", "text"
+
+Event = Tuple[str, str]
+
+
+class HtmlDocument:
+    """Text blocks, links and title extracted from an HTML page."""
+
+    def __init__(self, title: str = "", blocks: Optional[List[str]] = None, links: Optional[List[Tuple[str, str]]] = None):
+        self.title = title
+        self.blocks = blocks or []
+        self.links = links or []
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.blocks)
+
+
+def is_content_root(tag: str, attrs: Dict[str, str]) -> bool:
+    """Whether an element holds the main content of the page."""
+    return tag in CONTENT_TAGS or attrs.get("role", "").lower() == "main"
+
+
+def is_boilerplate(tag: str, attrs: Dict[str, str], in_content: bool = False) -> bool:
+    """
+    Whether an element (and everything inside it) is page chrome rather than content.
+
+    Args:
+        tag: Element name
+        attrs: Element attributes
+        in_content: The element is inside <main>/<article>, where id/class
+            names are not taken as a sign of chrome
+    """
+    if tag in SKIPPED_TAGS:
+        return True
+    if attrs.get("role", "").lower() in SKIPPED_ROLES or attrs.get("aria-hidden") == "true":
+        return True
+    if "hidden" in attrs:
+        return True
+    if in_content:
+        return False
+    names = f"{attrs.get('id', '')} {attrs.get('class', '')}"
+    return bool(names.strip()) and bool(BOILERPLATE_NAMES.search(names))
+
+
+def _absolute_link(base_url: str, href: str) -> Optional[str]:
+    link = urldefrag(urljoin(base_url, href.strip())).url
+    return link if link.startswith(("http://", "https://")) else None
+
+
+class _Linearizer:
+    """Builds text blocks from a stream of start/end/text events."""
+
+    def __init__(self):
+        self.blocks: List[str] = []
+        self.parts: List[str] = []
+        self.link_chars = 0
+        self.in_link = 0
+        self.prefixes: List[str] = [""]
+
+    def flush(self) -> None:
+        text = " ".join("".join(self.parts).split())
+        link_chars, self.link_chars = self.link_chars, 0
+        self.parts.clear()
+        if not text:
+            return
+        if link_chars > MAX_LINK_DENSITY * len(text):
+            return
+        self.blocks.append(self.prefixes[-1] + text)
+
+    def feed(self, events: Iterator[Event]) -> List[str]:
+        for kind, value in events:
+            if kind == TEXT:
+                self.parts.append(value)
+                if self.in_link:
+                    self.link_chars += len(" ".join(value.split()))
+            elif kind == START:
+                if value in BLOCK_TAGS:
+                    self.flush()
+                    if value in HEADINGS:
+                        self.prefixes.append("#" * HEADINGS[value] + " ")
+                    elif value == "li":
+                        self.prefixes.append("- ")
+                    else:
+                        self.prefixes.append(self.prefixes[-1])
+                elif value in CELL_TAGS:
+                    if "".join(self.parts).strip():
+                        self.parts.append(" | ")
+                elif value == "a":
+                    self.in_link += 1
+            else:
+                if value in BLOCK_TAGS:
+                    self.flush()
+                    self.prefixes.pop()
+                elif value == "a":
+                    self.in_link = max(0, self.in_link - 1)
+                elif value in CELL_TAGS:
+                    self.parts.append(" ")
+        self.flush()
+        return self.blocks
+
+
+class HtmlExtractor(ABC):
+    """An HTML-to-text backend."""
+
+    name: str
+
+    @abstractmethod
+    def extract(self, content: bytes, base_url: str = "") -> HtmlDocument:
+        """Parse a page into its title, links and text blocks."""
+
+
+class LxmlHtmlExtractor(HtmlExtractor):
+    """libxml2-backed extraction (fast; handles broken markup like browsers do)."""
+
+    name = "lxml"
+
+    def _events(self, root) -> Iterator[Event]:
+        walker = etree.iterwalk(root, events=("start", "end"))
+        skipped = None
+        # Content roots entered so far (the root itself counts)
+        content_depth = 0
+        for action, element in walker:
+            tag = element.tag
+            if action == "start":
+                if element is not root and is_boilerplate(tag, element.attrib, content_depth > 0):
+                    # The walker still reports the end of a skipped element
+                    walker.skip_subtree()
+                    skipped = element
+                    continue
+                if is_content_root(tag, element.attrib):
+                    content_depth += 1
+                yield START, tag
+                if element.text:
+                    yield TEXT, element.text
+            else:
+                if element is skipped:
+                    skipped = None
+                else:
+                    if is_content_root(tag, element.attrib):
+                        content_depth -= 1
+                    yield END, tag
+                if element.tail and element is not root:
+                    yield TEXT, element.tail
+
+    def extract(self, content: bytes, base_url: str = "") -> HtmlDocument:
+        if not content.strip():
+            return HtmlDocument()
+        try:
+            document = lxml.html.document_fromstring(content)
+        except (etree.ParserError, ValueError):
+            return HtmlDocument()
+        # Comments are not walked, and removing them keeps the text that follows them
+        etree.strip_tags(document, etree.Comment, etree.ProcessingInstruction)
+
+        links = []
+        for anchor in document.iter("a"):
+            href = anchor.get("href")
+            link = _absolute_link(base_url, href) if href else None
+            if link:
+                links.append((" ".join(anchor.text_content().split()), link))
+        title = document.find(".//title")
+        title = " ".join(title.text_content().split()) if title is not None else ""
+
+        body = document.find("body")
+        if body is None:
+            return HtmlDocument(title, [], links)
+        main = body.find(".//main")
+        if main is None:
+            main = next(iter(body.xpath(".//*[@role='main']")), None)
+        root = main if main is not None else body
+        return HtmlDocument(title, _Linearizer().feed(self._events(root)), links)
+
+
+class SoupHtmlExtractor(HtmlExtractor):
+    """BeautifulSoup with the pure-Python html.parser (no C dependencies)."""
+
+    name = "soup"
+
+    def _events(self, element, in_content: bool) -> Iterator[Event]:
+        for child in element.children:
+            if isinstance(child, Comment):
+                continue
+            if isinstance(child, NavigableString):
+                yield TEXT, str(child)
+                continue
+            attrs = {
+                key: " ".join(value) if isinstance(value, list) else value
+                for key, value in child.attrs.items()
+            }
+            if is_boilerplate(child.name, attrs, in_content):
+                continue
+            yield START, child.name
+            yield from self._events(child, in_content or is_content_root(child.name, attrs))
+            yield END, child.name
+
+    def extract(self, content: bytes, base_url: str = "") -> HtmlDocument:
+        soup = BeautifulSoup(content, "html.parser")
+        links = []
+        for anchor in soup.find_all("a", href=True):
+            link = _absolute_link(base_url, anchor["href"])
+            if link:
+                links.append((" ".join(anchor.get_text().split()), link))
+        title = " ".join(soup.title.get_text().split()) if soup.title else ""
+
+        root = soup.find("main") or soup.find(attrs={"role": "main"}) or soup.body or soup
+        events = self._events(root, is_content_root(root.name, root.attrs))
+        if root.name in BLOCK_TAGS:
+            events = iter([(START, root.name), *events, (END, root.name)])
+        return HtmlDocument(title, _Linearizer().feed(events), links)
+
+
+HTML_EXTRACTORS = {
+    "lxml": LxmlHtmlExtractor,
+    "soup": SoupHtmlExtractor,
+}
+
+
+def get_html_extractor(name: Optional[str] = None) -> HtmlExtractor:
+    """
+    Build the configured extraction backend.
+
+    Args:
+        name: "lxml", "soup" or "auto" (default: settings.html_extractor);
+            auto picks lxml when it is installed
+    """
+    name = (name or settings.html_extractor).lower()
+    if name == "auto":
+        name = "lxml" if lxml is not None else "soup"
+    if name not in HTML_EXTRACTORS:
+        raise ValueError(f"Unknown HTML extractor: {name}")
+    if name == "lxml" and lxml is None:
+        raise ValueError("The lxml HTML extractor needs the lxml package")
+    return HTML_EXTRACTORS[name]()
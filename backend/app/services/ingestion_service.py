@@ -1,112 +1,120 @@
 import re
-import requests
-from bs4 import BeautifulSoup
-import PyPDF2
-from fastapi import UploadFile, HTTPException
-from typing import Optional
+from typing import Dict, Optional
 from app.core.exceptions import IngestionException
 from app.core.config import settings
 from app.core.logging import logger
+from app.services.extraction_pool import ExtractionPool, get_extraction_pool
+from app.services.extraction_workers import Source, sanitize_text
+from app.services.html_extraction import get_html_extractor
+from app.services.policy_crawler import PolicyCrawler
+from app.services.url_fetcher import FetchedPage, UrlFetcher, get_url_fetcher
 
 
-def sanitize_text(text: str) -> str:
-    """
-    Cleans text for LLM processing.
-    Removes excessive whitespace, non-printable characters.
-    """
-    # Use split/join to avoid potential ReDoS with regex \s+ on very large strings
-    return ' '.join(text.split())
+def html_to_text(content: bytes, base_url: str = "") -> str:
+    """Text of an HTML page without boilerplate, one block (heading, paragraph, list item) per line."""
+    return get_html_extractor().extract(content, base_url).text
+
+
+def page_text(page: FetchedPage) -> str:
+    return html_to_text(page.content, page.url)
 
 
 class IngestionService:
     """Service for extracting text from various document formats."""
     
-    def __init__(self):
+    def __init__(self, pool: Optional[ExtractionPool] = None, fetcher: Optional[UrlFetcher] = None):
         self.max_pdf_pages = settings.max_pdf_pages
+        self.pool = pool or get_extraction_pool()
+        self.fetcher = fetcher or get_url_fetcher()
     
-    async def extract_text_from_pdf(self, file: UploadFile) -> str:
-        """Extract text from PDF file."""
+    async def extract_text_from_pdf(self, source: Source) -> str:
+        """
+        Extract text from a PDF (path or bytes).
+        
+        The page count is checked before any text is extracted; pages are
+        then parsed in parallel in the extraction pool and sanitized one by one.
+        """
         try:
-            logger.info(f"Extracting text from PDF: {file.filename}")
-            reader = PyPDF2.PdfReader(file.file)
+            pages = await self.pool.extract_pdf(source, self.max_pdf_pages)
+            text = " ".join(page for page in pages if page)
             
-            if len(reader.pages) > self.max_pdf_pages:
-                raise IngestionException(
-                    f"PDF too large: {len(reader.pages)} pages. Max allowed is {self.max_pdf_pages}.",
-                    status_code=400
-                )
-            
-            text = ""
-            for i, page in enumerate(reader.pages):
-                extracted = page.extract_text()
-                if extracted:
-                    text += extracted + "\n"
-                logger.debug(f"Page {i}: extracted {len(extracted or '')} chars")
-            
-            logger.info(f"Total PDF extracted chars: {len(text)}")
-            return sanitize_text(text)
+            logger.info(f"Total PDF extracted chars: {len(text)} from {len(pages)} pages")
+            return text
         except IngestionException:
             raise
         except Exception as e:
             logger.error(f"PDF extraction error: {e}", exc_info=True)
             raise IngestionException(f"Failed to read PDF: {str(e)}")
     
-    async def extract_text_from_docx(self, file: UploadFile) -> str:
-        """Extract text from DOCX file."""
-        import docx
-        import io
+    async def extract_text_from_docx(self, source: Source) -> str:
+        """
+        Extract text from a DOCX document (path or bytes), parsed in the extraction pool.
         
+        Headers, tables, footnotes and footers are included, in reading order.
+        """
         try:
-            logger.info(f"Extracting text from DOCX: {file.filename}")
-            content = await file.read()
-            logger.debug(f"Read {len(content)} bytes from {file.filename}")
-            
-            doc = docx.Document(io.BytesIO(content))
-            text = "\n".join([para.text for para in doc.paragraphs])
+            text = await self.pool.extract_docx(source)
             
             logger.info(f"Extracted {len(text)} chars from DOCX")
             return sanitize_text(text)
+        except IngestionException:
+            raise
         except Exception as e:
             logger.error(f"DOCX extraction error: {e}", exc_info=True)
             raise IngestionException(f"Failed to read DOCX: {str(e)}")
     
-    def extract_text_from_url(self, url: str) -> str:
-        """Extract text from URL by scraping."""
+    async def extract_text_from_url(self, url: str) -> str:
+        """
+        Extract text from URL by scraping.
+        
+        The page is fetched over the shared connection pool; an unchanged page
+        (304 on a conditional GET) returns the text extracted last time.
+        Boilerplate (menus, banners, page chrome) is left out and headings and
+        list items are kept on their own lines.
+        """
         try:
             logger.info(f"Extracting text from URL: {url}")
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
-            
-            text = soup.get_text()
+            namespace = f"text:{get_html_extractor().name}"
+            text = await self.fetcher.fetch_extracted(url, page_text, namespace=namespace)
             logger.info(f"Extracted {len(text)} chars from URL")
-            return sanitize_text(text)
-        except requests.RequestException as e:
-            logger.error(f"URL extraction error: {e}", exc_info=True)
-            raise IngestionException(f"Failed to scrape URL: {str(e)}")
+            return text
+        except IngestionException:
+            raise
         except Exception as e:
             logger.error(f"URL extraction error: {e}", exc_info=True)
             raise IngestionException(f"Failed to process URL: {str(e)}")
     
-    async def extract_text_from_file(self, file: UploadFile) -> str:
-        """Extract text from uploaded file based on file extension."""
-        if not file.filename:
+    async def extract_policies_from_url(self, url: str) -> Dict:
+        """
+        Crawl the legal documents (terms, privacy, cookies, refund, acceptable
+        use) linked from a page and combine them into one text.
+        
+        Returns:
+            Dictionary with the combined text and the documents it contains
+        """
+        try:
+            logger.info(f"Crawling policies from URL: {url}")
+            result = await PolicyCrawler(fetcher=self.fetcher).crawl(url)
+            logger.info(f"Crawled {len(result['documents'])} documents, {len(result['text'])} chars")
+            return result
+        except IngestionException:
+            raise
+        except Exception as e:
+            logger.error(f"Policy crawl error: {e}", exc_info=True)
+            raise IngestionException(f"Failed to crawl URL: {str(e)}")
+    
+    async def extract_text_from_file(self, filename: str, source: Source) -> str:
+        """Extract text from an uploaded file based on its extension."""
+        if not filename:
             raise IngestionException("Filename is required")
         
-        filename_lower = file.filename.lower()
+        logger.info(f"Extracting text from {filename}")
+        filename_lower = filename.lower()
         
         if filename_lower.endswith(".pdf"):
-            return await self.extract_text_from_pdf(file)
+            return await self.extract_text_from_pdf(source)
         elif filename_lower.endswith(".docx"):
-            return await self.extract_text_from_docx(file)
+            return await self.extract_text_from_docx(source)
         else:
             raise IngestionException(
                 f"Unsupported file type. Only PDF and DOCX are supported.",
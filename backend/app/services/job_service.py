@@ -0,0 +1,470 @@
+"""
+Job Service - Batch analysis jobs executed by a bounded worker pool.
+
+Submitted documents are persisted in a pluggable JobStore before any work
+starts. The application lifespan starts the service, which re-queues
+everything that had not finished. Workers claim a document atomically
+before running it, so several processes sharing a SQLite store never
+analyze the same document twice; a claim older than
+jobs_claim_timeout_seconds belongs to a worker that died and can be taken
+over. Running services put such documents back in their queue every
+jobs_requeue_interval_seconds, so they do not wait for a restart.
+Workers use the service container's AnalysisService for every document, so
+batch jobs share its LLM client, rate limiter, circuit breaker, model
+router, caches and single-flight coalescing with interactive requests.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.schemas.jurisdiction import Jurisdiction
+from app.services.analysis_service import AnalysisService
+from app.services.ingestion_service import IngestionService
+
+
+# Document states
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+FINISHED_STATES = (COMPLETED, FAILED)
+
+
+class JobStore(ABC):
+    """Persistence interface for jobs and their documents. Methods are blocking."""
+
+    @abstractmethod
+    def create_job(self, job: Dict[str, Any]) -> None:
+        """Store a new job with all of its documents."""
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job with its documents, or None if unknown."""
+
+    @abstractmethod
+    def update_document(self, job_id: str, index: int, **fields: Any) -> None:
+        """Update status, result or error of one document."""
+
+    @abstractmethod
+    def list_unfinished(self) -> List[Tuple[str, int]]:
+        """Return (job_id, index) for every document that has not finished."""
+
+    @abstractmethod
+    def claim_document(self, job_id: str, index: int, stale_before: float) -> Optional[Dict[str, Any]]:
+        """
+        Atomically mark a document running if it is pending, or running with a
+        claim older than stale_before.
+
+        Returns:
+            {"index", "source", "jurisdiction"} of the claimed document (with
+            the job's jurisdiction), or None if another worker has it or it is done
+        """
+
+    @abstractmethod
+    def release_stale(self, stale_before: float) -> List[Tuple[str, int]]:
+        """
+        Mark documents running with a claim older than stale_before pending
+        again, and return their (job_id, index).
+        """
+
+
+class InMemoryJobStore(JobStore):
+    """Process-local job store (state is lost on restart)."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create_job(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = json.loads(json.dumps(job))
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job else None
+
+    def update_document(self, job_id: str, index: int, **fields: Any) -> None:
+        with self._lock:
+            self._jobs[job_id]["documents"][index].update(fields, updated_at=time.time())
+
+    def list_unfinished(self) -> List[Tuple[str, int]]:
+        with self._lock:
+            return [
+                (job_id, doc["index"])
+                for job_id, job in self._jobs.items()
+                for doc in job["documents"]
+                if doc["status"] not in FINISHED_STATES
+            ]
+
+    def claim_document(self, job_id: str, index: int, stale_before: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return None
+            doc = job["documents"][index]
+            stale = doc["status"] == RUNNING and doc.get("updated_at", 0.0) < stale_before
+            if doc["status"] != PENDING and not stale:
+                return None
+            doc.update(status=RUNNING, updated_at=time.time())
+            return {
+                "index": index,
+                "source": json.loads(json.dumps(doc["source"])),
+                "jurisdiction": job["jurisdiction"],
+            }
+
+    def release_stale(self, stale_before: float) -> List[Tuple[str, int]]:
+        with self._lock:
+            released = []
+            for job_id, job in self._jobs.items():
+                for doc in job["documents"]:
+                    if doc["status"] == RUNNING and doc.get("updated_at", 0.0) < stale_before:
+                        doc.update(status=PENDING, updated_at=time.time())
+                        released.append((job_id, doc["index"]))
+            return released
+
+
+class SQLiteJobStore(JobStore):
+    """SQLite-backed job store that survives worker restarts."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    jurisdiction TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_documents (
+                    job_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, idx)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS job_documents_status ON job_documents (status)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create_job(self, job: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, created_at, jurisdiction) VALUES (?, ?, ?)",
+                (job["id"], job["created_at"], job["jurisdiction"])
+            )
+            conn.executemany(
+                "INSERT INTO job_documents (job_id, idx, source, status, result, error, updated_at) "
+                "VALUES (?, ?, ?, ?, NULL, NULL, ?)",
+                [
+                    (job["id"], doc["index"], json.dumps(doc["source"]), doc["status"], job["created_at"])
+                    for doc in job["documents"]
+                ]
+            )
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, created_at, jurisdiction FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if not row:
+                return None
+            documents = conn.execute(
+                "SELECT idx, source, status, result, error FROM job_documents "
+                "WHERE job_id = ? ORDER BY idx",
+                (job_id,)
+            ).fetchall()
+        return {
+            "id": row[0],
+            "created_at": row[1],
+            "jurisdiction": row[2],
+            "documents": [
+                {
+                    "index": idx,
+                    "source": json.loads(source),
+                    "status": status,
+                    "result": json.loads(result) if result else None,
+                    "error": error,
+                }
+                for idx, source, status, result, error in documents
+            ],
+        }
+
+    def update_document(self, job_id: str, index: int, **fields: Any) -> None:
+        columns = {key: fields[key] for key in ("status", "error") if key in fields}
+        if "result" in fields:
+            columns["result"] = json.dumps(fields["result"]) if fields["result"] is not None else None
+        columns["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE job_documents SET {assignments} WHERE job_id = ? AND idx = ?",
+                [*columns.values(), job_id, index]
+            )
+
+    def list_unfinished(self) -> List[Tuple[str, int]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT job_id, idx FROM job_documents WHERE status NOT IN (?, ?) "
+                "ORDER BY updated_at, idx",
+                FINISHED_STATES
+            ).fetchall()
+        return [(job_id, idx) for job_id, idx in rows]
+
+    def claim_document(self, job_id: str, index: int, stale_before: float) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            # One UPDATE decides the race: only one worker's claim changes the row
+            claimed = conn.execute(
+                "UPDATE job_documents SET status = ?, updated_at = ? "
+                "WHERE job_id = ? AND idx = ? AND (status = ? OR (status = ? AND updated_at < ?))",
+                (RUNNING, time.time(), job_id, index, PENDING, RUNNING, stale_before)
+            ).rowcount
+            if not claimed:
+                return None
+            source, jurisdiction = conn.execute(
+                "SELECT d.source, j.jurisdiction FROM job_documents d JOIN jobs j ON j.id = d.job_id "
+                "WHERE d.job_id = ? AND d.idx = ?",
+                (job_id, index)
+            ).fetchone()
+        return {"index": index, "source": json.loads(source), "jurisdiction": jurisdiction}
+
+    def release_stale(self, stale_before: float) -> List[Tuple[str, int]]:
+        released = []
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT job_id, idx FROM job_documents WHERE status = ? AND updated_at < ? "
+                "ORDER BY updated_at, idx",
+                (RUNNING, stale_before)
+            ).fetchall()
+            for job_id, idx in rows:
+                # Conditional, like a claim: another worker may release or claim it first
+                if conn.execute(
+                    "UPDATE job_documents SET status = ?, updated_at = ? "
+                    "WHERE job_id = ? AND idx = ? AND status = ? AND updated_at < ?",
+                    (PENDING, time.time(), job_id, idx, RUNNING, stale_before)
+                ).rowcount:
+                    released.append((job_id, idx))
+        return released
+
+
+def summarize_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Derive overall status and per-status counts for a stored job."""
+    counts: Dict[str, int] = {}
+    for doc in job["documents"]:
+        counts[doc["status"]] = counts.get(doc["status"], 0) + 1
+    if all(doc["status"] in FINISHED_STATES for doc in job["documents"]):
+        status = COMPLETED
+    elif counts.get(PENDING, 0) == len(job["documents"]):
+        status = PENDING
+    else:
+        status = RUNNING
+    return {"status": status, "counts": counts, "total": len(job["documents"])}
+
+
+class JobService:
+    """Accepts batch jobs and runs their documents on a bounded worker pool."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        analysis_service: AnalysisService,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Initialize the job service.
+
+        Args:
+            store: Where jobs and per-document progress are persisted
+            analysis_service: The worker's shared AnalysisService
+            max_workers: Number of documents processed concurrently
+        """
+        self.store = store
+        self.analysis_service = analysis_service
+        self.max_workers = max_workers or settings.jobs_max_workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._requeuer: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers) and not all(worker.done() for worker in self._workers)
+
+    async def start(self) -> None:
+        """Start the worker pool on the running loop and re-queue unfinished work."""
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.ensure_future(self._worker(i)) for i in range(self.max_workers)
+        ]
+        self._requeuer = asyncio.ensure_future(self._requeue_stale())
+
+        # Resume documents left pending (or running, by a worker that died) before
+        # this one started; claims keep live workers from running them twice
+        unfinished = await asyncio.to_thread(self.store.list_unfinished)
+        for job_id, index in unfinished:
+            self._queue.put_nowait((job_id, index))
+        if unfinished:
+            logger.info(f"Queued {len(unfinished)} unfinished job documents")
+
+    async def stop(self) -> None:
+        """Stop the workers; documents they were running go back to pending."""
+        tasks = self._workers + ([self._requeuer] if self._requeuer else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._requeuer = None
+
+    async def submit(
+        self,
+        documents: List[Dict[str, Any]],
+        jurisdiction: Jurisdiction
+    ) -> Dict[str, Any]:
+        """
+        Persist a new job and queue its documents.
+
+        Args:
+            documents: Dicts with 'text' or 'url' and optional 'jurisdiction'
+            jurisdiction: Default jurisdiction for the job
+
+        Returns:
+            The stored job
+        """
+        if not self.running:
+            # Apps without the lifespan (e.g. tests mounting the router) start on first use
+            await self.start()
+        job = {
+            "id": str(uuid.uuid4()),
+            "created_at": time.time(),
+            "jurisdiction": jurisdiction.value,
+            "documents": [
+                {
+                    "index": index,
+                    "source": {
+                        key: (value.value if isinstance(value, Jurisdiction) else value)
+                        for key, value in doc.items() if value is not None
+                    },
+                    "status": PENDING,
+                    "result": None,
+                    "error": None,
+                }
+                for index, doc in enumerate(documents)
+            ],
+        }
+        await asyncio.to_thread(self.store.create_job, job)
+        for doc in job["documents"]:
+            self._queue.put_nowait((job["id"], doc["index"]))
+        metrics.increment("jobs.submitted")
+        metrics.increment("jobs.documents_submitted", len(documents))
+        logger.info(f"Submitted job {job['id']} with {len(documents)} documents")
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a stored job, or None if unknown."""
+        return await asyncio.to_thread(self.store.get_job, job_id)
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job_id, index = await self._queue.get()
+            try:
+                await self._process(job_id, index)
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} crashed on {job_id}[{index}]: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _requeue_stale(self) -> None:
+        """Periodically queue documents whose worker died while running them."""
+        while True:
+            await asyncio.sleep(settings.jobs_requeue_interval_seconds)
+            try:
+                stale_before = time.time() - settings.jobs_claim_timeout_seconds
+                released = await asyncio.to_thread(self.store.release_stale, stale_before)
+            except Exception as e:
+                logger.warning(f"Re-queueing abandoned job documents failed: {e}")
+                continue
+            for job_id, index in released:
+                self._queue.put_nowait((job_id, index))
+            if released:
+                metrics.increment("jobs.documents_requeued", len(released))
+                logger.info(f"Re-queued {len(released)} abandoned job documents")
+
+    async def _process(self, job_id: str, index: int) -> None:
+        stale_before = time.time() - settings.jobs_claim_timeout_seconds
+        document = await asyncio.to_thread(self.store.claim_document, job_id, index, stale_before)
+        if not document:
+            # Finished, or claimed by another worker
+            return
+
+        source = document["source"]
+        try:
+            if source.get("url"):
+                text = await IngestionService().extract_text_from_url(source["url"])
+            else:
+                text = source["text"]
+
+            jurisdiction = Jurisdiction(source.get("jurisdiction") or document["jurisdiction"])
+            result = await self.analysis_service.analyze_contract_text(
+                text=text,
+                jurisdiction=jurisdiction
+            )
+            await asyncio.to_thread(
+                self.store.update_document, job_id, index, status=COMPLETED, result=result, error=None
+            )
+            metrics.increment("jobs.documents_completed")
+        except asyncio.CancelledError:
+            # Shutting down: leave the document for the next worker to start
+            await asyncio.to_thread(self.store.update_document, job_id, index, status=PENDING)
+            raise
+        except Exception as e:
+            logger.warning(f"Job document {job_id}[{index}] failed: {e}")
+            detail = getattr(e, "detail", None) or str(e)
+            await asyncio.to_thread(
+                self.store.update_document, job_id, index, status=FAILED, error=detail
+            )
+            metrics.increment("jobs.documents_failed")
+
+
+def build_job_store() -> JobStore:
+    """Build the job store selected by settings.jobs_store."""
+    if settings.jobs_store.lower() == "sqlite":
+        return SQLiteJobStore(settings.jobs_sqlite_path)
+    return InMemoryJobStore()
+
@@ -0,0 +1,378 @@
+"""
+LLM Client - Async facade over Gemini models.
+
+The google-generativeai SDK calls are blocking, so every call is offloaded to a
+bounded thread pool owned by the model. This keeps the event loop free while a
+slow generation is in flight and caps how many calls hit a single model at once.
+
+Every call runs under a deadline and is retried with jittered backoff on
+transient errors. A per-model circuit breaker fails fast while the provider is
+unhealthy, and (optionally) a slow call is hedged with a backup call once it
+exceeds the model's recent p95 latency.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import google.generativeai as genai
+
+from app.core.config import settings
+from app.core.exceptions import LLMUnavailableException
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.services.resilience import CircuitBreaker, LatencyTracker, backoff_delay, is_retryable
+
+
+# Marks the end of a streamed response on the chunk queue
+_STREAM_END = object()
+
+# One executor per model name, shared by every client of that model
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+# Health and latency state per model name, shared like the executors
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, LatencyTracker] = {}
+_state_lock = threading.Lock()
+
+
+def get_model_concurrency(model_name: str) -> int:
+    """Return the configured concurrency cap for a model."""
+    return settings.llm_model_concurrency.get(model_name, settings.llm_max_concurrency)
+
+
+def _get_executor(model_name: str) -> ThreadPoolExecutor:
+    """Get (or lazily create) the bounded executor for a model."""
+    with _executors_lock:
+        executor = _executors.get(model_name)
+        if executor is None:
+            max_workers = get_model_concurrency(model_name)
+            executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix=f"llm-{model_name}"
+            )
+            _executors[model_name] = executor
+            logger.info(f"Created LLM executor for {model_name} (max_workers={max_workers})")
+        return executor
+
+
+def get_circuit_breaker(model_name: str) -> CircuitBreaker:
+    """Get (or lazily create) the circuit breaker for a model."""
+    with _state_lock:
+        breaker = _breakers.get(model_name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=settings.llm_breaker_failure_threshold,
+                reset_timeout=settings.llm_breaker_reset_seconds
+            )
+            _breakers[model_name] = breaker
+        return breaker
+
+
+def get_latency_tracker(model_name: str) -> LatencyTracker:
+    """Get (or lazily create) the latency tracker for a model."""
+    with _state_lock:
+        tracker = _latencies.get(model_name)
+        if tracker is None:
+            tracker = LatencyTracker()
+            _latencies[model_name] = tracker
+        return tracker
+
+
+class LLMClient:
+    """Async client for a single Gemini model."""
+
+    def __init__(
+        self,
+        model_name: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+        model: Optional[Any] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        hedge: Optional[bool] = None
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            model_name: Gemini model name (also selects the executor)
+            generation_config: Optional generation config for the model
+            model: Pre-built model object (mainly for tests)
+            timeout: Deadline per call in seconds, including retries
+            max_retries: Retries on transient errors
+            hedge: Send a backup call when a call exceeds the p95 latency
+        """
+        self.model_name = model_name
+        self.model = model or genai.GenerativeModel(
+            model_name=model_name,
+            generation_config=generation_config,
+        )
+        self.timeout = settings.llm_timeout_seconds if timeout is None else timeout
+        self.max_retries = settings.llm_max_retries if max_retries is None else max_retries
+        self.hedge = settings.llm_hedge_enabled if hedge is None else hedge
+        self.breaker = get_circuit_breaker(model_name)
+        self.latency = get_latency_tracker(model_name)
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking SDK call on the model's executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(self.model_name), func, *args)
+
+    def _count(self, name: str) -> None:
+        metrics.increment(f"llm.{self.model_name}.{name}")
+
+    def _observe_latency(self, seconds: float) -> None:
+        self.latency.record(seconds)
+        metrics.observe(f"llm.{self.model_name}.latency_ms", seconds * 1000)
+
+    def _check_breaker(self) -> None:
+        """Fail fast while the model's circuit is open."""
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise LLMUnavailableException(
+                f"{self.model_name} is failing, circuit open",
+                retry_after=self.breaker.retry_after()
+            )
+
+    def _record_error(self, error: BaseException) -> bool:
+        """Update the breaker for a failed call and return whether it is retryable."""
+        if is_retryable(error):
+            self.breaker.record_failure()
+            return True
+        # The provider answered (e.g. invalid request), so it is not unhealthy
+        self.breaker.record_success()
+        return False
+
+    async def _call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking SDK call with a deadline, retries and the circuit breaker.
+
+        Raises:
+            LLMUnavailableException: If the circuit is open, the deadline passed
+                or retries were exhausted on transient errors
+        """
+        self._check_breaker()
+        self._count("calls")
+        try:
+            return await self._call_with_retries(func, *args)
+        finally:
+            # Frees a half-open probe slot if the caller was cancelled
+            self.breaker.release()
+
+    async def _call_with_retries(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        attempt = 0
+
+        while True:
+            try:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                # A timed-out SDK call keeps its worker thread until it returns;
+                # the caller is released immediately either way.
+                result = await asyncio.wait_for(self._attempt(func, *args), remaining)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self._count("timeouts")
+                retryable = self._record_error(e)
+                self.latency.record_outcome(not retryable)
+                delay = backoff_delay(attempt, settings.llm_retry_base_delay, settings.llm_retry_max_delay)
+                if (
+                    not retryable
+                    or attempt >= self.max_retries
+                    or loop.time() + delay >= deadline
+                    or not self.breaker.allow()
+                ):
+                    self._count("failures")
+                    if not retryable:
+                        raise
+                    raise LLMUnavailableException(
+                        f"{self.model_name} failed after {attempt + 1} attempt(s): "
+                        f"{type(e).__name__} {e}".rstrip(),
+                        retry_after=self.breaker.retry_after() or None
+                    ) from e
+                attempt += 1
+                self._count("retries")
+                logger.warning(
+                    f"LLM call to {self.model_name} failed ({type(e).__name__}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                self.latency.record_outcome(True)
+                return result
+
+    async def _attempt(self, func: Callable[..., Any], *args: Any) -> Any:
+        """One attempt, hedged with a backup call when it exceeds the p95 latency."""
+        start = time.perf_counter()
+        hedge_after = self.latency.percentile(
+            settings.llm_hedge_percentile, settings.llm_hedge_min_samples
+        ) if self.hedge else None
+
+        if hedge_after is None:
+            result = await self._run(func, *args)
+        else:
+            result = await self._hedged(hedge_after, func, *args)
+        self._observe_latency(time.perf_counter() - start)
+        return result
+
+    async def _hedged(self, hedge_after: float, func: Callable[..., Any], *args: Any) -> Any:
+        """Start a call, add a backup after hedge_after seconds, return the first success."""
+        primary = asyncio.ensure_future(self._run(func, *args))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_after)
+            if done:
+                return primary.result()
+
+            self._count("hedged")
+            backup = asyncio.ensure_future(self._run(func, *args))
+            pending.add(backup)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _generate_sync(self, prompt: str) -> str:
+        response = self.model.generate_content(prompt)
+        return response.text
+
+    def _chat_sync(self, history: List[Dict[str, Any]], message: str) -> str:
+        chat_session = self.model.start_chat(history=history)
+        response = chat_session.send_message(message)
+        return response.text
+
+    def _stream_chat_sync(
+        self,
+        history: List[Dict[str, Any]],
+        message: str,
+        on_chunk: Callable[[str], None],
+        stop: threading.Event
+    ) -> None:
+        chat_session = self.model.start_chat(history=history)
+        for chunk in chat_session.send_message(message, stream=True):
+            if stop.is_set():
+                # Consumer went away; stop pulling tokens we would not use
+                break
+            on_chunk(chunk.text)
+
+    def _stream_generate_sync(
+        self,
+        prompt: str,
+        on_chunk: Callable[[str], None],
+        stop: threading.Event
+    ) -> None:
+        for chunk in self.model.generate_content(prompt, stream=True):
+            if stop.is_set():
+                break
+            on_chunk(chunk.text)
+
+    async def _stream(self, func: Callable[..., None], *args: Any) -> AsyncIterator[str]:
+        """
+        Run a blocking streaming SDK call on the model's executor and yield
+        its text chunks as they arrive.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def on_chunk(text: str) -> None:
+            if not stop.is_set():
+                loop.call_soon_threadsafe(queue.put_nowait, text)
+
+        future = loop.run_in_executor(
+            _get_executor(self.model_name), func, *args, on_chunk, stop
+        )
+        future.add_done_callback(lambda _: queue.put_nowait(_STREAM_END))
+        deadline = loop.time() + self.timeout
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), max(0.0, deadline - loop.time()))
+                if item is _STREAM_END:
+                    break
+                yield item
+            # Surface errors raised by the SDK in the worker thread
+            await future
+        finally:
+            stop.set()
+
+    async def generate(self, prompt: str) -> str:
+        """
+        Generate a single response for a prompt.
+
+        Args:
+            prompt: The full prompt text
+
+        Returns:
+            The response text
+        """
+        return await self._call(self._generate_sync, prompt)
+
+    async def chat(self, history: List[Dict[str, Any]], message: str) -> str:
+        """
+        Start a chat session with history and send one message.
+
+        Args:
+            history: Prior turns as dicts with 'role' and 'parts'
+            message: The message to send
+
+        Returns:
+            The response text
+        """
+        return await self._call(self._chat_sync, history, message)
+
+    async def _stream_call(self, func: Callable[..., None], *args: Any) -> AsyncIterator[str]:
+        """
+        Stream a call's text chunks with the breaker, deadline and metrics.
+
+        Closing the iterator early stops consuming the model stream. Streams
+        are not retried, since chunks may already have been delivered.
+        """
+        self._check_breaker()
+        self._count("calls")
+        start = time.perf_counter()
+        try:
+            # aclosing() propagates an early close down to the worker thread
+            async with aclosing(self._stream(func, *args)) as chunks:
+                async for text in chunks:
+                    yield text
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                self._count("timeouts")
+            self._count("failures")
+            retryable = self._record_error(e)
+            self.latency.record_outcome(not retryable)
+            if retryable:
+                raise LLMUnavailableException(
+                    f"{self.model_name} stream failed: {type(e).__name__} {e}".rstrip(),
+                    retry_after=self.breaker.retry_after() or None
+                ) from e
+            raise
+        finally:
+            # Frees a half-open probe slot if the consumer closed the stream early
+            self.breaker.release()
+        self.breaker.record_success()
+        self.latency.record_outcome(True)
+        self._observe_latency(time.perf_counter() - start)
+
+    def stream_chat(self, history: List[Dict[str, Any]], message: str) -> AsyncIterator[str]:
+        """Like chat(), but yield response text chunks as the model produces them."""
+        return self._stream_call(self._stream_chat_sync, history, message)
+
+    def stream_generate(self, prompt: str) -> AsyncIterator[str]:
+        """Like generate(), but yield response text chunks as the model produces them."""
+        return self._stream_call(self._stream_generate_sync, prompt)
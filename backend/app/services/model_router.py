@@ -0,0 +1,151 @@
+"""
+Model Router - Choose the Gemini model for each analysis, chat or email call.
+
+Short contracts, simple questions and low-severity clauses go to the fast
+model; long inputs, high-risk documents, complex questions and severe clauses
+are escalated to the large model. Either choice fails over to the other model
+when the preferred one looks unhealthy (open circuit, high p95 latency or
+error rate). Recent decisions are kept for the /metrics endpoint.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.services.llm_client import get_circuit_breaker, get_latency_tracker
+from app.services.resilience import OPEN
+
+
+class ModelRouter:
+    """Routes LLM calls between a fast and a large model."""
+
+    def __init__(self, max_decisions: int = 100):
+        """
+        Args:
+            max_decisions: Number of recent decisions kept for inspection
+        """
+        self._decisions: Deque[Dict[str, Any]] = deque(maxlen=max_decisions)
+        self._models_seen: Dict[str, None] = {}
+        self._lock = threading.Lock()
+
+    def model_health(self, model_name: str) -> Dict[str, Any]:
+        """Observed health of a model: p95 latency, error rate and circuit state."""
+        tracker = get_latency_tracker(model_name)
+        p95 = tracker.percentile(0.95, settings.routing_min_samples)
+        return {
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": tracker.error_rate(settings.routing_min_samples),
+            "circuit": get_circuit_breaker(model_name).state,
+            "samples": len(tracker),
+        }
+
+    def unhealthy_reason(self, model_name: str) -> Optional[str]:
+        """Why a model should be avoided, or None if it looks healthy."""
+        health = self.model_health(model_name)
+        if health["circuit"] == OPEN:
+            return "circuit_open"
+        if health["p95_ms"] is not None and health["p95_ms"] > settings.routing_failover_p95_ms:
+            return "slow"
+        if (
+            health["error_rate"] is not None
+            and health["error_rate"] > settings.routing_failover_error_rate
+        ):
+            return "errors"
+        return None
+
+    def _choose(self, task: str, preferred: str, alternate: str, reason: str) -> str:
+        """Pick preferred unless it is unhealthy and alternate is not; record the decision."""
+        model = preferred
+        failover = None
+        if alternate != preferred:
+            failover = self.unhealthy_reason(preferred)
+            if failover and self.unhealthy_reason(alternate) is None:
+                model = alternate
+                reason = f"failover:{failover}"
+                metrics.increment("router.failovers")
+                logger.warning(f"Routing {task} to {alternate}: {preferred} is {failover}")
+
+        metrics.increment(f"router.{task}.{model}")
+        with self._lock:
+            self._models_seen[preferred] = None
+            self._models_seen[alternate] = None
+            self._decisions.append({
+                "task": task,
+                "model": model,
+                "preferred": preferred,
+                "reason": reason,
+                "at": time.time(),
+            })
+        return model
+
+    def _route(self, task: str, escalate: bool, reason: str, default_model: str) -> str:
+        if not settings.model_routing_enabled:
+            return default_model
+        fast, large = settings.gemini_model_fast, settings.gemini_model_large
+        if escalate:
+            return self._choose(task, large, fast, reason)
+        return self._choose(task, fast, large, reason)
+
+    @staticmethod
+    def _analysis_escalation(input_chars: int, max_risk_score: float) -> Tuple[bool, str]:
+        if input_chars >= settings.routing_long_input_chars:
+            return True, "long_input"
+        if max_risk_score >= settings.routing_high_risk_score:
+            return True, "high_risk"
+        return False, "short_input"
+
+    def route_analysis(self, input_chars: int, max_risk_score: float = 0.0) -> str:
+        """
+        Choose the model for a contract analysis.
+
+        Args:
+            input_chars: Characters in the document's sections
+            max_risk_score: Highest local triage score among those sections
+        """
+        escalate, reason = self._analysis_escalation(input_chars, max_risk_score)
+        return self._route("analysis", escalate, reason, settings.gemini_model_analysis)
+
+    def preferred_analysis_model(self, input_chars: int, max_risk_score: float = 0.0) -> str:
+        """The model route_analysis picks for these inputs when it does not fail over."""
+        if not settings.model_routing_enabled:
+            return settings.gemini_model_analysis
+        escalate, _ = self._analysis_escalation(input_chars, max_risk_score)
+        return settings.gemini_model_large if escalate else settings.gemini_model_fast
+
+    def route_chat(self, question: str) -> str:
+        """
+        Choose the model for a chat answer.
+
+        Chat sends only the passages retrieved for the question (a few
+        thousand characters at most), so only the question decides.
+        """
+        if len(question) > settings.routing_complex_question_chars:
+            return self._route("chat", True, "complex_question", settings.gemini_model_chat)
+        return self._route("chat", False, "simple_question", settings.gemini_model_chat)
+
+    def route_email(self, severity_score: int) -> str:
+        """Choose the model for a negotiation email about a clause of the given severity."""
+        if severity_score >= settings.routing_high_severity:
+            return self._route("email", True, "high_severity", settings.gemini_model_chat)
+        return self._route("email", False, "low_severity", settings.gemini_model_chat)
+
+    def recent_decisions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._decisions)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Routing state for the metrics endpoint."""
+        with self._lock:
+            models = list(self._models_seen)
+        return {
+            "enabled": settings.model_routing_enabled,
+            "models": {model: self.model_health(model) for model in models},
+            "recent_decisions": self.recent_decisions(),
+        }
+
+
+# Global router instance
+model_router = ModelRouter()
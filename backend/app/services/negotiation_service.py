@@ -2,24 +2,34 @@
 Negotiation Service - Handles conversion from ClauseAnalysis to Negotiation objects
 and enhanced email generation with full clause context.
 """
-from typing import Dict, Optional
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Dict, Optional
 import datetime
 import uuid
 import google.generativeai as genai
 from firebase_admin import firestore
 
 from app.core.config import settings
+from app.core.exceptions import LLMUnavailableException
 from app.core.logging import logger
 from app.schemas.analysis import ClauseAnalysis
+from app.services.llm_client import LLMClient
+from app.services.model_router import model_router
 
 
 class NegotiationService:
     """Service for managing negotiations and email generation."""
     
-    def __init__(self, api_key: Optional[str] = None, db: Optional[firestore.Client] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        db: Optional[firestore.Client] = None,
+        llm_factory: Optional[Callable[[str], LLMClient]] = None
+    ):
         """Initialize the negotiation service."""
         self.api_key = api_key or settings.google_api_key
         self.db = db
+        self.llm_factory = llm_factory or LLMClient
         
         if self.api_key:
             genai.configure(api_key=self.api_key)
@@ -65,31 +75,10 @@ class NegotiationService:
             "last_updated": datetime.datetime.now()
         }
     
-    def generate_email_content(
-        self,
-        clause: ClauseAnalysis,
-        company_name: str,
-        tone: str = "firm"
-    ) -> str:
-        """
-        Generate email content with redline proposal (rewritten clause) using full clause context.
-        
-        Args:
-            clause: Full ClauseAnalysis object with all context
-            company_name: Name of the company
-            tone: Email tone (firm, polite, aggressive)
-            
-        Returns:
-            Generated email content as string with rewritten clause proposal
-        """
-        if not self.api_key:
-            raise ValueError("Google API key is required for email generation")
-        
-        try:
-            model = genai.GenerativeModel(settings.gemini_model_chat)
-            
-            # Enhanced prompt with redline feature - rewrite clause AND draft email
-            prompt = f"""You are a consumer rights lawyer. Your task has TWO parts:
+    def _email_prompt(self, clause: ClauseAnalysis, company_name: str, tone: str) -> str:
+        """Build the redline-and-email prompt for a clause."""
+        # Enhanced prompt with redline feature - rewrite clause AND draft email
+        return f"""You are a consumer rights lawyer. Your task has TWO parts:
 
 PART 1: REWRITE THE CLAUSE
 Rewrite the following predatory clause to be fair and balanced, protecting consumer rights while maintaining the company's legitimate business interests.
@@ -132,9 +121,56 @@ BODY:
 
 The email should be concise, cite relevant consumer protection laws, and propose the rewritten clause as a solution.
 """
+    
+    async def generate_email_content(
+        self,
+        clause: ClauseAnalysis,
+        company_name: str,
+        tone: str = "firm"
+    ) -> str:
+        """
+        Generate email content with redline proposal (rewritten clause) using full clause context.
+        
+        Args:
+            clause: Full ClauseAnalysis object with all context
+            company_name: Name of the company
+            tone: Email tone (firm, polite, aggressive)
             
-            response = model.generate_content(prompt)
-            return response.text
+        Returns:
+            Generated email content as string with rewritten clause proposal
+        """
+        if not self.api_key:
+            raise ValueError("Google API key is required for email generation")
+        
+        try:
+            llm = self.llm_factory(model_router.route_email(clause.severity_score))
+            return await llm.generate(self._email_prompt(clause, company_name, tone))
+        except LLMUnavailableException:
+            raise
+        except Exception as e:
+            logger.error(f"Email generation error: {e}", exc_info=True)
+            raise ValueError(f"Failed to generate email: {str(e)}")
+    
+    async def stream_email_content(
+        self,
+        clause: ClauseAnalysis,
+        company_name: str,
+        tone: str = "firm"
+    ) -> AsyncIterator[str]:
+        """
+        Like generate_email_content(), but yield the email text as the model
+        produces it. Closing the iterator early stops the generation.
+        """
+        if not self.api_key:
+            raise ValueError("Google API key is required for email generation")
+        
+        llm = self.llm_factory(model_router.route_email(clause.severity_score))
+        try:
+            async with aclosing(llm.stream_generate(self._email_prompt(clause, company_name, tone))) as chunks:
+                async for text in chunks:
+                    yield text
+        except LLMUnavailableException:
+            raise
         except Exception as e:
             logger.error(f"Email generation error: {e}", exc_info=True)
             raise ValueError(f"Failed to generate email: {str(e)}")
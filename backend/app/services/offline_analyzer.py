@@ -0,0 +1,219 @@
+"""
+Offline Analyzer - Deterministic rule-based analysis used when Gemini is unavailable.
+
+The contract is segmented into sections and sentences; sentences that match
+the triage risk lexicon become clauses. Each clause is classified by its
+strongest risk family, explained with a small bundled lexicon, and its
+severity is raised to the floor required by the jurisdiction's legal
+references (Jurisdiction.get_legal_references). Results are marked degraded.
+"""
+import re
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from app.schemas.jurisdiction import Jurisdiction
+from app.services.chunking import split_sections, split_sentences
+from app.services.triage import RISK_FAMILIES, match_families
+
+
+# family -> (base severity, simplified explanation, legal context, actionable step)
+FAMILY_GUIDANCE: Dict[str, Tuple[int, str, str, str]] = {
+    "arbitration": (
+        7,
+        "Disputes go to a private arbitrator instead of a court.",
+        "Mandatory arbitration limits your access to courts and public remedies.",
+        "Look for an arbitration opt-out window (often 30 days) and use it.",
+    ),
+    "class_action_waiver": (
+        8,
+        "You give up the right to join a class action or have a jury trial.",
+        "Class action and jury waivers remove collective remedies for small, widespread harms.",
+        "Opt out of arbitration if allowed; keep records in case of a dispute.",
+    ),
+    "auto_renewal": (
+        6,
+        "Your subscription keeps charging you until you actively cancel.",
+        "Auto-renewal terms usually require clear disclosure and an easy way to cancel.",
+        "Note the renewal date and how to cancel before you are charged again.",
+    ),
+    "fees": (
+        5,
+        "You may pay fees you cannot get back, or prices may change.",
+        "Non-refundable or changeable fees can conflict with consumer protection rules.",
+        "Check the refund policy and keep receipts of every payment.",
+    ),
+    "data_sale": (
+        8,
+        "They can sell or share your personal data with other companies.",
+        "Selling or sharing personal data generally requires notice and an opt-out or consent.",
+        "Use the 'Do Not Sell or Share' or privacy settings to opt out.",
+    ),
+    "tracking": (
+        4,
+        "They track you with cookies, identifiers or location data.",
+        "Tracking technologies usually require disclosure and, in some places, consent.",
+        "Review cookie and privacy settings and disable what you do not need.",
+    ),
+    "irrevocable_license": (
+        7,
+        "They get broad, permanent rights to use your content.",
+        "Irrevocable, perpetual licences go beyond what is needed to operate a service.",
+        "Avoid uploading content you want to keep control of; ask to limit the licence.",
+    ),
+    "liability_waiver": (
+        6,
+        "They take little or no responsibility if something goes wrong.",
+        "Blanket liability exclusions may be unenforceable against consumers in some jurisdictions.",
+        "Check local consumer protection law; keep evidence if you suffer a loss.",
+    ),
+    "unilateral_changes": (
+        6,
+        "They can change the rules at any time, sometimes without telling you.",
+        "One-sided changes without notice can be unfair contract terms.",
+        "Watch for update emails and review changes before continuing to use the service.",
+    ),
+    "termination": (
+        5,
+        "They can close or suspend your account whenever they want.",
+        "Termination without cause or notice can cost you access to paid services and data.",
+        "Export your data regularly and keep copies of anything important.",
+    ),
+}
+
+# (phrase in the jurisdiction's legal references, families it governs).
+# When the phrase appears, the reference sentence sets a severity floor.
+JURISDICTION_RULES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("sale of personal data", ("data_sale",)),
+    ("data processing without explicit consent", ("data_sale", "tracking")),
+    ("data protection principles", ("data_sale", "tracking")),
+    ("arbitration clauses", ("arbitration", "class_action_waiver")),
+    ("auto-renewal", ("auto_renewal",)),
+    ("limit liability for data breaches", ("liability_waiver",)),
+    ("limiting gdpr rights", ("unilateral_changes", "liability_waiver")),
+]
+
+# Severity floor used when a reference sentence has no explicit range
+DEFAULT_RULE_FLOOR = 7
+
+# Longest clause text kept from a section
+MAX_CLAUSE_CHARS = 600
+
+SEVERITY_RANGE = re.compile(r"\((\d+)\s*-\s*\d+\)")
+
+
+def _reference_sentences(references: str) -> List[str]:
+    return [s.strip() for s in re.split(r"(?<=\.)\s+", references) if s.strip()]
+
+
+def jurisdiction_floors(jurisdiction: Jurisdiction) -> Dict[str, Tuple[int, str]]:
+    """
+    Derive per-family severity floors from the jurisdiction's legal references.
+
+    Returns:
+        Mapping of family to (minimum severity, reference sentence)
+    """
+    references = Jurisdiction.get_legal_references(jurisdiction)
+    sentences = _reference_sentences(references)
+    floors: Dict[str, Tuple[int, str]] = {}
+    for phrase, families in JURISDICTION_RULES:
+        sentence = next((s for s in sentences if phrase in s.lower()), None)
+        if not sentence:
+            continue
+        match = SEVERITY_RANGE.search(sentence)
+        floor = int(match.group(1)) if match else DEFAULT_RULE_FLOOR
+        for family in families:
+            if floors.get(family, (0, ""))[0] < floor:
+                floors[family] = (floor, sentence)
+    return floors
+
+
+def _strongest_family(counts: Dict[str, int]) -> str:
+    """The family with the highest weighted hit count (ties broken by name)."""
+    return max(counts, key=lambda family: (RISK_FAMILIES[family][1] * counts[family], family))
+
+
+def _clause_text(section: str) -> Optional[str]:
+    """The risky sentences of a section, trimmed to MAX_CLAUSE_CHARS."""
+    risky = [sentence for sentence in split_sentences(section) if match_families(sentence)]
+    if not risky:
+        return None
+    text = " ".join(risky)
+    if len(text) > MAX_CLAUSE_CHARS:
+        text = text[:MAX_CLAUSE_CHARS].rsplit(" ", 1)[0] + "..."
+    return text
+
+
+class OfflineAnalyzer:
+    """Rule-based contract analyzer with no external dependencies."""
+
+    def __init__(self, section_chars: int = 1500):
+        """
+        Args:
+            section_chars: Maximum characters per analyzed section
+        """
+        self.section_chars = section_chars
+
+    def analyze_clauses(self, text: str, jurisdiction: Jurisdiction) -> List[Dict]:
+        """
+        Find and classify risky clauses.
+
+        Args:
+            text: The contract text
+            jurisdiction: Jurisdiction whose rules set severity floors
+
+        Returns:
+            Clause dictionaries matching the ClauseAnalysis schema
+        """
+        floors = jurisdiction_floors(jurisdiction)
+        clauses: List[Dict] = []
+
+        for section in split_sections(text, self.section_chars):
+            counts = match_families(section)
+            if not counts:
+                continue
+            clause_text = _clause_text(section)
+            if not clause_text:
+                continue
+
+            family = _strongest_family(counts)
+            base, explanation, legal_context, action = FAMILY_GUIDANCE[family]
+            # Each additional risk family in the same clause compounds the risk
+            severity = min(10, base + len(counts) - 1)
+            floor, reference = max(
+                (floors[f] for f in counts if f in floors),
+                default=(0, "")
+            )
+            if floor > severity:
+                severity = floor
+            if reference:
+                legal_context = f"{legal_context} {jurisdiction.value}: {reference}"
+
+            clauses.append({
+                "id": str(uuid.uuid5(uuid.NAMESPACE_URL, clause_text)),
+                "clause_text": clause_text,
+                "category": RISK_FAMILIES[family][0],
+                "simplified_explanation": explanation,
+                "severity_score": severity,
+                "legal_context": legal_context,
+                "actionable_step": action,
+                "flags": ["Red Flag" if severity >= 7 else "Review", "Offline Analysis"],
+            })
+
+        return clauses
+
+    def build_summary(self, clauses: List[Dict]) -> str:
+        """Short, clearly degraded document summary."""
+        prefix = (
+            "⚠️ OFFLINE ANALYSIS: The AI service is unavailable, so this result was "
+            "produced by local rules and may miss nuance."
+        )
+        if not clauses:
+            return f"{prefix} No common risk indicators were found."
+        categories = list(dict.fromkeys(
+            clause["category"]
+            for clause in sorted(clauses, key=lambda c: -c["severity_score"])
+        ))
+        return (
+            f"{prefix} Found {len(clauses)} potential issue(s), most serious in: "
+            f"{', '.join(categories[:3])}."
+        )
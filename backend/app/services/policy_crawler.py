@@ -0,0 +1,183 @@
+"""
+Policy Crawler - Collect a site's legal documents from a homepage or signup URL.
+
+Legal links (terms, privacy, cookies, refund, acceptable use) usually sit in
+a page's navigation and footer. The crawler finds them, fetches them
+concurrently through the shared URL fetcher (level by level, up to a maximum
+depth and with a per-host concurrency limit), and combines the pages into one
+text with a section per document. Pages reached twice (redirects, duplicate
+links) are kept once, and text blocks repeated across documents (cookie
+banners, copyright lines) only in the first document that has them.
+"""
+import asyncio
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.core.exceptions import IngestionException
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.services.html_extraction import get_html_extractor
+from app.services.url_fetcher import FetchedPage, UrlFetcher, get_url_fetcher
+
+
+# (kind, section title, pattern matched against the link text and URL path), in priority order
+POLICY_KINDS: List[Tuple[str, str, "re.Pattern"]] = [
+    ("privacy", "Privacy Policy", re.compile(r"privacy|data[ _-]?protection|gdpr", re.I)),
+    ("cookies", "Cookie Policy", re.compile(r"cookie", re.I)),
+    ("refund", "Refund Policy", re.compile(r"refund|return[ _-]?policy|cancellation[ _-]?policy", re.I)),
+    ("acceptable_use", "Acceptable Use Policy", re.compile(r"acceptable[ _-]?use|\baup\b|community[ _-]?guidelines", re.I)),
+    ("terms", "Terms of Service", re.compile(r"terms|conditions|\btos\b|user[ _-]?agreement|\beula\b", re.I)),
+    ("legal", "Legal", re.compile(r"\blegal\b", re.I)),
+]
+
+POLICY_TITLES = {kind: title for kind, title, _ in POLICY_KINDS}
+
+# Second-level labels that country-code registries sell names under
+# (example.co.uk, example.com.au); a short stand-in for the public suffix list
+PUBLIC_SECOND_LEVEL = frozenset({"ac", "co", "com", "edu", "gob", "gov", "ltd", "net", "ne", "or", "org", "plc"})
+
+
+def classify_link(text: str, url: str) -> Optional[str]:
+    """Kind of legal document a link points to, or None."""
+    haystack = f"{text} {urlparse(url).path}"
+    for kind, _, pattern in POLICY_KINDS:
+        if pattern.search(haystack):
+            return kind
+    return None
+
+
+def _site(host: str) -> str:
+    """
+    Registrable part of a host name: the public suffix plus one label.
+
+    Suffixes are approximated as the top-level domain, or two labels when a
+    country-code domain sells names under a generic second level. IP
+    addresses are their own site.
+    """
+    labels = host.lower().rstrip(".").split(".")
+    if labels[-1].isdigit():
+        return host
+    size = 2
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in PUBLIC_SECOND_LEVEL:
+        size = 3
+    return ".".join(labels[-size:])
+
+
+def parse_policy_page(page: FetchedPage) -> Dict:
+    """
+    Split a page into text blocks and the absolute URLs of its links.
+
+    Links are collected from the whole page (footers included); text blocks
+    leave out boilerplate.
+    """
+    document = get_html_extractor().extract(page.content, page.url)
+    return {"url": page.url, "title": document.title, "blocks": document.blocks, "links": document.links}
+
+
+class PolicyCrawler:
+    """Finds and fetches the legal documents linked from a page."""
+
+    def __init__(
+        self,
+        fetcher: Optional[UrlFetcher] = None,
+        max_depth: Optional[int] = None,
+        max_documents: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None
+    ):
+        self.fetcher = fetcher or get_url_fetcher()
+        self.max_depth = max_depth if max_depth is not None else settings.crawl_max_depth
+        self.max_documents = max_documents or settings.crawl_max_documents
+        self.per_host_concurrency = per_host_concurrency or settings.crawl_per_host_concurrency
+
+    async def _fetch(self, url: str, host_limits: Dict[str, asyncio.Semaphore]) -> Dict:
+        host = urlparse(url).hostname or ""
+        limit = host_limits.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        async with limit:
+            namespace = f"policy_page:{get_html_extractor().name}"
+            return await self.fetcher.fetch_extracted(url, parse_policy_page, namespace=namespace)
+
+    async def crawl(self, url: str) -> Dict:
+        """
+        Crawl the legal documents linked from url.
+
+        Args:
+            url: A homepage, signup page or policy page
+
+        Returns:
+            Dictionary with the combined text and the documents it contains
+            ({url, kind, title, chars}), in the order they were found
+
+        Raises:
+            IngestionException: If the start page cannot be fetched
+        """
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        start = await self._fetch(url, host_limits)
+        site = _site(urlparse(start["url"]).hostname or "")
+        visited = {url, start["url"]}
+        pages: List[Tuple[str, Dict]] = []
+
+        start_kind = classify_link(start["title"], start["url"])
+        if start_kind:
+            pages.append((start_kind, start))
+
+        level = [start]
+        for depth in range(1, self.max_depth + 1):
+            candidates: List[Tuple[str, str]] = []
+            for page in level:
+                for text, link in page["links"]:
+                    kind = classify_link(text, link)
+                    if not kind or link in visited or _site(urlparse(link).hostname or "") != site:
+                        continue
+                    visited.add(link)
+                    candidates.append((kind, link))
+            candidates = candidates[:max(0, self.max_documents - len(pages))]
+            if not candidates:
+                break
+
+            results = await asyncio.gather(
+                *(self._fetch(link, host_limits) for _, link in candidates),
+                return_exceptions=True
+            )
+            level = []
+            for (kind, link), result in zip(candidates, results):
+                if isinstance(result, Exception):
+                    metrics.increment("crawl.pages_failed")
+                    logger.warning(f"Skipping policy page {link}: {getattr(result, 'detail', result)}")
+                    continue
+                metrics.increment("crawl.pages_fetched")
+                level.append(result)
+                pages.append((kind, result))
+            logger.info(f"Crawl of {url}: depth {depth} fetched {len(level)} of {len(candidates)} pages")
+
+        if not pages:
+            # No legal links: the page itself is the document
+            pages.append(("page", start))
+        return combine_documents(pages)
+
+
+def combine_documents(pages: List[Tuple[str, Dict]]) -> Dict:
+    """Join crawled pages into one text, one section per distinct document."""
+    seen_urls, seen_pages, seen_blocks = set(), set(), set()
+    sections, documents = [], []
+    for kind, page in pages:
+        digest = hashlib.sha256("\n".join(page["blocks"]).encode()).hexdigest()
+        if page["url"] in seen_urls or digest in seen_pages:
+            continue
+        seen_urls.add(page["url"])
+        seen_pages.add(digest)
+
+        blocks = [block for block in page["blocks"] if block not in seen_blocks]
+        seen_blocks.update(blocks)
+        if not blocks:
+            continue
+        title = POLICY_TITLES.get(kind) or page["title"] or page["url"]
+        body = "\n".join(blocks)
+        sections.append(f"## {title}\nSource: {page['url']}\n\n{body}")
+        documents.append({"url": page["url"], "kind": kind, "title": title, "chars": len(body)})
+
+    if not documents:
+        raise IngestionException("No text found on the crawled pages")
+    return {"text": "\n\n".join(sections), "documents": documents}
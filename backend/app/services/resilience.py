@@ -0,0 +1,172 @@
+"""
+Resilience - Building blocks for calls to an unreliable provider.
+
+CircuitBreaker fails fast while a provider keeps failing and lets a single
+probe call through after a cool-down. LatencyTracker keeps a window of recent
+latencies so callers can hedge requests that exceed a percentile, and
+backoff_delay computes jittered exponential retry delays.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+
+# Errors worth retrying: throttling, transient server errors and timeouts
+RETRYABLE_EXCEPTIONS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,
+    asyncio.TimeoutError,
+    ConnectionError,
+)
+
+# Circuit states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an error is transient and the call may be retried."""
+    return isinstance(error, RETRYABLE_EXCEPTIONS)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt: Zero-based retry number
+        base: Delay before the first retry
+        cap: Maximum delay
+
+    Returns:
+        A random delay between 0 and min(cap, base * 2 ** attempt)
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe."""
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe is allowed
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until a probe call will be allowed (0 if not open)."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def allow(self) -> bool:
+        """Whether a call may proceed. In half-open state only one probe runs at a time."""
+        with self._lock:
+            state = self._state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Give up a probe slot without a verdict (e.g. the call was cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                # A failed probe re-opens the circuit for another full timeout
+                self._opened_at = self._clock()
+            self._probing = False
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies and outcomes."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Latency at the given fraction (0-1) of the window.
+
+        Returns:
+            The latency in seconds, or None with fewer than min_samples samples
+        """
+        with self._lock:
+            if len(self._samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(fraction * len(ordered)))
+        return ordered[index]
+
+    def record_outcome(self, success: bool) -> None:
+        with self._lock:
+            self._outcomes.append(success)
+
+    def error_rate(self, min_samples: int = 1) -> Optional[float]:
+        """
+        Fraction of failed calls in the window.
+
+        Returns:
+            The error rate, or None with fewer than min_samples outcomes
+        """
+        with self._lock:
+            if len(self._outcomes) < max(1, min_samples):
+                return None
+            return self._outcomes.count(False) / len(self._outcomes)
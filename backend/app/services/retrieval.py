@@ -0,0 +1,138 @@
+"""
+Retrieval - Local BM25 passage search over a contract for chat.
+
+The contract is split into section-aware passages once and indexed with an
+inverted index (term -> postings). Indexes are cached by document hash, so
+later turns of a conversation only pay for scoring the question. Only the
+top-k passages are sent to the model, and they are returned as citations.
+"""
+import hashlib
+import math
+import re
+from typing import Dict, FrozenSet, List, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.cache import TTLCache
+from app.services.chunking import pack_chunks, split_sections
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Common English and question words that carry no retrieval signal
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can could do does
+for from had has have how i if in into is it its may me might must my no not
+of on or our shall should so such than that the their them then there these
+they this to under upon us was we what when where which while who why will
+with would you your
+""".split())
+
+
+def tokenize(text: str, stopwords: FrozenSet[str] = STOPWORDS) -> List[str]:
+    """Lowercase word tokens without stopwords, with plural 's' stripped."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in stopwords:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of passages."""
+
+    def __init__(self, passages: List[str], k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            passages: Passage texts in document order
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths: List[int] = []
+
+        for index, passage in enumerate(passages):
+            counts: Dict[str, int] = {}
+            tokens = tokenize(passage)
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                self.postings.setdefault(token, []).append((index, count))
+            self.lengths.append(len(tokens))
+
+        total = len(passages)
+        self.avg_length = (sum(self.lengths) / total) if total else 0.0
+        self.idf = {
+            token: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for token, postings in self.postings.items()
+        }
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        Score passages against a query.
+
+        Returns:
+            Up to k (passage index, score) pairs with a positive score, best first
+        """
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = self.idf[token]
+            for index, tf in postings:
+                norm = 1 - self.b + self.b * self.lengths[index] / (self.avg_length or 1)
+                scores[index] = scores.get(index, 0.0) + idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+def build_passages(text: str, max_chars: int) -> List[str]:
+    """Split a contract into passages, merging small adjacent sections."""
+    return pack_chunks(split_sections(text, max_chars), max_chars)
+
+
+_index_cache = TTLCache(
+    max_entries=settings.chat_index_cache_entries,
+    ttl_seconds=settings.chat_index_ttl_seconds
+)
+
+
+def get_index(text: str) -> BM25Index:
+    """Get the index for a document, building it only on the first request."""
+    max_chars = settings.chat_passage_chars
+    key = (hashlib.sha256(text.encode("utf-8")).hexdigest(), max_chars)
+    index = _index_cache.get(key)
+    if index is None:
+        index = BM25Index(build_passages(text, max_chars))
+        _index_cache.set(key, index)
+        metrics.increment("chat.retrieval.index_builds")
+    else:
+        metrics.increment("chat.retrieval.index_hits")
+    return index
+
+
+def retrieve(text: str, question: str, k: int) -> List[Dict]:
+    """
+    Find the passages of a document most relevant to a question.
+
+    Falls back to the first k passages when nothing matches, so the model
+    still sees the start of the document.
+
+    Returns:
+        Citation dicts with 1-based "passage" number, "score" and "text",
+        in document order
+    """
+    index = get_index(text)
+    hits = index.search(question, k)
+    if not hits:
+        hits = [(i, 0.0) for i in range(min(k, len(index.passages)))]
+    return [
+        {"passage": i + 1, "score": round(score, 3), "text": index.passages[i]}
+        for i, score in sorted(hits)
+    ]
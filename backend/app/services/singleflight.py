@@ -0,0 +1,70 @@
+"""
+Single Flight - Coalesce identical concurrent calls into one execution.
+
+The first caller for a key starts the work as a task; every concurrent caller
+with the same key awaits that same task. Results and exceptions are delivered
+to all waiters. A waiter that is cancelled (e.g. the client disconnected) does
+not cancel the shared work unless it was the last one waiting for it.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from app.core.metrics import metrics
+
+
+class _Call:
+    """An in-flight call and the number of callers waiting on it."""
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share a key."""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Name used for the metrics counters
+        """
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func once for all concurrent callers sharing key.
+
+        Args:
+            key: Deduplication key
+            func: Zero-argument coroutine function doing the work
+
+        Returns:
+            The result of func (shared by all concurrent callers)
+        """
+        call = self._calls.get(key)
+        if call is None or call.task.done():
+            call = _Call(asyncio.ensure_future(func()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            metrics.increment(f"singleflight.{self.name}.executed")
+        else:
+            metrics.increment(f"singleflight.{self.name}.deduplicated")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Nobody is left waiting for the result
+                call.task.cancel()
+                self._forget(key, call)
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
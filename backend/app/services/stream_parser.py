@@ -0,0 +1,112 @@
+"""
+Stream Parser - Incrementally extract clause objects from streamed analysis JSON.
+
+The model streams the analysis JSON in arbitrary fragments. ClauseStreamParser
+tracks just enough JSON structure (strings, escapes and nesting depth) to notice
+when an object inside the "clauses" array has been closed, so each clause can
+be validated and emitted long before the whole document is complete.
+"""
+import json
+from typing import Dict, List, Optional
+
+
+class ClauseStreamParser:
+    """Incremental parser for the "clauses" array of an analysis response."""
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._awaiting_array = False
+        self._array_depth: Optional[int] = None
+        self._object_start: Optional[int] = None
+        self._done = False
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._text
+
+    def feed(self, fragment: str) -> List[Dict]:
+        """
+        Consume a fragment of the response.
+
+        Args:
+            fragment: Next piece of streamed text
+
+        Returns:
+            Clause dictionaries completed by this fragment
+        """
+        self._text += fragment
+        clauses: List[Dict] = []
+        text = self._text
+
+        while self._pos < len(text):
+            char = text[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start + 1:self._pos]
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char == ":":
+                # A key followed by ':' - remember whether it was "clauses"
+                self._awaiting_array = self._last_string == "clauses" and not self._done
+            elif char in "[{":
+                self._depth += 1
+                if char == "[" and self._awaiting_array:
+                    self._array_depth = self._depth
+                elif (
+                    char == "{"
+                    and self._array_depth is not None
+                    and self._depth == self._array_depth + 1
+                ):
+                    self._object_start = self._pos
+                self._awaiting_array = False
+            elif char in "]}":
+                if (
+                    char == "}"
+                    and self._object_start is not None
+                    and self._depth == self._array_depth + 1
+                ):
+                    clause = self._parse_object(text[self._object_start:self._pos + 1])
+                    if clause is not None:
+                        clauses.append(clause)
+                    self._object_start = None
+                elif char == "]" and self._depth == self._array_depth:
+                    self._array_depth = None
+                    self._done = True
+                self._depth -= 1
+            elif not char.isspace():
+                self._awaiting_array = False
+
+            self._pos += 1
+
+        return clauses
+
+    @staticmethod
+    def _parse_object(raw: str) -> Optional[Dict]:
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+        return value if isinstance(value, dict) else None
+
+    def result(self) -> Dict:
+        """
+        Parse the complete response once the stream has finished.
+
+        Raises:
+            json.JSONDecodeError: If the accumulated text is not valid JSON
+        """
+        return json.loads(self._text)
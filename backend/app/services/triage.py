@@ -0,0 +1,219 @@
+"""
+Triage - Fast local risk scoring of contract sections.
+
+A single compiled regex with one named group per risk family (arbitration,
+auto-renewal, data sale, ...) scans each section in one pass. Sections whose
+weighted score reaches the threshold are sent to the LLM; the rest are only
+described in a compact context summary, saving tokens on definitions,
+contact details and other harmless boilerplate.
+"""
+import re
+from typing import Dict, List, Tuple
+
+
+# family -> (category, weight, phrases). Categories are the ones the analysis
+# prompt allows; phrases are lowercase regex fragments matched on word
+# boundaries against lowercased text.
+RISK_FAMILIES: Dict[str, Tuple[str, float, List[str]]] = {
+    "arbitration": ("Arbitration", 3.0, [
+        r"binding arbitration", r"arbitrat(?:e|ion|or)", r"american arbitration association",
+        r"jams", r"opt[- ]out of arbitration", r"small claims court",
+    ]),
+    "class_action_waiver": ("Arbitration", 3.0, [
+        r"class[- ]action", r"class or representative", r"waive(?:s|r)? (?:any|your|the) right to (?:a )?(?:jury|class)",
+        r"jury trial", r"collective action",
+    ]),
+    "auto_renewal": ("Financial", 2.5, [
+        r"automatic(?:ally)? renew(?:s|al|ed)?", r"auto[- ]renew(?:s|al)?", r"recurring (?:charge|billing|payment)s?",
+        r"until you cancel", r"renewal term", r"free trial",
+    ]),
+    "fees": ("Financial", 2.0, [
+        r"non[- ]refundable", r"no refunds?", r"cancellation fee", r"late fee", r"price changes?",
+        r"we may (?:change|increase) (?:the )?(?:price|fees)", r"early termination fee",
+    ]),
+    "data_sale": ("Data Rights", 3.0, [
+        r"sell (?:your )?(?:personal )?(?:data|information)", r"sale of (?:personal )?(?:data|information)",
+        r"share (?:your )?(?:personal )?(?:data|information) with (?:third[- ]part(?:y|ies)|partners|advertisers)",
+        r"third[- ]party advertis(?:ers|ing)", r"data brokers?", r"targeted advertising",
+    ]),
+    "tracking": ("Data Rights", 1.5, [
+        r"cookies?", r"tracking technologies", r"device identifiers?", r"location data", r"biometric",
+        r"retain (?:your )?(?:data|information)",
+    ]),
+    "irrevocable_license": ("IP Ownership", 3.0, [
+        r"irrevocable", r"perpetual", r"royalty[- ]free", r"worldwide(?:,)? (?:non[- ]exclusive )?licen[cs]e",
+        r"sub[- ]?licen[cs]able", r"transferable licen[cs]e", r"waive (?:any )?moral rights",
+    ]),
+    "liability_waiver": ("Other", 2.5, [
+        r"limitation of liability", r"not (?:be )?liable", r"in no event", r"as is", r"as available",
+        r"disclaim(?:s|er)?", r"consequential damages", r"indemnif(?:y|ication|ies)", r"hold harmless",
+    ]),
+    "unilateral_changes": ("Other", 2.0, [
+        r"(?:at|in) (?:our|its) sole discretion", r"modify (?:these|this|the) (?:terms|agreement)",
+        r"change (?:these|this|the) (?:terms|agreement)", r"without (?:prior )?notice",
+        r"continued use (?:of the service )?(?:constitutes|means) acceptance",
+    ]),
+    "termination": ("Other", 1.5, [
+        r"terminate (?:your )?(?:account|access)", r"suspend (?:your )?(?:account|access)",
+        r"for any reason or no reason", r"at any time(?:,)? (?:with or )?without (?:cause|notice)",
+    ]),
+}
+
+# Score a section must reach to be sent to the LLM
+DEFAULT_THRESHOLD = 2.0
+
+# Rough characters-per-token ratio used for token estimates
+CHARS_PER_TOKEN = 4
+
+
+def _first_chars(phrase: str) -> str:
+    """First characters a phrase can start with (handles a leading (?:a|b) group)."""
+    if phrase.startswith("(?:"):
+        group = phrase[3:phrase.index(")")]
+        return "".join(alternative[0] for alternative in group.split("|"))
+    return phrase[0]
+
+
+def _compile(families: Dict[str, Tuple[str, float, List[str]]]) -> "re.Pattern[str]":
+    """
+    Compile all families into one alternation with a named group per family.
+
+    A lookahead on the possible first characters lets the regex engine skip
+    most word boundaries without trying every alternative, and matching
+    lowercased text avoids the cost of re.IGNORECASE.
+    """
+    groups = [
+        f"(?P<{family}>{'|'.join(phrases)})"
+        for family, (_, _, phrases) in families.items()
+    ]
+    first = sorted({
+        char
+        for _, _, phrases in families.values()
+        for phrase in phrases
+        for char in _first_chars(phrase)
+    })
+    return re.compile(r"\b(?=[" + "".join(first) + r"])(?:" + "|".join(groups) + r")\b")
+
+
+RISK_PATTERN = _compile(RISK_FAMILIES)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in text."""
+    return len(text) // CHARS_PER_TOKEN
+
+
+def match_families(text: str) -> Dict[str, int]:
+    """
+    Count risk phrase matches per family in one pass.
+
+    Args:
+        text: Section text
+
+    Returns:
+        Mapping of family name to number of matches (families without hits omitted)
+    """
+    counts: Dict[str, int] = {}
+    for match in RISK_PATTERN.finditer(text.lower()):
+        family = match.lastgroup
+        counts[family] = counts.get(family, 0) + 1
+    return counts
+
+
+def score_section(text: str) -> float:
+    """
+    Score a section by the families it mentions.
+
+    Each family contributes its weight once, plus a small bonus for repeated
+    mentions, so one long section cannot outscore a short, dense one just by
+    repeating a single phrase.
+    """
+    score = 0.0
+    for family, count in match_families(text).items():
+        weight = RISK_FAMILIES[family][1]
+        score += weight + 0.25 * weight * min(count - 1, 4)
+    return score
+
+
+class TriageResult:
+    """Outcome of triaging a document's sections."""
+
+    def __init__(
+        self,
+        flagged: List[int],
+        scores: List[float],
+        context_summary: str,
+        tokens_before: int,
+        tokens_after: int
+    ):
+        self.flagged = flagged
+        self.scores = scores
+        self.context_summary = context_summary
+        self.tokens_before = tokens_before
+        self.tokens_after = tokens_after
+
+    @property
+    def token_reduction(self) -> float:
+        """Fraction of input tokens that will not be sent to the LLM."""
+        if not self.tokens_before:
+            return 0.0
+        return 1 - self.tokens_after / self.tokens_before
+
+
+def _section_label(section: str, max_words: int = 8) -> str:
+    """Short label for a section: its first few words."""
+    words = section.split()
+    label = " ".join(words[:max_words])
+    return f"{label}..." if len(words) > max_words else label
+
+
+def build_context_summary(sections: List[str], omitted: List[int], max_labels: int = 20) -> str:
+    """Describe the sections that were not sent, so the model knows they exist."""
+    if not omitted:
+        return ""
+    labels = [_section_label(sections[i]) for i in omitted[:max_labels]]
+    more = len(omitted) - len(labels)
+    summary = (
+        f"{len(omitted)} other section(s) of this contract were screened locally as low risk "
+        f"and are not included: " + "; ".join(labels)
+    )
+    if more > 0:
+        summary += f"; and {more} more"
+    return summary + "."
+
+
+def triage_sections(
+    sections: List[str],
+    candidates: List[int],
+    threshold: float = DEFAULT_THRESHOLD
+) -> TriageResult:
+    """
+    Decide which candidate sections need LLM analysis.
+
+    Args:
+        sections: All sections of the document
+        candidates: Indexes of sections that still need analysis
+        threshold: Minimum score for a section to be sent to the LLM
+
+    Returns:
+        TriageResult with the flagged section indexes, a context summary of
+        the omitted ones, and token estimates before and after filtering
+    """
+    scores = [score_section(sections[i]) for i in candidates]
+    flagged = [i for i, score in zip(candidates, scores) if score >= threshold]
+    flagged_set = set(flagged)
+    omitted = [i for i in candidates if i not in flagged_set]
+    context_summary = build_context_summary(sections, omitted)
+
+    tokens_before = sum(estimate_tokens(sections[i]) for i in candidates)
+    tokens_after = sum(estimate_tokens(sections[i]) for i in flagged)
+    if flagged:
+        tokens_after += estimate_tokens(context_summary)
+
+    return TriageResult(
+        flagged=flagged,
+        scores=scores,
+        context_summary=context_summary,
+        tokens_before=tokens_before,
+        tokens_after=tokens_after
+    )
@@ -0,0 +1,208 @@
+"""
+Upload Spooling - Receive multipart file uploads straight into a temp file.
+
+The request body is parsed incrementally as it arrives, and the file part is
+written to a named temp file chunk by chunk, so an upload never sits in
+memory in full. Requests are rejected as early as possible:
+- by Content-Length, before any of the body is read
+- by file extension, as soon as the part headers arrive
+- by file signature (magic bytes), as soon as the first bytes of the file
+  arrive, so a renamed file never reaches the extraction pool
+- by size, as soon as the received file data exceeds the limit
+
+The temp file's path is handed to the extraction pool, whose workers read it
+lazily instead of receiving the document bytes.
+"""
+import asyncio
+import os
+import tempfile
+from typing import Dict, List, Optional, Sequence
+
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from app.core.config import settings
+from app.core.exceptions import IngestionException
+from app.core.logging import logger
+from app.core.metrics import metrics
+
+
+UPLOAD_FIELD = b"file"
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+
+# Leading bytes of each supported format (DOCX is a ZIP archive)
+FILE_SIGNATURES = {
+    ".pdf": b"%PDF-",
+    ".docx": b"PK\x03\x04",
+}
+
+# Multipart framing (boundaries, part headers, other fields) allowed on top of the file size
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class SpooledUpload:
+    """An uploaded file spooled to disk. Call cleanup() when done with it."""
+
+    def __init__(self, filename: str, path: str, size: int):
+        self.filename = filename
+        self.path = path
+        self.size = size
+
+    def cleanup(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _too_large(max_bytes: int) -> IngestionException:
+    metrics.increment("upload.rejected_too_large")
+    limit = f"{max_bytes // (1024 * 1024)} MB" if max_bytes >= 1024 * 1024 else f"{max_bytes // 1024} KB"
+    return IngestionException(
+        f"File too large. Max allowed is {limit}.",
+        status_code=413
+    )
+
+
+def _wrong_signature(filename: str) -> IngestionException:
+    metrics.increment("upload.rejected_signature")
+    extension = os.path.splitext(filename)[1].lower()
+    return IngestionException(
+        f"File content does not match its {extension} extension. Only PDF and DOCX are supported.",
+        status_code=400
+    )
+
+
+class _UploadReceiver:
+    """Multipart parser callbacks that spool the 'file' part to a temp file."""
+
+    def __init__(self, max_bytes: int, extensions: Sequence[str]):
+        self.max_bytes = max_bytes
+        self.extensions = extensions
+        self.headers: Dict[bytes, bytes] = {}
+        self.header_field = bytearray()
+        self.header_value = bytearray()
+        self.in_file_part = False
+        self.pending: List[bytes] = []
+        self.size = 0
+        self.filename: Optional[str] = None
+        self.signature = b""
+        self.head = b""
+        self.file = None
+
+    def on_part_begin(self) -> None:
+        self.headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self.header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self.header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self.headers[bytes(self.header_field).lower()] = bytes(self.header_value)
+        self.header_field.clear()
+        self.header_value.clear()
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self.headers.get(b"content-disposition"))
+        self.in_file_part = options.get(b"name") == UPLOAD_FIELD and self.filename is None
+        if not self.in_file_part:
+            return
+        self.filename = options.get(b"filename", b"").decode("utf-8", "replace")
+        if not self.filename:
+            raise IngestionException("Filename is required")
+        if not self.filename.lower().endswith(tuple(self.extensions)):
+            raise IngestionException(
+                "Unsupported file type. Only PDF and DOCX are supported.",
+                status_code=400
+            )
+        suffix = os.path.splitext(self.filename)[1].lower()
+        self.signature = FILE_SIGNATURES.get(suffix, b"")
+        self.file = tempfile.NamedTemporaryFile(
+            prefix="upload-", suffix=suffix, dir=settings.upload_spool_dir, delete=False
+        )
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self.in_file_part:
+            return
+        self.size += end - start
+        if self.size > self.max_bytes:
+            raise _too_large(self.max_bytes)
+        if len(self.head) < len(self.signature):
+            self.head += data[start:min(end, start + len(self.signature) - len(self.head))]
+            if self.head != self.signature[:len(self.head)]:
+                raise _wrong_signature(self.filename)
+        self.pending.append(data[start:end])
+
+    def on_part_end(self) -> None:
+        if self.in_file_part and len(self.head) < len(self.signature):
+            # Shorter than the signature (e.g. empty)
+            raise _wrong_signature(self.filename)
+        self.in_file_part = False
+
+    def callbacks(self) -> Dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+
+async def receive_upload(
+    request: Request,
+    max_bytes: Optional[int] = None,
+    extensions: Sequence[str] = SUPPORTED_EXTENSIONS
+) -> SpooledUpload:
+    """
+    Receive the 'file' field of a multipart/form-data request into a temp file.
+
+    Args:
+        request: The incoming request (its body must not have been read)
+        max_bytes: Largest accepted file (default: settings.max_upload_bytes)
+        extensions: Accepted filename extensions
+
+    Returns:
+        The spooled upload
+
+    Raises:
+        IngestionException: 413 if the file is too large, 400 if the request
+            is malformed, has no file, an unsupported file type or content
+            that does not match its extension
+    """
+    max_bytes = max_bytes or settings.max_upload_bytes
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise IngestionException("Expected a multipart/form-data upload with a 'file' field")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise _too_large(max_bytes)
+
+    receiver = _UploadReceiver(max_bytes, extensions)
+    parser = MultipartParser(params[b"boundary"], receiver.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if receiver.pending:
+                # Disk writes go to a thread so a slow disk never stalls the event loop
+                data, receiver.pending = b"".join(receiver.pending), []
+                await asyncio.to_thread(receiver.file.write, data)
+        parser.finalize()
+        if receiver.file is None:
+            raise IngestionException("No file uploaded. Send the document in a 'file' form field.")
+        receiver.file.close()
+    except BaseException:
+        if receiver.file is not None:
+            receiver.file.close()
+            os.unlink(receiver.file.name)
+        raise
+
+    metrics.increment("upload.bytes", receiver.size)
+    logger.info(f"Received upload {receiver.filename} ({receiver.size} bytes)")
+    return SpooledUpload(receiver.filename, receiver.file.name, receiver.size)
@@ -0,0 +1,243 @@
+"""
+URL Fetcher - Async HTTP client with a shared connection pool and a local HTTP cache.
+
+One httpx.AsyncClient is shared by all URL ingestion, so repeated fetches
+from the same site reuse keep-alive connections instead of paying a new
+TCP/TLS handshake each time, and nothing blocks the event loop.
+
+Responses are streamed and rejected as soon as they exceed the size limit.
+For pages served with an ETag or Last-Modified validator, the extracted text
+is cached per URL: the next fetch is a conditional GET, and a 304 returns the
+cached text without downloading or parsing the page again.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.exceptions import IngestionException
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.services.cache import TTLCache
+
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+
+
+class FetchedPage:
+    """A fetched response body with its cache validators."""
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        content: bytes = b"",
+        content_type: str = "",
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        cacheable: bool = True
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.cacheable = cacheable
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
+def _too_large(max_bytes: int) -> IngestionException:
+    metrics.increment("url_fetch.rejected_too_large")
+    return IngestionException(
+        f"Page too large. Max allowed is {max_bytes // 1024} KB.",
+        status_code=413
+    )
+
+
+class UrlFetcher:
+    """
+    Fetches URLs over a shared connection pool and caches extracted text
+    behind HTTP validators (ETag / Last-Modified).
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        cache_entries: Optional[int] = None,
+        cache_ttl_seconds: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.max_bytes = max_bytes or settings.url_fetch_max_bytes
+        self.timeout = timeout or settings.url_fetch_timeout_seconds
+        self.max_connections = max_connections or settings.url_fetch_max_connections
+        self.cache = TTLCache(
+            max_entries=cache_entries or settings.url_fetch_cache_entries,
+            ttl_seconds=cache_ttl_seconds or settings.url_fetch_cache_ttl_seconds
+        )
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        # Pooled connections belong to the loop that opened them
+        if self._client is None or self._loop is not loop:
+            stale, stale_loop = self._client, self._loop
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": USER_AGENT},
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                follow_redirects=True,
+                max_redirects=5,
+                transport=self._transport
+            )
+            self._loop = loop
+            if stale is not None:
+                await self._close_stale(stale, stale_loop)
+        return self._client
+
+    @staticmethod
+    async def _close_stale(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop) -> None:
+        """Close a client whose pool was opened on another event loop."""
+        if loop.is_running():
+            # Its connections must be closed on their own loop
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        try:
+            await client.aclose()
+        except RuntimeError as e:
+            # The old loop is closed; its sockets are released with it
+            logger.debug(f"Closed a URL fetch client from a finished event loop: {e}")
+
+    async def fetch(self, url: str, validators: Optional[Dict] = None) -> FetchedPage:
+        """
+        GET a URL, as a conditional request when validators are given.
+
+        Args:
+            url: The URL to fetch
+            validators: Cached {"etag", "last_modified"} of an earlier response
+
+        Returns:
+            The page; status_code is 304 (and content empty) if it is unchanged
+
+        Raises:
+            IngestionException: 413 if the body exceeds the size limit, 504 on
+                timeout, 400 for HTTP errors and unreachable hosts
+        """
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        client = await self._get_client()
+        metrics.increment("url_fetch.requests")
+        try:
+            async with client.stream("GET", url, headers=headers) as response:
+                page = FetchedPage(
+                    url=str(response.url),
+                    status_code=response.status_code,
+                    content_type=response.headers.get("content-type", ""),
+                    etag=response.headers.get("etag"),
+                    last_modified=response.headers.get("last-modified"),
+                    cacheable="no-store" not in response.headers.get("cache-control", "").lower()
+                )
+                if page.not_modified:
+                    await response.aread()  # an unread response would not go back to the pool
+                    return page
+                response.raise_for_status()
+
+                content_length = response.headers.get("content-length")
+                if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+                    raise _too_large(self.max_bytes)
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) > self.max_bytes:
+                        raise _too_large(self.max_bytes)
+                page.content = bytes(body)
+                metrics.increment("url_fetch.bytes", len(body))
+                return page
+        except httpx.TimeoutException:
+            metrics.increment("url_fetch.failed")
+            raise IngestionException(f"Timed out fetching {url}", status_code=504)
+        except httpx.HTTPStatusError as e:
+            metrics.increment("url_fetch.failed")
+            raise IngestionException(f"Failed to scrape URL: HTTP {e.response.status_code} from {url}")
+        except httpx.HTTPError as e:
+            metrics.increment("url_fetch.failed")
+            raise IngestionException(f"Failed to scrape URL: {e}")
+
+    async def fetch_extracted(self, url: str, extract: Callable[[FetchedPage], Any], namespace: str = "text") -> Any:
+        """
+        Fetch a URL and return what extract() makes of it, revalidating cached results.
+
+        extract runs in a thread, and only when the page was (re)downloaded.
+        Results are cached per (namespace, URL), so callers extracting different
+        things from the same page do not overwrite each other.
+        """
+        key = (namespace, url)
+        cached = self.cache.get(key)
+        page = await self.fetch(url, validators=cached)
+        if page.not_modified:
+            if cached:
+                metrics.increment("url_fetch.not_modified")
+                logger.info(f"{url} not modified, reusing the cached {namespace}")
+                return cached["value"]
+            # A 304 with nothing cached to reuse (e.g. from an intermediary cache):
+            # there is no body to extract, so download the page unconditionally
+            metrics.increment("url_fetch.not_modified_uncached")
+            page = await self.fetch(url)
+            if page.not_modified:
+                metrics.increment("url_fetch.failed")
+                raise IngestionException(f"Failed to scrape URL: {url} answered 304 Not Modified without a body")
+
+        started = time.perf_counter()
+        value = await asyncio.to_thread(extract, page)
+        metrics.observe("url_fetch.extract_ms", (time.perf_counter() - started) * 1000)
+        if page.cacheable and (page.etag or page.last_modified):
+            self.cache.set(key, {"etag": page.etag, "last_modified": page.last_modified, "value": value})
+        else:
+            self.cache.delete(key)
+        return value
+
+    async def close(self) -> None:
+        """Close the pooled connections."""
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+
+_url_fetcher: Optional[UrlFetcher] = None
+_url_fetcher_lock = threading.Lock()
+
+
+def get_url_fetcher() -> UrlFetcher:
+    """Get the process-wide URL fetcher, creating it on first use."""
+    global _url_fetcher
+    with _url_fetcher_lock:
+        if _url_fetcher is None:
+            _url_fetcher = UrlFetcher()
+        return _url_fetcher
+
+
+async def close_url_fetcher() -> None:
+    """Close the shared connection pool (application shutdown)."""
+    if _url_fetcher is not None:
+        await _url_fetcher.close()
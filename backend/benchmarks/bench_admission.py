@@ -0,0 +1,173 @@
+"""
+Load test admission control against a slow LLM stub.
+
+The stub provider serves --capacity calls at a time, each taking --service
+seconds; further calls queue at the provider, the way a throttled model
+backs up. Calls keep running when the client gives up, like real model calls
+already sent to the provider.
+
+After a few seconds at normal load, clients arrive open-loop (Poisson) at a
+multiple of the provider's capacity and give up after --client-timeout
+seconds. For every load the test reports:
+
+- goodput: successful responses completed per second, counting only
+  responses the client was still waiting for
+- p50/p99 latency of those responses
+- requests rejected fast (503) and timed out
+
+"none" runs without admission control, "fixed" with a concurrency limit of
+--limit and "adaptive" starts at the same limit and adjusts it to latency
+(its limit at the end of the load is shown).
+
+Usage (from backend/):
+    python -m benchmarks.bench_admission [--capacity 4] [--service 0.2] [--limit 16] [--duration 8]
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+from typing import Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.admission import AdmissionController, AdmissionGate, AdmissionMiddleware
+from app.core.logging import logger
+
+
+# Normal load (half the provider's capacity) before each measured run
+WARM_UP_SECONDS = 4.0
+
+
+class StubProvider:
+    """A model that serves `capacity` calls at a time; the rest wait their turn."""
+
+    def __init__(self, capacity: int, service_seconds: float):
+        self.service_seconds = service_seconds
+        self.slots = asyncio.Semaphore(capacity)
+
+    async def _call(self) -> None:
+        async with self.slots:
+            await asyncio.sleep(self.service_seconds)
+
+    async def call(self) -> None:
+        # Abandoned calls still occupy the provider
+        await asyncio.shield(asyncio.ensure_future(self._call()))
+
+
+def build_app(provider: StubProvider, controller: Optional[AdmissionController]) -> FastAPI:
+    app = FastAPI()
+    if controller is not None:
+        app.add_middleware(AdmissionMiddleware, controller=controller)
+
+    @app.post("/analyze/")
+    async def analyze():
+        await provider.call()
+        return {"ok": True}
+
+    return app
+
+
+async def run_load(
+    app: FastAPI,
+    gate: Optional[AdmissionGate],
+    warm_up: float,
+    rate: float,
+    duration: float,
+    client_timeout: float
+) -> Dict[str, float]:
+    """Offer warm_up req/s for a few seconds, then `rate` req/s; measure the second phase."""
+    transport = httpx.ASGITransport(app=app)
+    completed: List[float] = []
+    latencies: List[float] = []
+    outcomes = {"sent": 0, "rejected": 0, "timed_out": 0}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(measured: bool) -> None:
+            start = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(client.post("/analyze/"), client_timeout)
+            except asyncio.TimeoutError:
+                outcomes["timed_out"] += measured
+                return
+            if response.status_code == 503:
+                outcomes["rejected"] += measured
+            else:
+                completed.append(time.perf_counter())
+                if measured:
+                    latencies.append(time.perf_counter() - start)
+
+        async def offer(rate: float, seconds: float, measured: bool) -> List[asyncio.Future]:
+            tasks = []
+            end = time.perf_counter() + seconds
+            while time.perf_counter() < end:
+                tasks.append(asyncio.ensure_future(one(measured)))
+                await asyncio.sleep(random.expovariate(rate))
+            return tasks
+
+        random.seed(0)
+        tasks = await offer(warm_up, WARM_UP_SECONDS, measured=False)
+        window_start = time.perf_counter()
+        measured_tasks = await offer(rate, duration, measured=True)
+        window_end = time.perf_counter()
+        outcomes["sent"] = len(measured_tasks)
+        limit = gate.limit if gate is not None else 0.0
+        await asyncio.gather(*tasks, *measured_tasks)
+
+    ordered = sorted(latencies)
+    return {
+        # Successful responses finished during the measured phase, per second
+        "goodput": sum(window_start <= t <= window_end for t in completed) / (window_end - window_start),
+        "p50": statistics.median(ordered) if ordered else 0.0,
+        "p99": ordered[int(0.99 * (len(ordered) - 1))] if ordered else 0.0,
+        "limit": limit,
+        **outcomes,
+    }
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    capacity_rps = args.capacity / args.service
+    print(
+        f"Provider: {args.capacity} concurrent calls x {args.service * 1000:.0f} ms = {capacity_rps:.0f} req/s; "
+        f"client timeout {args.client_timeout:.0f} s"
+    )
+    for load in args.loads:
+        rate = load * capacity_rps
+        print(f"load {load:.1f}x ({rate:.0f} req/s offered):")
+        for name in ("none", "fixed", "adaptive"):
+            controller = None
+            if name != "none":
+                controller = AdmissionController(
+                    {"POST /analyze": args.limit},
+                    queue_size=args.limit * 2,
+                    queue_timeout=args.client_timeout / 2,
+                    adaptive=name == "adaptive"
+                )
+            app = build_app(StubProvider(args.capacity, args.service), controller)
+            gate = controller.gates["POST /analyze"] if controller is not None else None
+            result = await run_load(app, gate, capacity_rps / 2, rate, args.duration, args.client_timeout)
+            limit = f"   limit {result['limit']:5.1f}" if name == "adaptive" else ""
+            print(
+                f"  {name:<9} goodput {result['goodput']:5.1f} req/s   p50 {result['p50'] * 1000:6.0f} ms   "
+                f"p99 {result['p99'] * 1000:6.0f} ms   503 {result['rejected']:4d}   "
+                f"timed out {result['timed_out']:4d} / {result['sent']}{limit}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--capacity", type=int, default=4, help="concurrent calls the stub provider serves")
+    parser.add_argument("--service", type=float, default=0.2, help="seconds per provider call")
+    parser.add_argument("--limit", type=int, default=16, help="admission concurrency limit (adaptive: ceiling)")
+    parser.add_argument("--client-timeout", type=float, default=3.0, help="seconds before a client gives up")
+    parser.add_argument("--duration", type=float, default=8.0, help="seconds of load per run")
+    parser.add_argument("--loads", type=float, nargs="+", default=[0.8, 1.5, 3.0], help="offered load / capacity")
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
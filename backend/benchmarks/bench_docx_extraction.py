@@ -0,0 +1,79 @@
+"""
+Benchmark DOCX text extraction: python-docx vs the streaming extractor.
+
+"python-docx" is what the ingestion service used to do: load the whole
+document object model and join `doc.paragraphs` (which skips tables,
+headers, footers and footnotes). "streaming" is extract_docx_text, which
+stream-parses each part of the zip and frees paragraphs as it goes.
+
+Each extractor runs in a fresh process, so both start from the same RSS
+baseline; peak RSS above that baseline is sampled every 2 ms.
+
+Usage (from backend/):
+    python -m benchmarks.bench_docx_extraction [--sections 20000 50000]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import docx
+
+from app.services.extraction_workers import extract_docx_text
+from benchmarks.corpus import generate_docx
+from benchmarks.memory import PeakSampler
+
+
+def extract_python_docx(path: str) -> str:
+    doc = docx.Document(path)
+    return "\n".join(paragraph.text for paragraph in doc.paragraphs)
+
+
+EXTRACTORS = {
+    "python-docx": extract_python_docx,
+    "streaming": extract_docx_text,
+}
+
+
+def measure(name: str, path: str, results) -> None:
+    extract = EXTRACTORS[name]
+    with tempfile.NamedTemporaryFile(suffix=".docx") as small:
+        small.write(generate_docx(sections=10))
+        small.flush()
+        extract(small.name)  # warm up imports
+    with PeakSampler() as sampler:
+        start = time.perf_counter()
+        text = extract(path)
+        elapsed = time.perf_counter() - start
+    results.put((elapsed, sampler.peak - sampler.baseline, len(text)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, nargs="+", default=[20000, 50000], help="paragraphs per document")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    for sections in args.sections:
+        with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as f:
+            f.write(generate_docx(sections=sections, seed=sections))
+            path = f.name
+        print(f"{sections} sections, {os.path.getsize(path) / 2 ** 20:.1f} MB zipped:")
+        try:
+            for name in EXTRACTORS:
+                results = context.Queue()
+                process = context.Process(target=measure, args=(name, path, results))
+                process.start()
+                elapsed, peak, chars = results.get()
+                process.join()
+                print(
+                    f"  {name:<12} {elapsed * 1000:7.0f} ms   "
+                    f"peak RSS +{peak / 2 ** 20:6.1f} MB   ({chars} chars)"
+                )
+        finally:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
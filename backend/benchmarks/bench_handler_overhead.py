@@ -0,0 +1,167 @@
+"""
+Benchmark per-request handler overhead with and without the service container.
+
+"per-request" builds a fresh ServiceContainer for every request, which is what
+the handlers used to do (genai.configure, GenerativeModel and service
+construction on each call). "container" reuses one warmed container. The model
+is a stub that answers instantly, and analysis requests hit the document cache,
+so the numbers are dominated by handler and construction overhead.
+
+Usage (from backend/):
+    python -m benchmarks.bench_handler_overhead [--requests 300]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+import google.generativeai as genai
+import httpx
+from fastapi import FastAPI
+
+from app.api.routes import analysis, chat
+from app.core.config import settings
+from app.core.container import ServiceContainer
+from app.core.dependencies import get_container, get_database, get_google_api_key
+from app.core.logging import logger
+from app.services import cache, llm_client
+from app.services.cache import AnalysisCache
+
+
+API_KEY = "benchmark-key"
+
+STUB_ANALYSIS = json.dumps({"analysis_result": {
+    "document_summary": "Stub.",
+    "overall_danger_score": 10,
+    "clauses": [],
+}})
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubSession:
+    def send_message(self, message, stream=False):
+        return StubResponse(STUB_ANALYSIS if "Analyze this contract" in message else "Stub answer.")
+
+
+class StubModel(genai.GenerativeModel):
+    """Real GenerativeModel construction, instant responses."""
+
+    def start_chat(self, history=None, **kwargs):
+        return StubSession()
+
+    def generate_content(self, prompt, **kwargs):
+        return StubResponse("Stub answer.")
+
+
+def build_app(container_factory: Callable[[], ServiceContainer]) -> FastAPI:
+    app = FastAPI()
+    app.include_router(analysis.router)
+    app.include_router(chat.router)
+    app.dependency_overrides[get_database] = lambda: None
+    app.dependency_overrides[get_google_api_key] = lambda: API_KEY
+    app.dependency_overrides[get_container] = container_factory
+    return app
+
+
+async def run_requests(app: FastAPI, count: int, trace: bool) -> Tuple[List[float], List[int]]:
+    """Alternate chat and (cached) analysis requests; return latencies and peak bytes."""
+    transport = httpx.ASGITransport(app=app)
+    latencies: List[float] = []
+    peaks: List[int] = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(count):
+            if i % 2:
+                method, body = "/chat/", {"history": [], "current_question": "Can I cancel?", "document_context": "Terms."}
+            else:
+                method, body = "/analyze/", {"text": "Section 1 Terms. You may cancel at any time."}
+            if trace:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            response = await client.post(method, json=body)
+            latencies.append(time.perf_counter() - start)
+            if trace:
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+            response.raise_for_status()
+    return latencies, peaks
+
+
+def measure(name: str, container_factory: Callable[[], ServiceContainer], count: int) -> None:
+    app = build_app(container_factory)
+    asyncio.run(run_requests(app, 20, trace=False))  # warm caches and imports
+    latencies, _ = asyncio.run(run_requests(app, count, trace=False))
+
+    tracemalloc.start()
+    _, peaks = asyncio.run(run_requests(app, min(count, 100), trace=True))
+    tracemalloc.stop()
+
+    ordered = sorted(latencies)
+    print(
+        f"{name:<12} mean {statistics.mean(latencies) * 1000:6.2f} ms   "
+        f"p50 {ordered[len(ordered) // 2] * 1000:6.2f} ms   "
+        f"p99 {ordered[int(len(ordered) * 0.99)] * 1000:6.2f} ms   "
+        f"peak alloc/request {statistics.mean(peaks) / 1024:7.1f} KiB"
+    )
+
+
+def measure_construction(name: str, container_factory: Callable[[], ServiceContainer], count: int) -> None:
+    """Only the work a handler does to obtain its service and model client."""
+    def obtain() -> None:
+        container = container_factory()
+        _ = container.analysis_service
+        container.get_llm(settings.gemini_model_chat)
+
+    start = time.perf_counter()
+    for _ in range(count):
+        obtain()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(count, 200)):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        obtain()
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    print(
+        f"{name:<12} {elapsed / count * 1e6:8.1f} us/request   "
+        f"peak alloc/request {statistics.mean(peaks) / 1024:7.1f} KiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    llm_client.genai.GenerativeModel = StubModel
+    cache._analysis_cache = AnalysisCache(backend=None)
+
+    shared = ServiceContainer(api_key=API_KEY, db=None)
+    asyncio.run(shared.warm_up())
+
+    def per_request() -> ServiceContainer:
+        return ServiceContainer(api_key=API_KEY, db=None)
+
+    print("Service and client construction:")
+    measure_construction("per-request", per_request, args.requests)
+    measure_construction("container", lambda: shared, args.requests)
+
+    print("End-to-end handler (ASGI, stub model, cached analysis):")
+    measure("per-request", per_request, args.requests)
+    measure("container", lambda: shared, args.requests)
+
+
+if __name__ == "__main__":
+    main()
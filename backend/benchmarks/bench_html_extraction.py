@@ -0,0 +1,83 @@
+"""
+Benchmark HTML-to-text extraction: the previous BeautifulSoup path vs the
+pluggable extraction backends.
+
+"previous" is what URL ingestion used to do: BeautifulSoup with html.parser,
+remove script/style/nav/footer/header, get_text() on the whole tree, then
+collapse whitespace. "soup" and "lxml" are the html_extraction backends,
+which also drop banners and link-heavy blocks and keep headings and lists.
+
+For every page the benchmark reports throughput (MB of HTML per second, best
+of --repeat runs) and the estimated LLM tokens of the extracted text.
+
+Pages are read from --fixtures (a directory of saved .html files) or, by
+default, generated: single-page-app style legal pages of about 1 and 3 MB.
+
+Usage (from backend/):
+    python -m benchmarks.bench_html_extraction [--fixtures DIR] [--repeat 5]
+"""
+import argparse
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+
+from app.core.logging import logger
+from app.services.extraction_workers import sanitize_text
+from app.services.html_extraction import get_html_extractor
+from app.services.triage import estimate_tokens
+from benchmarks.corpus import generate_html
+
+
+def extract_previous(content: bytes) -> str:
+    soup = BeautifulSoup(content, "html.parser")
+    for element in soup(["script", "style", "nav", "footer", "header"]):
+        element.decompose()
+    return sanitize_text(soup.get_text())
+
+
+EXTRACTORS: Dict[str, Callable[[bytes], str]] = {
+    "previous": extract_previous,
+    "soup": lambda content: get_html_extractor("soup").extract(content).text,
+    "lxml": lambda content: get_html_extractor("lxml").extract(content).text,
+}
+
+
+def load_pages(fixtures: str) -> List[Tuple[str, bytes]]:
+    if fixtures:
+        return [
+            (name, open(os.path.join(fixtures, name), "rb").read())
+            for name in sorted(os.listdir(fixtures)) if name.endswith((".html", ".htm"))
+        ]
+    return [
+        ("generated-1mb.html", generate_html(sections=150, seed=1, state_bytes=900_000)),
+        ("generated-3mb.html", generate_html(sections=400, seed=2, state_bytes=2_700_000)),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", default="", help="directory of saved .html pages")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per page and extractor")
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    for name, content in load_pages(args.fixtures):
+        megabytes = len(content) / 2 ** 20
+        print(f"{name} ({megabytes:.2f} MB):")
+        for extractor, extract in EXTRACTORS.items():
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                text = extract(content)
+                best = min(best, time.perf_counter() - start)
+            print(
+                f"  {extractor:<9} {best * 1000:7.1f} ms   {megabytes / best:6.1f} MB/s   "
+                f"{estimate_tokens(text):7d} tokens"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark PDF text extraction: inline PyPDF2 loop vs the extraction pool.
+
+"inline" is what the ingestion handler used to do: parse every page of the
+PDF sequentially on the event loop's thread. "pool" sends the document to
+the extraction pool, which splits large PDFs into page ranges parsed by
+worker processes. Two scenarios are measured on generated multi-page PDFs:
+
+- one large document (per-document latency)
+- a batch of documents uploaded concurrently (throughput)
+
+While measuring, a ticker task records the longest event loop stall, which is
+how long other requests on the worker would have waited.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pdf_extraction [--pages 200] [--documents 16] [--workers 0]
+"""
+import argparse
+import asyncio
+import io
+import logging
+import os
+import time
+from typing import Awaitable, Callable, List, Tuple
+
+import PyPDF2
+
+from app.core.logging import logger
+from app.services.extraction_pool import ExtractionPool
+from benchmarks.corpus import generate_pdf
+
+
+def extract_inline(data: bytes) -> List[str]:
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+async def measure_loop_stall(work: Callable[[], Awaitable[None]]) -> Tuple[float, float]:
+    """Run work while a 1 ms ticker measures the worst event loop stall; return (seconds, stall)."""
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        loop = asyncio.get_running_loop()
+        while not done:
+            before = loop.time()
+            await asyncio.sleep(0.001)
+            stall = max(stall, loop.time() - before - 0.001)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.005)  # let the ticker start
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+    done = True
+    await ticker_task
+    return elapsed, stall
+
+
+def report(name: str, pages: int, elapsed: float, stall: float) -> None:
+    print(
+        f"  {name:<8} {elapsed * 1000:8.0f} ms   {pages / elapsed:8.0f} pages/s   "
+        f"max loop stall {stall * 1000:7.0f} ms"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    pool = ExtractionPool(max_workers=args.workers or None, timeout=600)
+    large = generate_pdf(pages=args.pages, sections_per_page=16, seed=1)
+    batch = [generate_pdf(pages=args.batch_pages, sections_per_page=16, seed=seed) for seed in range(args.documents)]
+
+    # Start the worker processes before timing
+    await pool.extract_pdf(generate_pdf(pages=pool.max_workers), max_pages=10 ** 6)
+    print(f"Extraction pool: {pool.max_workers} workers on {os.cpu_count()} CPUs")
+
+    async def inline_large():
+        extract_inline(large)
+
+    async def pool_large():
+        await pool.extract_pdf(large, max_pages=10 ** 6)
+
+    async def inline_batch():
+        # Concurrent handlers still run one after another on the loop thread
+        await asyncio.gather(*(asyncio.sleep(0, extract_inline(data)) for data in batch))
+
+    async def pool_batch():
+        await asyncio.gather(*(pool.extract_pdf(data, max_pages=10 ** 6) for data in batch))
+
+    assert extract_inline(large) == await pool.extract_pdf(large, max_pages=10 ** 6)
+
+    print(f"One {args.pages}-page document:")
+    report("inline", args.pages, *await measure_loop_stall(inline_large))
+    report("pool", args.pages, *await measure_loop_stall(pool_large))
+
+    total = args.documents * args.batch_pages
+    print(f"{args.documents} concurrent {args.batch_pages}-page documents ({total} pages):")
+    report("inline", total, *await measure_loop_stall(inline_batch))
+    report("pool", total, *await measure_loop_stall(pool_batch))
+    pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200, help="pages of the large document")
+    parser.add_argument("--documents", type=int, default=16, help="documents in the concurrent batch")
+    parser.add_argument("--batch-pages", type=int, default=50, help="pages per batch document")
+    parser.add_argument("--workers", type=int, default=0, help="pool size (0 = one per CPU)")
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
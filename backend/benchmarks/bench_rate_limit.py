@@ -0,0 +1,154 @@
+"""
+Benchmark the rate limiter: per-check cost, memory under scanning traffic and
+requests/sec overhead.
+
+"previous" is the middleware main.py used to have: a defaultdict(list) of
+request timestamps per IP, filtered on every request and never evicted.
+"memory" and "sqlite" are the token-bucket backends of app.core.rate_limit.
+
+Three measurements:
+- checks/sec for one busy client (the previous limiter rebuilds a list of
+  up to rate_limit_requests timestamps per call)
+- checks/sec and memory held after --clients distinct IPs, one request each
+  (scanning traffic: the previous limiter keeps every IP forever, the memory
+  backend at most rate_limit_max_keys of them)
+- end-to-end requests/sec of a minimal app through httpx's ASGI transport,
+  without a limiter and with each limiter (best of --rounds, interleaved)
+
+Usage (from backend/):
+    python -m benchmarks.bench_rate_limit [--clients 200000] [--requests 3000] [--rounds 3]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Tuple
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.core.logging import logger
+from app.core.rate_limit import (
+    MemoryRateLimitBackend,
+    RateLimiter,
+    RateLimitMiddleware,
+    SQLiteRateLimitBackend,
+)
+
+# The previous limiter's defaults: 20 requests per minute
+LIMIT, WINDOW = 20, 60
+
+
+class PreviousLimiter:
+    """Timestamps per IP, filtered on every request (the replaced implementation)."""
+
+    def __init__(self):
+        self.request_counts = defaultdict(list)
+
+    async def check(self, key: str, method: str, path: str) -> float:
+        now = time.time()
+        self.request_counts[key] = [t for t in self.request_counts[key] if now - t < WINDOW]
+        if len(self.request_counts[key]) >= LIMIT:
+            return 1.0
+        self.request_counts[key].append(now)
+        return 0.0
+
+
+def token_bucket(backend) -> RateLimiter:
+    return RateLimiter(backend, capacity=LIMIT, window_seconds=WINDOW, costs={})
+
+
+def build_limiters(directory: str) -> Dict[str, Callable[[], object]]:
+    return {
+        "previous": PreviousLimiter,
+        "memory": lambda: token_bucket(MemoryRateLimitBackend()),
+        "sqlite": lambda: token_bucket(
+            SQLiteRateLimitBackend(os.path.join(directory, f"limits-{time.perf_counter_ns()}.sqlite3"))
+        ),
+    }
+
+
+async def checks_per_second(limiter, keys: Callable[[int], str], count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        await limiter.check(keys(i), "GET", "/ping")
+    return count / (time.perf_counter() - start)
+
+
+def build_app(limiter: Optional[object]) -> FastAPI:
+    app = FastAPI()
+    if isinstance(limiter, PreviousLimiter):
+        @app.middleware("http")
+        async def rate_limit_middleware(request: Request, call_next):
+            if await limiter.check(request.client.host, request.method, request.url.path):
+                return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded."})
+            return await call_next(request)
+    elif limiter is not None:
+        app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def requests_per_second(app: FastAPI, count: int) -> float:
+    # One client per request, so no limiter ever rejects
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/ping")
+        start = time.perf_counter()
+        for i in range(count):
+            transport.client = (f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}", 1234)
+            await client.get("/ping")
+        return count / (time.perf_counter() - start)
+
+
+async def scanning(factory: Callable[[], object], clients: int) -> Tuple[float, float, int]:
+    """checks/sec for one busy client, checks/sec and bytes held for many clients."""
+    busy = await checks_per_second(factory(), lambda i: "10.0.0.1", clients)
+    limiter = factory()
+    tracemalloc.start()
+    rate = await checks_per_second(limiter, lambda i: f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}", clients)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return busy, rate, held
+
+
+async def main_async(clients: int, requests: int, rounds: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        factories = build_limiters(directory)
+        apps = {"none": build_app(None), **{name: build_app(factory()) for name, factory in factories.items()}}
+        rps = {name: 0.0 for name in apps}
+        for _ in range(rounds):
+            for name, app in apps.items():
+                rps[name] = max(rps[name], await requests_per_second(app, requests))
+
+        print(f"  {'none':<9} {'':>72} {rps['none']:7,.0f} req/s")
+        for name, factory in factories.items():
+            busy, rate, held = await scanning(factory, clients)
+            print(
+                f"  {name:<9} {busy:10,.0f} checks/s (1 client)   {rate:10,.0f} checks/s "
+                f"({clients:,} clients, {held / 2 ** 20:6.1f} MB held)   {rps[name]:7,.0f} req/s"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200_000, help="distinct client IPs for the scanning test")
+    parser.add_argument("--requests", type=int, default=3000, help="requests per end-to-end round")
+    parser.add_argument("--rounds", type=int, default=3, help="end-to-end rounds per limiter")
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+    print(f"Rate limiter, {LIMIT} requests per {WINDOW} s:")
+    asyncio.run(main_async(args.clients, args.requests, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark peak memory of PDF uploads: buffered handler vs streaming ingestion.
+
+"buffered" is the previous handler: FastAPI parses the whole form into an
+UploadFile, PyPDF2 reads it in the server process and the text is built with
+`text += ...`. "streaming" is /ingest/file: the body is spooled to a temp file
+as it arrives and pages are extracted by the extraction pool from that path.
+
+The PDF is generated with binary padding per page (standing in for images)
+and streamed from disk by the client, so the client adds no memory. Peak RSS
+above the pre-request baseline is sampled every 2 ms for the server process
+and, for the streaming path, the absolute RSS of the extraction workers.
+
+Usage (from backend/):
+    python -m benchmarks.bench_upload_memory [--pages 100] [--padding-kb 400]
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+import PyPDF2
+from fastapi import FastAPI, File, UploadFile
+
+from app.api.routes import ingestion
+from app.core.config import settings
+from app.core.logging import logger
+from app.services import extraction_pool
+from app.services.extraction_pool import ExtractionPool
+from app.services.extraction_workers import sanitize_text
+from benchmarks.corpus import generate_pdf
+from benchmarks.memory import PeakSampler
+
+
+BOUNDARY = b"----bench"
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(ingestion.router)
+
+    @app.post("/buffered")
+    async def buffered(file: UploadFile = File(...)) -> Dict:
+        reader = PyPDF2.PdfReader(file.file)
+        text = ""
+        for page in reader.pages:
+            extracted = page.extract_text()
+            if extracted:
+                text += extracted + "\n"
+        text = sanitize_text(text)
+        return {"text_length": len(text)}
+
+    return app
+
+
+async def body(path: str):
+    """Multipart body streamed from disk in 64 KiB chunks."""
+    yield b"--" + BOUNDARY + b'\r\nContent-Disposition: form-data; name="file"; filename="terms.pdf"\r\n'
+    yield b"Content-Type: application/pdf\r\n\r\n"
+    with open(path, "rb") as f:
+        while chunk := f.read(64 * 1024):
+            yield chunk
+    yield b"\r\n--" + BOUNDARY + b"--\r\n"
+
+
+async def upload(app: FastAPI, route: str, path: str) -> Dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        response = await client.post(
+            route,
+            content=body(path),
+            headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY.decode()}"}
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+def measure(route: str, path: str, pages: int, results) -> None:
+    """Upload once in a fresh process, so every mode starts from the same RSS baseline."""
+    logger.setLevel(logging.WARNING)
+    settings.max_pdf_pages = pages
+    settings.max_upload_bytes = 1 << 34
+    pool = ExtractionPool(timeout=600)
+    extraction_pool._extraction_pool = pool
+    app = build_app()
+
+    def workers() -> List[int]:
+        return list(getattr(pool._executor, "_processes", {}) or {})
+
+    # Warm up imports, the multipart parser and the worker processes on a small PDF
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as small:
+        small.write(generate_pdf(pages=2))
+        small.flush()
+        asyncio.run(upload(app, route, small.name))
+
+    with PeakSampler(workers) as sampler:
+        start = time.perf_counter()
+        result = asyncio.run(upload(app, route, path))
+        elapsed = time.perf_counter() - start
+    pool.shutdown()
+    results.put((elapsed, sampler.peak - sampler.baseline, sampler.children_peak, result["text_length"]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--padding-kb", type=int, default=400, help="binary bytes per page, in KiB")
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(generate_pdf(pages=args.pages, sections_per_page=12, padding_per_page=args.padding_kb * 1024))
+        path = f.name
+    print(f"{args.pages}-page PDF, {os.path.getsize(path) / 2 ** 20:.1f} MB:")
+
+    context = multiprocessing.get_context("spawn")
+    try:
+        for name, route in [("buffered", "/buffered"), ("streaming", "/ingest/file")]:
+            results = context.Queue()
+            process = context.Process(target=measure, args=(route, path, args.pages, results))
+            process.start()
+            elapsed, server_peak, workers_peak, text_length = results.get()
+            process.join()
+            workers = f"   workers peak RSS (absolute) {workers_peak / 2 ** 20:6.1f} MB" if workers_peak else ""
+            print(
+                f"  {name:<10} {elapsed * 1000:7.0f} ms   "
+                f"server peak RSS +{server_peak / 2 ** 20:6.1f} MB{workers}   ({text_length} chars)"
+            )
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Synthetic T&C corpus shared by the benchmarks.
+
+Documents mix harmless sections (definitions, contact details, eligibility)
+with typical risky clauses in a realistic proportion.
+"""
+import io
+import json
+import random
+import zipfile
+from typing import List
+from xml.sax.saxutils import escape
+
+
+HARMLESS_SECTIONS = [
+    "Definitions. In these Terms, \"Service\" means the website, mobile applications and related "
+    "offerings provided by the Company. \"User\" means any person who accesses the Service. "
+    "Headings are for convenience only and do not affect interpretation.",
+    "Contact Us. If you have any questions about these Terms, please write to our customer support "
+    "team at the postal address listed on our website or use the contact form in the Help Center. "
+    "We aim to respond to all enquiries within five business days.",
+    "Eligibility. You must be at least 18 years old to create an account. By registering you "
+    "confirm that the information you provide is accurate and that you will keep it up to date.",
+    "Accessibility. We are committed to making the Service usable by everyone. If you experience "
+    "difficulty accessing any part of the Service, let us know and we will work with you to help.",
+    "Language. These Terms are written in English. Translations are provided for convenience and "
+    "the English version will apply in the event of any inconsistency between versions.",
+    "Account Security. Choose a strong password and do not share it with anyone. Notify us promptly "
+    "if you believe someone else has accessed your account so that we can help you secure it.",
+]
+
+RISKY_SECTIONS = [
+    "Dispute Resolution. Any dispute arising out of these Terms will be resolved by binding "
+    "arbitration administered by the American Arbitration Association, and you waive your right "
+    "to a jury trial or to participate in a class action.",
+    "Subscriptions. Your subscription will automatically renew at the end of each billing period "
+    "and you authorize recurring charges until you cancel. All fees are non-refundable.",
+    "Your Content. You grant us a worldwide, irrevocable, perpetual, royalty-free, sublicensable "
+    "license to use, copy, modify and distribute any content you submit.",
+    "Data Sharing. We may share your personal information with third-party advertisers and data "
+    "brokers for targeted advertising purposes.",
+    "Limitation of Liability. In no event will the Company be liable for any indirect or "
+    "consequential damages. The Service is provided as is and as available.",
+    "Changes. We may modify these Terms at our sole discretion without prior notice, and continued "
+    "use of the Service constitutes acceptance of the changes.",
+]
+
+
+def generate_document(sections: int = 60, risky_ratio: float = 0.15, seed: int = 0) -> str:
+    """Generate a numbered T&C document with roughly risky_ratio risky sections."""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    for number in range(1, sections + 1):
+        pool = RISKY_SECTIONS if rng.random() < risky_ratio else HARMLESS_SECTIONS
+        parts.append(f"{number}. {rng.choice(pool)}")
+    return " ".join(parts)
+
+
+def generate_corpus(documents: int = 50, sections: int = 60) -> List[str]:
+    """Generate a corpus of synthetic documents."""
+    return [generate_document(sections=sections, seed=seed) for seed in range(documents)]
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def generate_pdf(pages: int = 50, sections_per_page: int = 8, seed: int = 0, padding_per_page: int = 0) -> bytes:
+    """
+    Generate a multi-page text PDF of synthetic T&C sections.
+
+    Written by hand (uncompressed content streams, Helvetica) so the
+    benchmarks need no PDF authoring library. padding_per_page adds that
+    many bytes of binary data per page, standing in for embedded images.
+    """
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    for page in range(pages):
+        text = generate_document(sections=sections_per_page, seed=seed * 100003 + page)
+        lines, line = [], ""
+        for word in text.split():
+            if len(line) + len(word) > 95:
+                lines.append(line)
+                line = ""
+            line = f"{line} {word}".strip()
+        lines.append(line)
+        content = "BT /F1 9 Tf 11 TL 40 760 Td " + " ".join(
+            f"({_pdf_escape(l)}) Tj T*" for l in lines
+        ) + " ET"
+        data = content.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(data), data))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+        if padding_per_page:
+            padding = random.Random(page).randbytes(padding_per_page)
+            objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(padding), padding))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % ref for ref in page_refs), pages
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+DOCX_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/header1.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml"/>
+<Override PartName="/word/footer1.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.footer+xml"/>
+<Override PartName="/word/footnotes.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.footnotes+xml"/>
+</Types>"""
+
+DOCX_PACKAGE_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+DOCX_DOCUMENT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/header" Target="header1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/footer" Target="footer1.xml"/>
+<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/footnotes" Target="footnotes.xml"/>
+</Relationships>"""
+
+WORDML_NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+)
+
+FEE_ROWS = [
+    ("Late payment fee", "$35 per missed payment"),
+    ("Early termination fee", "$150, charged on cancellation"),
+    ("Currency conversion", "3% of each foreign transaction"),
+    ("Paper statement", "$2 per statement"),
+]
+
+
+def _w_paragraph(text: str, footnote: int = 0) -> str:
+    run = f'<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+    if footnote:
+        run += f'<w:r><w:footnoteReference w:id="{footnote}"/></w:r>'
+    return f"<w:p>{run}</w:p>"
+
+
+def _w_table(rows: List[tuple]) -> str:
+    cells = "".join(
+        "<w:tr>" + "".join(f"<w:tc>{_w_paragraph(cell)}</w:tc>" for cell in row) + "</w:tr>"
+        for row in rows
+    )
+    return f"<w:tbl>{cells}</w:tbl>"
+
+
+def generate_docx(sections: int = 200, table_every: int = 20, seed: int = 0) -> bytes:
+    """
+    Generate a DOCX of synthetic T&C sections with a header, a footer, fee
+    tables every table_every sections and a footnote.
+
+    The package is written by hand (one paragraph per section) so the
+    benchmarks and tests need no DOCX authoring library.
+    """
+    rng = random.Random(seed)
+    blocks: List[str] = []
+    for number in range(1, sections + 1):
+        pool = RISKY_SECTIONS if rng.random() < 0.15 else HARMLESS_SECTIONS
+        blocks.append(_w_paragraph(f"{number}. {rng.choice(pool)}", footnote=1 if number == 1 else 0))
+        if table_every and number % table_every == 0:
+            blocks.append(_w_table([("Fee", "Amount")] + FEE_ROWS))
+    sect = '<w:sectPr><w:headerReference w:type="default" r:id="rId1"/><w:footerReference w:type="default" r:id="rId2"/></w:sectPr>'
+    document = f'<w:document {WORDML_NAMESPACES}><w:body>{"".join(blocks)}{sect}</w:body></w:document>'
+    header = f'<w:hdr {WORDML_NAMESPACES}>{_w_paragraph("Example Corp Terms of Service")}</w:hdr>'
+    footer = f'<w:ftr {WORDML_NAMESPACES}>{_w_paragraph("Confidential - Example Corp")}</w:ftr>'
+    footnotes = (
+        f'<w:footnotes {WORDML_NAMESPACES}>'
+        '<w:footnote w:type="separator" w:id="-1"><w:p><w:r><w:separator/></w:r></w:p></w:footnote>'
+        f'<w:footnote w:id="1">{_w_paragraph("Fees are subject to change with 30 days notice.")}</w:footnote>'
+        '</w:footnotes>'
+    )
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", DOCX_PACKAGE_RELS)
+        archive.writestr("word/_rels/document.xml.rels", DOCX_DOCUMENT_RELS)
+        archive.writestr("word/document.xml", document)
+        archive.writestr("word/header1.xml", header)
+        archive.writestr("word/footer1.xml", footer)
+        archive.writestr("word/footnotes.xml", footnotes)
+    return out.getvalue()
+
+
+NAV_LINKS = ["Products", "Pricing", "Enterprise", "Customers", "Blog", "Careers", "Help Center", "Status", "Press"]
+
+FOOTER_LINKS = [
+    ("Terms of Service", "/legal/terms"), ("Privacy Policy", "/legal/privacy"),
+    ("Cookie Policy", "/legal/cookies"), ("Acceptable Use", "/legal/aup"), ("Refunds", "/legal/refunds"),
+] + [(name, f"/{name.lower().replace(' ', '-')}") for name in NAV_LINKS]
+
+
+def generate_html(sections: int = 60, seed: int = 0, state_bytes: int = 0) -> bytes:
+    """
+    Generate a single-page-app style legal page: hydration state and styles
+    inline in the page, a navigation menu, a cookie consent banner, numbered
+    sections with headings and lists, and a large footer of links. Like many
+    client-rendered sites, the menu and footer are plain <div>s rather than
+    <nav>/<footer> elements.
+
+    state_bytes sizes the inline JSON state, which is what makes real pages
+    of this kind 1-3 MB.
+    """
+    rng = random.Random(seed)
+    state = {"routes": [], "i18n": {}}
+    size = 0
+    while size < state_bytes:
+        key = f"k{len(state['i18n'])}"
+        state["i18n"][key] = rng.choice(HARMLESS_SECTIONS + RISKY_SECTIONS)
+        state["routes"].append({"path": f"/{key}", "chunk": f"{key}.{rng.getrandbits(32):08x}.js"})
+        size += len(state["i18n"][key]) + 2 * len(key) + 50  # approximate JSON size of the entry
+
+    nav = "".join(f'<div class="item"><a href="/{name.lower()}">{name}</a></div>' for name in NAV_LINKS)
+    body: List[str] = []
+    for number in range(1, sections + 1):
+        pool = RISKY_SECTIONS if rng.random() < 0.15 else HARMLESS_SECTIONS
+        heading, _, text = rng.choice(pool).partition(". ")
+        body.append(f'<section id="s{number}"><h2>{number}. {escape(heading)}</h2>')
+        sentences = [sentence for sentence in text.split(". ") if sentence]
+        if number % 5 == 0 and len(sentences) > 1:
+            body.append("<ul>" + "".join(f"<li><span>{escape(s)}.</span></li>" for s in sentences) + "</ul>")
+        else:
+            body.append(f'<div class="prose"><p>{escape(text)}</p></div>')
+        body.append('<div class="section-links"><a href="#top">Back to top</a> | <a href="/print">Print</a></div></section>')
+    footer = "".join(
+        f'<div class="col"><a href="{href}">{escape(name)}</a></div>' for name, href in FOOTER_LINKS * 4
+    )
+    page = (
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\"><title>Terms of Service | Example</title>"
+        "<style>" + ".c{margin:0}" * 200 + "</style></head><body><div id=\"root\">"
+        f'<div class="topbar"><a href="/">Example</a>{nav}<a href="/login">Log in</a></div>'
+        '<div id="cookie-banner" class="cookie-consent"><p>We use cookies to personalise content and ads. '
+        'By clicking "Accept all" you agree to our use of cookies.</p><button>Accept all</button></div>'
+        f'<div class="layout"><div class="content"><h1>Terms of Service</h1>{"".join(body)}</div></div>'
+        f'<div class="site-footer">{footer}<p>&copy; 2025 Example Inc. All rights reserved.</p></div></div>'
+        f"<script>window.__INITIAL_STATE__ = {json.dumps(state)};</script>"
+        "</body></html>"
+    )
+    return page.encode("utf-8")
@@ -0,0 +1,47 @@
+"""
+Peak memory sampling shared by the memory benchmarks.
+
+Reads resident set sizes from /proc (Linux only), so allocations made by C
+extensions such as lxml are counted, unlike with tracemalloc.
+"""
+import os
+import threading
+import time
+from typing import Callable, List
+
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def rss(pid: str = "self") -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except FileNotFoundError:
+        return 0
+
+
+class PeakSampler:
+    """Track the peak RSS of this process (and optionally others) in a thread."""
+
+    def __init__(self, child_pids: Callable[[], List[int]] = lambda: []):
+        self.child_pids = child_pids
+        self.baseline = rss()
+        self.peak = self.baseline
+        self.children_peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss())
+            self.children_peak = max(self.children_peak, sum(rss(str(pid)) for pid in self.child_pids()))
+            time.sleep(0.002)
+
+    def __enter__(self) -> "PeakSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
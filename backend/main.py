@@ -1,25 +1,47 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-import time
-from collections import defaultdict
+import asyncio
+from contextlib import asynccontextmanager
 
+from app.core.admission import AdmissionMiddleware, build_admission_controller
 from app.core.config import settings
+from app.core.container import ServiceContainer
 from app.core.logging import logger, setup_logging
+from app.core.metrics import metrics
+from app.core.rate_limit import RateLimitMiddleware, build_rate_limiter
+from app.services.extraction_pool import shutdown_extraction_pool
+from app.services.model_router import model_router
+from app.services.url_fetcher import close_url_fetcher
 from app.api.main import api_router
-from firebase_config import init_firebase
+from firebase_config import get_db, init_firebase
 
 # Initialize logging
 setup_logging()
 
-# Initialize Firebase
-init_firebase()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the worker's services once and warm them up in the background."""
+    init_firebase()
+    container = ServiceContainer(api_key=settings.google_api_key, db=get_db())
+    app.state.container = container
+    warm_up = asyncio.create_task(container.warm_up())
+    # Resume batch jobs interrupted by the last shutdown without waiting for a /jobs request
+    await container.job_service.start()
+    yield
+    warm_up.cancel()
+    await container.job_service.stop()
+    shutdown_extraction_pool()
+    await close_url_fetcher()
+
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.api_title,
     version=settings.api_version,
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan
 )
 
 # CORS Setup
@@ -31,31 +53,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Rate Limiting Logic (In-Memory)
-request_counts = defaultdict(list)
-
-
-@app.middleware("http")
-async def rate_limit_middleware(request: Request, call_next):
-    """Rate limiting middleware."""
-    client_ip = request.client.host
-    now = time.time()
-    
-    # Filter out old requests
-    request_counts[client_ip] = [
-        t for t in request_counts[client_ip]
-        if now - t < settings.rate_limit_duration
-    ]
-    
-    if len(request_counts[client_ip]) >= settings.rate_limit_requests:
-        return JSONResponse(
-            status_code=429,
-            content={"detail": "Rate limit exceeded. Too many requests."}
-        )
-    
-    request_counts[client_ip].append(now)
-    response = await call_next(request)
-    return response
+# Admission Control (concurrency limits and load shedding for LLM-backed endpoints)
+admission_controller = build_admission_controller()
+app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+
+# Rate Limiting (token buckets per client IP, weighted by route); added last so
+# it runs first and rate-limited requests never take an admission slot
+app.add_middleware(RateLimitMiddleware, limiter=build_rate_limiter())
 
 
 # Root endpoint
@@ -72,6 +76,42 @@ async def health_check():
     return {"status": "ok"}
 
 
+# Readiness endpoint
+@app.get("/ready")
+async def readiness_check(request: Request):
+    """Readiness check: 200 once services and model clients are warmed up, 503 before."""
+    container = getattr(request.app.state, "container", None)
+    if container is None:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    status = container.status()
+    return JSONResponse(status_code=200 if container.ready else 503, content=status)
+
+
+# Metrics endpoint
+@app.get("/metrics")
+async def get_metrics():
+    """In-process counters for caches and LLM usage."""
+    return {
+        "counters": metrics.snapshot(),
+        "clause_cache_hit_ratio": metrics.ratio("clause_cache.hits", "clause_cache.lookups"),
+        # Rough estimate: ~4 characters per token
+        "clause_cache_tokens_saved": int(metrics.get("clause_cache.chars_saved") / 4),
+        "analysis_requests_deduplicated": int(metrics.get("singleflight.analysis.deduplicated")),
+        "triage_token_reduction": 1 - metrics.ratio("triage.tokens_sent", "triage.tokens_before")
+        if metrics.get("triage.tokens_before") else 0.0,
+        "analysis_stream_avg_time_to_first_clause_ms": metrics.ratio(
+            "analysis_stream.time_to_first_clause_ms", "analysis_stream.with_clauses"
+        ),
+        "chat_retrieval_token_reduction": 1 - metrics.ratio(
+            "chat.retrieval.chars_sent", "chat.retrieval.chars_total"
+        ) if metrics.get("chat.retrieval.chars_total") else 0.0,
+        "chat_answer_cache_hit_ratio": metrics.ratio("chat.answer_cache.hits", "chat.answer_cache.lookups"),
+        "model_router": model_router.snapshot(),
+        "admission": admission_controller.snapshot(),
+        "histograms": metrics.histograms(),
+    }
+
+
 # Include API router
 app.include_router(api_router, prefix="/api")
 
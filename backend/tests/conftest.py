@@ -0,0 +1,147 @@
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Importing the app configures file logging; keep the log files out of the working tree
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="tc_guardian-logs-"))
+
+from app.core.config import settings
+from app.services import llm_client
+from app.services.answer_cache import answer_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_answer_cache():
+    # Tests reuse the same contracts and questions; never serve an earlier test's answer
+    answer_cache.clear()
+    yield
+    answer_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def document_store_dir(tmp_path_factory, monkeypatch):
+    # Apps built by tests store ingested documents in a temp directory, not the working tree
+    directory = str(tmp_path_factory.mktemp("documents"))
+    monkeypatch.setattr(settings, "document_store_dir", directory)
+    return directory
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Settable stand-in for time.time; advance it with clock.now += seconds."""
+    return FakeClock()
+
+
+@pytest.fixture
+def passages():
+    return [
+        "Section 1 Fees. Subscription fees are billed monthly and are non-refundable.",
+        "Section 2 Disputes. Any dispute will be resolved by binding arbitration in Delaware.",
+        "Section 3 Privacy. We collect your email address and usage data.",
+    ]
+
+
+class RecordingSession:
+    def __init__(self, calls, history):
+        self.calls = calls
+        self.history = history
+
+    def send_message(self, message):
+        self.calls.append((self.history, message))
+        return type("Response", (), {"text": "Disputes go to arbitration [Passage 2]."})()
+
+
+@pytest.fixture
+def recording_chat(monkeypatch):
+    """Stand-in for genai.GenerativeModel; returns the (history, message) pairs sent to chat sessions."""
+    calls = []
+
+    class RecordingModel:
+        def __init__(self, model_name=None, generation_config=None):
+            self.model_name = model_name
+
+        def start_chat(self, history=None):
+            return RecordingSession(calls, history)
+
+    monkeypatch.setattr(llm_client.genai, "GenerativeModel", RecordingModel)
+    monkeypatch.setattr(llm_client.genai, "configure", lambda **kwargs: None)
+    return calls
+
+
+class PolicyHandler(BaseHTTPRequestHandler):
+    """Serves server.pages: path -> (body, headers), honouring If-None-Match / If-Modified-Since."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers), self.client_address))
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        try:
+            time.sleep(self.server.delay)
+            self._respond()
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _respond(self):
+        if self.server.pages.get(self.path) is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body, headers = self.server.pages[self.path]
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if (etag and self.headers.get("If-None-Match") == etag) or (
+            last_modified and self.headers.get("If-Modified-Since") == last_modified
+        ):
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if headers.get("Transfer-Encoding") == "chunked":
+            self.end_headers()
+            for i in range(0, len(body), 4096):
+                chunk = body[i:i + 4096]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PolicyHandler)
+    server.pages = {}
+    server.requests = []
+    server.delay = 0
+    server.lock = threading.Lock()
+    server.in_flight = server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,116 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from app.core.admission import AdmissionController, AdmissionGate, AdmissionMiddleware
+
+
+def test_gate_queues_in_order_and_sheds_excess_load(clock):
+    gate = AdmissionGate("analyze", 2, queue_size=2, queue_timeout=5.0, adaptive=False, clock=clock)
+    gate.short_latency = gate.long_latency = 1.0
+
+    async def run():
+        admitted = [await gate.acquire() for _ in range(2)]
+        waiting = [asyncio.ensure_future(gate.acquire()) for _ in range(2)]
+        await asyncio.sleep(0)
+        queue_full = await gate.acquire()
+        gate.release()
+        await asyncio.wait(waiting, timeout=1.0, return_when=asyncio.FIRST_COMPLETED)
+        first_done = [task.done() for task in waiting]
+        gate.release()
+        await asyncio.gather(*waiting)
+        return admitted, queue_full, first_done, gate.in_flight, gate.queued
+
+    admitted, queue_full, first_done, in_flight, queued = asyncio.run(run())
+
+    assert admitted == [None, None]
+    # Two requests ahead of it, two slots, 1 s per request
+    assert queue_full == 2.0
+    # Freed slots go to the oldest waiter first
+    assert first_done == [True, False]
+    assert (in_flight, queued) == (2, 0)
+
+
+def test_gate_rejects_requests_that_would_miss_the_deadline(clock):
+    gate = AdmissionGate("chat", 1, queue_size=10, queue_timeout=0.05, adaptive=False, clock=clock)
+
+    async def run():
+        await gate.acquire()
+        # No latency observed yet: the request queues, then times out
+        timed_out = await gate.acquire()
+        gate.short_latency = 1.0
+        # One second of expected wait is over the 50 ms deadline
+        deadline = await gate.acquire()
+        return timed_out, deadline, gate.queued
+
+    timed_out, deadline, queued = asyncio.run(run())
+
+    assert timed_out == 1.0
+    assert deadline == 1.0
+    assert queued == 0
+
+
+def test_adaptive_limit_shrinks_when_latency_rises_and_recovers():
+    gate = AdmissionGate("analyze", 20, adaptive=True, tolerance=1.5)
+    for _ in range(50):
+        gate._observe(0.2)
+    normal = gate.limit
+    for _ in range(20):
+        gate._observe(2.0)
+    overloaded = gate.limit
+    for _ in range(50):
+        gate._observe(0.2)
+
+    assert normal == 20.0
+    assert overloaded < 10.0
+    assert gate.limit == 20.0
+
+
+def test_middleware_returns_503_while_streams_hold_the_slots():
+    controller = AdmissionController(
+        {"POST /analyze": 1}, queue_size=0, queue_timeout=5.0, adaptive=False
+    )
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    release = asyncio.Event()
+
+    @app.post("/analyze/stream")
+    async def analyze_stream():
+        async def chunks():
+            yield b"first\n"
+            await release.wait()
+            yield b"last\n"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async def stream():
+                async with client.stream("POST", "/analyze/stream") as response:
+                    return [line async for line in response.aiter_lines()]
+
+            streaming = asyncio.ensure_future(stream())
+            while controller.gates["POST /analyze"].in_flight == 0:
+                await asyncio.sleep(0.01)
+            busy = await client.post("/analyze/stream")
+            health = await client.get("/health")
+            release.set()
+            lines = await streaming
+            after = await client.post("/analyze/stream")
+            return busy, health, lines, after
+
+    busy, health, lines, after = asyncio.run(run())
+
+    assert busy.status_code == 503
+    assert busy.headers["Retry-After"] == "1"
+    assert health.status_code == 200
+    assert lines == ["first", "last"]
+    assert after.status_code == 200
+    assert controller.snapshot()["POST /analyze"]["in_flight"] == 0
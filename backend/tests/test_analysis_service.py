@@ -1 +1,499 @@
+import asyncio
+import json
+import time
 
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.routes import analysis
+from app.core.config import settings
+from app.core.dependencies import get_database, get_google_api_key
+from app.schemas.jurisdiction import Jurisdiction
+from app.services import analysis_service, cache, llm_client
+from app.services.analysis_service import AnalysisService
+from app.services.cache import AnalysisCache, SQLiteCacheBackend
+from app.services.chunking import build_chunks
+from app.services.singleflight import SingleFlight
+
+
+STUB_DELAY = 0.5
+
+STUB_ANALYSIS = {
+    "analysis_result": {
+        "document_summary": "Stub summary.",
+        "overall_danger_score": 40,
+        "clauses": [
+            {
+                "id": "clause-1",
+                "clause_text": "You waive your right to a jury trial.",
+                "category": "Arbitration",
+                "simplified_explanation": "You cannot go to court.",
+                "severity_score": 7,
+                "legal_context": "Class action waivers are suspect.",
+                "actionable_step": "Opt out within 30 days.",
+                "flags": ["Red Flag"]
+            }
+        ]
+    }
+}
+
+
+class SlowResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class SlowChatSession:
+    def send_message(self, message):
+        time.sleep(STUB_DELAY)
+        return SlowResponse(json.dumps(STUB_ANALYSIS))
+
+
+class SlowStubModel:
+    """Stand-in for genai.GenerativeModel whose calls block like the real SDK."""
+
+    def __init__(self, model_name=None, generation_config=None):
+        self.model_name = model_name
+
+    def start_chat(self, history=None):
+        return SlowChatSession()
+
+    def generate_content(self, prompt):
+        time.sleep(STUB_DELAY)
+        return SlowResponse(json.dumps(STUB_ANALYSIS))
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(monkeypatch):
+    """Give every test a fresh, in-process-only analysis cache."""
+    monkeypatch.setattr(cache, "_analysis_cache", AnalysisCache(backend=None))
+
+
+@pytest.fixture
+def stub_gemini(monkeypatch):
+    monkeypatch.setattr(llm_client.genai, "GenerativeModel", SlowStubModel)
+    monkeypatch.setattr(analysis_service.genai, "configure", lambda **kwargs: None)
+
+
+@pytest.fixture
+def analysis_app(stub_gemini):
+    app = FastAPI()
+    app.include_router(analysis.router)
+    app.dependency_overrides[get_database] = lambda: None
+    app.dependency_overrides[get_google_api_key] = lambda: "test-key"
+    return app
+
+
+def test_analyze_returns_model_result(stub_gemini):
+    service = AnalysisService(api_key="test-key", db=None)
+    result = asyncio.run(service.analyze_contract_text("Some contract text."))
+    expected = STUB_ANALYSIS["analysis_result"]
+    assert result["analysis_result"]["document_summary"] == expected["document_summary"]
+    assert result["analysis_result"]["clauses"] == expected["clauses"]
+
+
+def test_concurrent_analyze_calls_do_not_serialize(analysis_app):
+    concurrency = 5
+
+    async def run():
+        transport = httpx.ASGITransport(app=analysis_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.post("/analyze/", json={"text": f"Contract number {i}."})
+                for i in range(concurrency)
+            ])
+            return time.perf_counter() - start, responses
+
+    elapsed, responses = asyncio.run(run())
+
+    assert all(r.status_code == 200 for r in responses)
+    # Blocking calls would take concurrency * STUB_DELAY; offloaded calls overlap
+    assert elapsed < STUB_DELAY * 2
+
+
+def test_build_chunks_splits_at_sections_with_overlap():
+    sections = [
+        f"Section {i} Terms. This is sentence one of section {i}. This is sentence two."
+        for i in range(1, 21)
+    ]
+    text = " ".join(sections)
+
+    chunks = build_chunks(text, max_chars=400, overlap_chars=80)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 400 + 80 + 1 for chunk in chunks)
+    # Every chunk after the first starts with the tail of its predecessor
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.split(" Section ")[0] in previous
+    # Section headings are never cut in half
+    for section in sections:
+        assert any(section in chunk for chunk in chunks)
+
+
+def test_long_contract_is_merged_with_deduped_clauses(stub_gemini, monkeypatch):
+    monkeypatch.setattr(analysis_service.settings, "analysis_chunk_chars", 300)
+    text = " ".join(
+        f"Section {i} General. Nothing interesting happens in section {i}."
+        for i in range(1, 30)
+    )
+    service = AnalysisService(api_key="test-key", db=None)
+
+    result = asyncio.run(service.analyze_contract_text(text))
+
+    clauses = result["analysis_result"]["clauses"]
+    assert len(clauses) == 1
+    assert result["analysis_result"]["overall_danger_score"] == 70
+    assert result["analysis_result"]["document_summary"] == "Stub summary."
+
+
+
+def test_merge_keeps_a_clause_whose_text_contains_another():
+    service = AnalysisService(api_key=None, db=None)
+    clause = STUB_ANALYSIS["analysis_result"]["clauses"][0]
+    short = dict(clause, id="a", clause_text="You waive your right to a jury trial.", severity_score=5)
+    longer = dict(clause, id="b", clause_text="You waive your right to a jury trial and to appeal.", severity_score=6)
+    repeat = dict(short, id="c", clause_text="you waive your right to a JURY trial", severity_score=8)
+
+    merged = service._merge_results([short, longer, repeat], [], [])
+
+    clauses = merged["analysis_result"]["clauses"]
+    assert [c["clause_text"] for c in clauses] == [repeat["clause_text"], longer["clause_text"]]
+    # The more severe copy of a repeated clause wins, under the first copy's id
+    assert [(c["id"], c["severity_score"]) for c in clauses] == [("a", 8), ("b", 6)]
+
+ARBITRATION = "Section 9 Disputes. You agree to binding arbitration and waive class actions."
+
+
+class RecordingModel(SlowStubModel):
+    """Stub that flags the arbitration section whenever it is sent."""
+
+    messages = []
+    model_names = []
+
+    def start_chat(self, history=None):
+        model = self
+
+        class Session:
+            def send_message(self, message):
+                model.messages.append(message)
+                model.model_names.append(model.model_name)
+                clauses = []
+                if "binding arbitration" in message:
+                    clauses.append(dict(
+                        STUB_ANALYSIS["analysis_result"]["clauses"][0],
+                        clause_text="You agree to binding arbitration and waive class actions."
+                    ))
+                return SlowResponse(json.dumps({"analysis_result": {
+                    "document_summary": "Recorded.",
+                    "overall_danger_score": 10,
+                    "clauses": clauses
+                }}))
+
+        return Session()
+
+
+@pytest.fixture
+def recording_gemini(monkeypatch):
+    monkeypatch.setattr(llm_client.genai, "GenerativeModel", RecordingModel)
+    monkeypatch.setattr(analysis_service.genai, "configure", lambda **kwargs: None)
+    RecordingModel.messages = []
+    RecordingModel.model_names = []
+    return RecordingModel.messages
+
+
+def test_clause_cache_reuses_sections_across_documents(recording_gemini, tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+    service = AnalysisService(api_key="test-key", db=None, cache=AnalysisCache(backend))
+
+    first = f"Section 1 Welcome. Thanks for joining Acme. {ARBITRATION}"
+    second = f"Section 1 Welcome. Thanks for joining Globex. {ARBITRATION}"
+    asyncio.run(service.analyze_contract_text(first))
+    result = asyncio.run(service.analyze_contract_text(second))
+
+    # Only the unseen welcome section of the second document reached the model
+    assert len(recording_gemini) == 2
+    assert "Globex" in recording_gemini[1]
+    assert "arbitration" not in recording_gemini[1]
+    # The cached arbitration clause is still part of the result
+    clauses = result["analysis_result"]["clauses"]
+    assert [c["category"] for c in clauses] == ["Arbitration"]
+
+
+def test_cache_key_separates_jurisdictions(recording_gemini):
+    service = AnalysisService(api_key="test-key", db=None)
+    text = f"Section 1 Welcome. {ARBITRATION}"
+
+    asyncio.run(service.analyze_contract_text(text, Jurisdiction.EU_GDPR))
+    asyncio.run(service.analyze_contract_text(text, Jurisdiction.EU_GDPR))
+    asyncio.run(service.analyze_contract_text(text, Jurisdiction.US_CALIFORNIA))
+
+    # The repeat EU call is a cache hit; California is analyzed separately
+    assert len(recording_gemini) == 2
+
+
+def test_failover_results_are_not_served_once_the_preferred_model_recovers(recording_gemini, monkeypatch):
+    monkeypatch.setattr(settings, "model_routing_enabled", True)
+    monkeypatch.setattr(settings, "gemini_model_fast", "fast-model")
+    monkeypatch.setattr(settings, "gemini_model_large", "large-model")
+    unhealthy = {"fast-model"}
+    monkeypatch.setattr(
+        analysis_service.model_router, "unhealthy_reason", lambda model: "slow" if model in unhealthy else None
+    )
+    service = AnalysisService(api_key="test-key", db=None)
+    text = "Section 1 Welcome. Thanks for joining Acme."
+
+    asyncio.run(service.analyze_contract_text(text))
+    # Still failing over: the large model's answer stands in
+    asyncio.run(service.analyze_contract_text(text))
+    unhealthy.clear()
+    asyncio.run(service.analyze_contract_text(text))
+    asyncio.run(service.analyze_contract_text(text))
+
+    assert RecordingModel.model_names == ["large-model", "fast-model"]
+
+
+def test_clause_cache_only_serves_sections_analyzed_by_the_preferred_model(recording_gemini, monkeypatch):
+    monkeypatch.setattr(settings, "model_routing_enabled", True)
+    monkeypatch.setattr(settings, "gemini_model_fast", "fast-model")
+    monkeypatch.setattr(settings, "gemini_model_large", "large-model")
+    monkeypatch.setattr(settings, "routing_long_input_chars", 300)
+    service = AnalysisService(api_key="test-key", db=None)
+    short = f"Section 1 Welcome. Thanks for joining Acme. {ARBITRATION}"
+    long = f"{short}\n\nSection 2 Support. " + "Write to us at any time. " * 12
+
+    asyncio.run(service.analyze_contract_text(short))
+    result = asyncio.run(service.analyze_contract_text(long))
+    asyncio.run(service.analyze_contract_text(f"Section 1 Welcome. Thanks for joining Globex. {ARBITRATION}"))
+
+    # The long document prefers the large model, so the fast model's arbitration
+    # clause is analyzed again; a short document reuses it
+    assert RecordingModel.model_names == ["fast-model", "large-model", "fast-model"]
+    assert "binding arbitration" in recording_gemini[1]
+    assert "binding arbitration" not in recording_gemini[2]
+    assert [c["category"] for c in result["analysis_result"]["clauses"]] == ["Arbitration"]
+
+
+def test_sqlite_backend_survives_a_cold_l1(recording_gemini, tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    text = f"Section 1 Welcome. {ARBITRATION}"
+
+    first = AnalysisService(api_key="test-key", cache=AnalysisCache(SQLiteCacheBackend(path)))
+    expected = asyncio.run(first.analyze_contract_text(text))
+    # A new process starts with an empty L1 but the same SQLite file
+    second = AnalysisService(api_key="test-key", cache=AnalysisCache(SQLiteCacheBackend(path)))
+    result = asyncio.run(second.analyze_contract_text(text))
+
+    assert result == expected
+    assert len(recording_gemini) == 1
+
+
+def test_concurrent_identical_requests_share_one_llm_call(recording_gemini):
+    service = AnalysisService(api_key="test-key", db=None)
+    text = f"Section 1 Welcome. {ARBITRATION}"
+
+    async def run():
+        return await asyncio.gather(*[
+            service.analyze_contract_text(text) for _ in range(10)
+        ])
+
+    results = asyncio.run(run())
+
+    assert len(recording_gemini) == 1
+    assert all(result == results[0] for result in results)
+
+
+def test_single_flight_propagates_errors_to_all_waiters():
+    flights = SingleFlight("test")
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(
+            *[flights.do("key", failing) for _ in range(3)],
+            return_exceptions=True
+        )
+
+    outcomes = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert flights.in_flight() == 0
+
+
+def test_single_flight_survives_cancelled_waiter():
+    flights = SingleFlight("test")
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flights.do("key", slow))
+        second = asyncio.ensure_future(flights.do("key", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    result, first_cancelled = asyncio.run(run())
+
+    assert result == "done"
+    assert first_cancelled
+
+
+def test_single_flight_cancels_work_when_every_waiter_leaves():
+    flights = SingleFlight("test")
+    finished = []
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+
+    async def run():
+        waiter = asyncio.ensure_future(flights.do("key", slow))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+
+    assert finished == []
+    assert flights.in_flight() == 0
+
+
+class StreamingModel(SlowStubModel):
+    """Stub that streams a three-clause analysis in small delayed fragments."""
+
+    def start_chat(self, history=None):
+        clause = STUB_ANALYSIS["analysis_result"]["clauses"][0]
+        payload = json.dumps({"analysis_result": {
+            "document_summary": "Streamed.",
+            "overall_danger_score": 50,
+            "clauses": [
+                dict(clause, id=f"clause-{i}", clause_text=f"Streamed clause number {i}.")
+                for i in range(3)
+            ]
+        }})
+
+        class Session:
+            def send_message(self, message, stream=False):
+                for start in range(0, len(payload), 40):
+                    time.sleep(0.02)
+                    yield SlowResponse(payload[start:start + 40])
+
+        return Session()
+
+
+def test_stream_endpoint_emits_clauses_before_completion(analysis_app, monkeypatch):
+    monkeypatch.setattr(llm_client.genai, "GenerativeModel", StreamingModel)
+
+    async def run():
+        transport = httpx.ASGITransport(app=analysis_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/analyze/stream", json={"text": "Section 1 Terms."})
+            return [json.loads(line) for line in response.text.splitlines()]
+
+    events = asyncio.run(run())
+
+    assert [e["event"] for e in events] == ["clause", "clause", "clause", "complete"]
+    complete = events[-1]["data"]
+    assert len(complete["analysis_result"]["clauses"]) == 3
+    assert complete["analysis_result"]["document_summary"] == "Streamed."
+    # The first clause is ready well before the whole response has streamed
+    assert complete["time_to_first_clause_ms"] < complete["total_ms"] / 2
+
+
+class BrokenStreamModel(StreamingModel):
+    """Streams two complete clauses, then the connection drops."""
+
+    def start_chat(self, history=None):
+        session = super().start_chat(history)
+
+        class Session:
+            def send_message(self, message, stream=False):
+                fragments = "".join(r.text for r in session.send_message(message, stream))
+                cut = fragments.index("Streamed clause number 2")
+                yield SlowResponse(fragments[:cut])
+                raise RuntimeError("connection reset")
+
+        return Session()
+
+
+def test_clauses_streamed_before_a_chunk_fails_stay_in_the_result(analysis_app, monkeypatch):
+    # Own model names: the failure must not mark the shared models unhealthy
+    monkeypatch.setattr(settings, "gemini_model_fast", "broken-stream-fast")
+    monkeypatch.setattr(settings, "gemini_model_large", "broken-stream-large")
+    monkeypatch.setattr(llm_client.genai, "GenerativeModel", BrokenStreamModel)
+
+    async def run():
+        transport = httpx.ASGITransport(app=analysis_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/analyze/stream", json={"text": "Section 1 Terms."})
+            return [json.loads(line) for line in response.text.splitlines()]
+
+    events = asyncio.run(run())
+
+    streamed = [e["data"]["clause_text"] for e in events if e["event"] == "clause"]
+    complete = events[-1]
+    assert streamed == ["Streamed clause number 0.", "Streamed clause number 1."]
+    assert complete["event"] == "complete"
+    # The final result agrees with what the client was shown, not the offline fallback
+    assert [c["clause_text"] for c in complete["data"]["analysis_result"]["clauses"]] == streamed
+    assert not complete["data"]["analysis_result"].get("degraded")
+
+
+def test_triage_sends_only_risky_sections(recording_gemini, monkeypatch):
+    monkeypatch.setattr(analysis_service.settings, "analysis_triage_min_chars", 0)
+    harmless = " ".join(
+        f"Section {i} Contact. Write to our support team at the address on our website."
+        for i in range(1, 8)
+    )
+    service = AnalysisService(api_key="test-key", db=None)
+
+    result = asyncio.run(service.analyze_contract_text(f"{harmless} {ARBITRATION}"))
+
+    assert len(recording_gemini) == 1
+    message = recording_gemini[0]
+    assert "binding arbitration" in message
+    assert "address on our website" not in message
+    assert "7 other section(s)" in message
+    assert [c["category"] for c in result["analysis_result"]["clauses"]] == ["Arbitration"]
+
+
+class FailingModel(SlowStubModel):
+    def start_chat(self, history=None):
+        raise RuntimeError("quota exceeded")
+
+
+def test_offline_fallback_analyzes_the_actual_document(stub_gemini, monkeypatch):
+    monkeypatch.setattr(llm_client.genai, "GenerativeModel", FailingModel)
+    service = AnalysisService(api_key="test-key", db=None)
+    text = (
+        "Section 1 Privacy. We may sell your personal data to data brokers.\n\n"
+        "Section 2 Contact. Write to us at our office.\n\n"
+        "Section 3 Billing. Your plan renews automatically until you cancel.\n\n"
+        "Section 4 Liability. In no event are we liable for consequential damages."
+    )
+
+    us = asyncio.run(service.analyze_contract_text(text, Jurisdiction.US_CALIFORNIA))
+    eu = asyncio.run(service.analyze_contract_text(text, Jurisdiction.EU_GDPR))
+
+    result = us["analysis_result"]
+    assert result["degraded"] is True
+    assert result["document_summary"].startswith("⚠️ OFFLINE ANALYSIS")
+    by_category = {c["category"]: c for c in result["clauses"]}
+    # Only the categories the analysis prompt allows
+    assert set(by_category) == {"Data Rights", "Financial", "Other"}
+    assert "consequential damages" in by_category["Other"]["clause_text"]
+    assert "data brokers" in by_category["Data Rights"]["clause_text"]
+    assert "Offline Analysis" in by_category["Data Rights"]["flags"]
+    # CCPA references raise data sale and auto-renewal above their base severity
+    assert by_category["Data Rights"]["severity_score"] == 8
+    assert by_category["Financial"]["severity_score"] == 7
+    eu_financial = next(c for c in eu["analysis_result"]["clauses"] if c["category"] == "Financial")
+    assert eu_financial["severity_score"] == 6
@@ -0,0 +1,68 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.routes import chat
+from app.core.container import ServiceContainer
+from app.core.dependencies import get_container, get_google_api_key
+from app.core.metrics import metrics
+from app.services.answer_cache import AnswerCache, normalize_question
+
+
+def test_normalization_and_near_duplicate_lookup():
+    cache = AnswerCache(max_entries=4, similarity=0.8)
+
+    assert normalize_question("Can I cancel anytime?") == normalize_question("can i CANCEL, anytime")
+    assert normalize_question("Do they sell my data?") != normalize_question("Do they not sell my data?")
+
+    cache.set("doc", "Do they sell personal data to third parties or advertisers?", "Yes.", [])
+    assert cache.get("doc", "do they SELL my personal data to advertisers or third parties")["answer"] == "Yes."
+    # One extra term: similar enough
+    assert cache.get("doc", "Do they sell personal data to third parties, partners or advertisers?")
+    # Different question, or same question about another document
+    assert cache.get("doc", "Do they sell data?") is None
+    assert cache.get("other-doc", "Do they sell personal data to third parties or advertisers?") is None
+    assert cache.get("doc", "???") is None
+
+    # Five shared terms score 5/6, but the negation flips the answer
+    cache.set("doc", "Does the company share my personal data with advertisers?", "Yes, they share it.", [])
+    assert cache.get("doc", "Does the company not share my personal data with advertisers?") is None
+    cache.set("doc", "Does the company never share my personal data with advertisers?", "They never do.", [])
+    assert cache.get("doc", "Does the company never share personal data with advertisers?")["answer"] == "They never do."
+
+    cache.set("doc", "Can I cancel anytime?", "Yes.", [])
+    cache.set("doc", "Is there arbitration?", "Yes.", [])
+    assert cache.get("doc", "Do they sell personal data to third parties or advertisers?") is None
+
+
+def test_repeated_first_turn_questions_skip_the_model(recording_chat, passages):
+    app = FastAPI()
+    app.include_router(chat.router)
+    app.dependency_overrides[get_google_api_key] = lambda: "test-key"
+    app.dependency_overrides[get_container] = lambda: ServiceContainer(api_key="test-key")
+    hits = metrics.get("chat.answer_cache.hits")
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = []
+            for question, history in [
+                ("How are disputes resolved?", []),
+                ("how are DISPUTES resolved", []),
+                ("How are disputes resolved?", [{"role": "user", "parts": ["Hi"]}]),
+            ]:
+                responses.append(await client.post("/chat/", json={
+                    "history": history,
+                    "current_question": question,
+                    "document_context": "\n\n".join(passages),
+                }))
+            return responses
+
+    first, repeated, follow_up = asyncio.run(run())
+
+    assert [r.json()["cached"] for r in (first, repeated, follow_up)] == [False, True, False]
+    assert repeated.json()["answer"] == first.json()["answer"]
+    assert repeated.json()["citations"] == first.json()["citations"]
+    assert len(recording_chat) == 2
+    assert metrics.get("chat.answer_cache.hits") == hits + 1
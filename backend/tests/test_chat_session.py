@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.routes import chat
+from app.core.config import settings
+from app.core.container import ServiceContainer
+from app.core.dependencies import get_container, get_google_api_key
+from app.services.cache import SQLiteCacheBackend
+from app.services.chat_session import ChatSessionStore, document_hash
+from app.services.document_store import DiskDocumentBackend, DocumentStore
+
+
+def test_sessions_persist_summarize_and_expire(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(settings, "chat_session_recent_messages", 2)
+    monkeypatch.setattr(settings, "chat_session_summary_chars", 120)
+    backend = SQLiteCacheBackend(str(tmp_path / "sessions.db"))
+
+    documents = DocumentStore(DiskDocumentBackend(str(tmp_path / "documents")))
+
+    async def run():
+        store = ChatSessionStore(documents, backend, ttl_seconds=60, clock=clock)
+        session = await store.create(document_text="Section 1 Terms.")
+        for i in range(4):
+            session = await store.record_turn(session, f"Question {i}?", f"Answer {i}. More detail.")
+
+        # A fresh store (another worker) reads the session from the backend
+        other = ChatSessionStore(DocumentStore(documents.backend), backend, ttl_seconds=60, clock=clock)
+        loaded = await other.get(session["id"])
+        document = await other.get_document(session["document_hash"])
+        clock.now += 61
+        expired = await other.get(session["id"])
+        return loaded, document, expired
+
+    loaded, document, expired = asyncio.run(run())
+
+    assert loaded["turns"] == 4
+    assert [m["parts"] for m in loaded["history"]] == [["Question 3?"], ["Answer 3. More detail."]]
+    assert loaded["summary"].endswith("Q: Question 2?\nA: Answer 2.")
+    assert "More detail" not in loaded["summary"]
+    assert len(loaded["summary"]) <= 120
+    assert document == "Section 1 Terms."
+    # The contract has one copy, in the document store; the session holds its id
+    assert backend.get_many("chat_document", [loaded["document_hash"]]) == {}
+    assert expired is None
+
+
+def test_expired_sessions_are_purged_and_reads_are_not_counted(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "chat_session_purge_every", 2)
+    backend = SQLiteCacheBackend(str(tmp_path / "sessions.db"))
+    documents = DocumentStore(DiskDocumentBackend(str(tmp_path / "documents")))
+    hits = []
+
+    async def run():
+        store = ChatSessionStore(documents, backend, ttl_seconds=60)
+        old = await store.create(document_text="Section 1 Terms.")
+        with backend._connect() as conn:
+            conn.execute("UPDATE cache_entries SET last_analyzed = last_analyzed - 120")
+        # The second creation sweeps sessions idle for over a minute
+        new = await store.create(document_text="Section 1 Terms.")
+        other = ChatSessionStore(DocumentStore(documents.backend), backend, ttl_seconds=60)
+        other.sessions._record_hit_in_background = lambda *args: hits.append(args)
+        return old, new, await other.get(new["id"])
+
+    old, new, loaded = asyncio.run(run())
+
+    assert backend.get_many("chat_session", [old["id"]]) == {}
+    assert loaded["id"] == new["id"]
+    # Reading a session from L2 does not add an access-count write
+    assert hits == []
+
+
+def test_session_messages_send_only_the_question(recording_chat, passages, monkeypatch):
+    monkeypatch.setattr(settings, "analysis_cache_backend", "memory")
+    container = ServiceContainer(api_key="test-key")
+    app = FastAPI()
+    app.include_router(chat.router)
+    app.dependency_overrides[get_google_api_key] = lambda: "test-key"
+    app.dependency_overrides[get_container] = lambda: container
+    contract = "\n\n".join(passages)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            created = (await client.post("/chat/sessions", json={"document_context": contract})).json()
+            url = f"/chat/sessions/{created['session_id']}/messages"
+            first = await client.post(url, json={"question": "How are disputes resolved?"})
+            second = await client.post(url, json={"question": "Where?"})
+            by_hash = await client.post("/chat/sessions", json={"document_hash": created["document_hash"]})
+            unknown_hash = await client.post("/chat/sessions", json={"document_hash": "0" * 64})
+            missing = await client.post("/chat/sessions/nope/messages", json={"question": "Hi?"})
+            info = await client.get(f"/chat/sessions/{created['session_id']}")
+            return created, first, second, by_hash, unknown_hash, missing, info
+
+    created, first, second, by_hash, unknown_hash, missing, info = asyncio.run(run())
+
+    assert created["document_hash"] == document_hash(contract)
+    assert first.status_code == 200 and second.status_code == 200
+    assert second.json()["session_id"] == created["session_id"]
+    history, _ = recording_chat[1]
+    assert history[0] == {"role": "user", "parts": ["How are disputes resolved?"]}
+    assert by_hash.status_code == 201
+    assert unknown_hash.status_code == 404
+    assert missing.status_code == 404
+    assert info.json()["turns"] == 2
@@ -0,0 +1,31 @@
+import asyncio
+
+import httpx
+
+from app.core.container import ServiceContainer
+from main import app
+
+
+def test_warm_up_builds_clients_once_and_reports_ready(recording_chat, monkeypatch):
+    container = ServiceContainer(api_key="test-key", db=None)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            monkeypatch.setattr(app.state, "container", container, raising=False)
+            before = await client.get("/ready")
+            await container.warm_up()
+            after = await client.get("/ready")
+            return before, after
+
+    before, after = asyncio.run(run())
+
+    assert before.status_code == 503
+    assert after.status_code == 200
+    assert after.json()["status"] == "ready"
+    service = container.analysis_service
+    assert container.analysis_service is service
+    assert container.get_llm("gemini-1.5-pro") is container.get_llm("gemini-1.5-pro")
+    assert container.negotiation_service.llm_factory == container.get_llm
+    # Batch jobs go through the same analysis service as interactive requests
+    assert container.job_service.analysis_service is service
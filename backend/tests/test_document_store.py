@@ -0,0 +1,89 @@
+import asyncio
+import sys
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.routes import analysis, chat, ingestion
+from app.core.config import settings
+from app.core.container import ServiceContainer
+from app.core.dependencies import get_container, get_google_api_key
+from app.services.analysis_service import AnalysisService
+from app.services.document_store import DiskDocumentBackend, DocumentStore
+from benchmarks.corpus import generate_docx
+
+
+def test_store_is_content_addressed_bounded_and_expires(tmp_path, clock):
+    documents = [f"Section {i}. " * 200 for i in range(4)]
+    two_documents = 2 * sys.getsizeof(documents[0])
+
+    async def run():
+        backend = DiskDocumentBackend(str(tmp_path), clock=clock)
+        store = DocumentStore(backend, max_bytes=two_documents, ttl_seconds=60, clock=clock)
+        ids = [await store.put(text) for text in documents]
+        in_memory = list(store._memory)
+        # Evicted from memory, still served from disk and promoted back
+        from_disk = await store.get(ids[0])
+        # A fresh store (another worker, or after a restart) reads the disk tier
+        restarted = await DocumentStore(backend, ttl_seconds=60, clock=clock).get(ids[1])
+        invalid = await store.get("../" + ids[1])
+        clock.now += 30
+        await store.get(ids[3])
+        clock.now += 31
+        expired, used = await store.get(ids[2]), await store.get(ids[3])
+        removed = await store.purge_expired()
+        return ids, in_memory, from_disk, restarted, invalid, expired, used, removed
+
+    ids, in_memory, from_disk, restarted, invalid, expired, used, removed = asyncio.run(run())
+
+    assert ids[0] == AnalysisService._get_text_hash(None, documents[0])
+    assert in_memory == ids[2:]
+    assert from_disk == documents[0]
+    assert restarted == documents[1]
+    assert invalid is None
+    # Reads extend the TTL; unused documents expire in both tiers
+    assert expired is None
+    assert used == documents[3]
+    assert removed == 2
+
+
+def test_analyze_and_chat_accept_a_document_id(recording_chat, monkeypatch):
+    monkeypatch.setattr(settings, "analysis_cache_backend", "memory")
+    monkeypatch.setattr(settings, "extraction_use_processes", False)
+    container = ServiceContainer(api_key="test-key")
+    app = FastAPI()
+    for module in (ingestion, analysis, chat):
+        app.include_router(module.router)
+    app.dependency_overrides[get_google_api_key] = lambda: "test-key"
+    app.dependency_overrides[get_container] = lambda: container
+    monkeypatch.setattr(container.analysis_service, "api_key", None)
+    docx = generate_docx(sections=30)
+    mime = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            ingested = (await client.post("/ingest/file", files={"file": ("terms.docx", docx, mime)})).json()
+            doc_id = ingested["document_id"]
+            analyzed = await client.post("/analyze/", json={"document_id": doc_id})
+            answered = await client.post("/chat/", json={"current_question": "What are the fees?", "document_id": doc_id})
+            session = await client.post("/chat/sessions", json={"document_id": doc_id})
+            unknown = await client.post("/analyze/", json={"document_id": "0" * 64})
+            both = await client.post("/analyze/", json={"text": "Terms.", "document_id": doc_id})
+            text = await container.document_store.get(doc_id)
+            return ingested, analyzed, answered, session, unknown, both, text
+
+    ingested, analyzed, answered, session, unknown, both, text = asyncio.run(run())
+
+    assert "text" not in ingested
+    assert ingested["text_length"] == len(text)
+    assert ingested["preview"] == text[:200]
+    assert analyzed.status_code == 200
+    assert analyzed.json()["analysis_result"]["degraded"] is True
+    assert answered.status_code == 200
+    _, message = recording_chat[0]
+    assert "Contract Passages" in message
+    assert session.status_code == 201
+    assert session.json()["document_hash"] == ingested["document_id"]
+    assert unknown.status_code == 404
+    assert both.status_code == 422
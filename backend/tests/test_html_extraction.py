@@ -0,0 +1,95 @@
+import pytest
+
+from app.services.html_extraction import get_html_extractor
+from benchmarks.corpus import generate_html
+
+
+PAGE = b"""<!DOCTYPE html><html><head><title> Acme  Terms </title><style>p { color: red }</style></head>
+<body>
+<div id="onetrust-banner-sdk" class="cookie-consent">We use cookies. <a href="/cookies">Accept all</a></div>
+<header><a href="/">Home</a><ul class="menu"><li><a href="/pricing">Pricing</a></li></ul></header>
+<div class="page">
+  <h1>Terms of Service</h1>
+  Last updated January 2025.
+  <p>Read our <a href="/privacy#data">Privacy Policy</a> before using the Service.</p>
+  <h2>Fees</h2>
+  <ul><li>All fees are <b>non-refundable</b>.</li><li>Prices may change<br>with notice.</li></ul>
+  <table><tr><th>Fee</th><th>Amount</th></tr><tr><td>Late payment</td><td>$35</td></tr></table>
+  <div class="related"><a href="/a">Help</a> | <a href="/b">Blog</a> | <a href="/c">Careers</a></div>
+  <!-- tracking --> Governed by the laws of Delaware.
+  <script>window.__STATE__ = {"terms": "hidden"}</script>
+</div>
+<footer><a href="/terms">Terms</a> <a href="mailto:legal@acme.com">Email</a></footer>
+</body></html>"""
+
+EXPECTED = [
+    "# Terms of Service",
+    "Last updated January 2025.",
+    "Read our Privacy Policy before using the Service.",
+    "## Fees",
+    "- All fees are non-refundable.",
+    "- Prices may change",
+    "- with notice.",
+    "Fee | Amount",
+    "Late payment | $35",
+    "Governed by the laws of Delaware.",
+]
+
+
+@pytest.mark.parametrize("name", ["lxml", "soup"])
+def test_extractors_drop_boilerplate_and_keep_structure(name):
+    document = get_html_extractor(name).extract(PAGE, "https://acme.com/legal/terms")
+
+    assert document.blocks == EXPECTED
+    assert document.title == "Acme Terms"
+    # Links come from the whole page, boilerplate included, as absolute http(s) URLs
+    assert ("Privacy Policy", "https://acme.com/privacy") in document.links
+    assert ("Terms", "https://acme.com/terms") in document.links
+    assert ("Accept all", "https://acme.com/cookies") in document.links
+    assert not any(link.startswith("mailto:") for _, link in document.links)
+
+
+def test_main_element_is_preferred_and_backends_agree_on_large_pages():
+    page = b"<html><body><div>Sign up today!</div><main><p>The contract.</p></main></body></html>"
+    large = generate_html(sections=120, seed=3)
+
+    lxml_document = get_html_extractor("lxml").extract(large)
+    soup_document = get_html_extractor("soup").extract(large)
+
+    assert get_html_extractor("lxml").extract(page).blocks == ["The contract."]
+    assert get_html_extractor("soup").extract(page).blocks == ["The contract."]
+    assert get_html_extractor("auto").name == "lxml"
+    assert lxml_document.blocks == soup_document.blocks
+    assert lxml_document.blocks[0].startswith("# ")
+    assert not any("cookie" in block.lower() and "accept" in block.lower() for block in lxml_document.blocks)
+    with pytest.raises(ValueError):
+        get_html_extractor("regex")
+
+
+SECTIONS = b"""<section id="share"><h2>How we share your data</h2><p>We share data with payment processors.</p></section>
+<section id="consent"><h2>Consent</h2><p>You may withdraw consent at any time.</p></section>
+<div class="social"><p>We do not sell data to social networks.</p></div>"""
+
+SECTION_BLOCKS = [
+    "## How we share your data",
+    "We share data with payment processors.",
+    "## Consent",
+    "You may withdraw consent at any time.",
+    "We do not sell data to social networks.",
+]
+
+
+@pytest.mark.parametrize("name", ["lxml", "soup"])
+def test_policy_sections_named_like_chrome_are_kept(name):
+    extractor = get_html_extractor(name)
+    in_main = b"<html><body><div class='sidebar'>Related</div><main>" + SECTIONS + b"</main></body></html>"
+    in_article = (
+        b"<html><body><div class='cookie-banner'>We use cookies.</div><article><div class='menu'>"
+        + SECTIONS + b"</div></article></body></html>"
+    )
+    in_body = b"<html><body><div class='newsletter'>Subscribe!</div>" + SECTIONS + b"</body></html>"
+
+    assert extractor.extract(in_main).blocks == SECTION_BLOCKS
+    # Names of chrome are only chrome outside the main content
+    assert extractor.extract(in_article).blocks == SECTION_BLOCKS
+    assert extractor.extract(in_body).blocks == SECTION_BLOCKS
@@ -1 +1,127 @@
+import asyncio
+import io
+import os
+import time
+import zipfile
 
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.routes import ingestion
+from app.core.config import settings
+from app.core.exceptions import IngestionException
+from app.services import extraction_pool
+from app.services.extraction_pool import ExtractionPool
+from app.services.extraction_workers import extract_docx_text, extract_pdf_pages
+from app.services.ingestion_service import IngestionService
+from benchmarks.corpus import generate_docx, generate_pdf
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ExtractionPool(max_workers=2, min_pages_per_task=2, timeout=30, use_processes=True)
+    yield pool
+    pool.shutdown()
+
+
+def test_pdf_pages_are_split_across_workers_and_kept_in_order(pool):
+    data = generate_pdf(pages=7, sections_per_page=2)
+    service = IngestionService(pool=pool)
+
+    pages = asyncio.run(pool.extract_pdf(data, max_pages=10))
+    text = asyncio.run(service.extract_text_from_pdf(data))
+
+    assert pool._page_ranges(7) == [(0, 4), (4, 7)]
+    assert pages == extract_pdf_pages(data, 0, 7)
+    assert text == " ".join(pages)
+
+    with pytest.raises(IngestionException, match="PDF too large: 7 pages"):
+        asyncio.run(pool.extract_pdf(data, max_pages=5))
+
+
+def test_docx_text_is_streamed_in_reading_order_with_tables_and_notes(pool):
+    data = generate_docx(sections=4, table_every=2)
+    # A second section header repeating the first one is only read once
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as source, zipfile.ZipFile(out, "w") as target:
+        for item in source.infolist():
+            target.writestr(item, source.read(item))
+        target.writestr("word/header2.xml", source.read("word/header1.xml"))
+
+    lines = extract_docx_text(out.getvalue()).split("\n")
+    text = asyncio.run(IngestionService(pool=pool).extract_text_from_docx(data))
+
+    assert lines[0] == "Example Corp Terms of Service"
+    assert lines[1].startswith("1. ") and lines[2].startswith("2. ")
+    assert lines[3:5] == ["Fee", "Amount"]
+    assert "Early termination fee" in lines
+    assert lines[-2:] == ["Fees are subject to change with 30 days notice.", "Confidential - Example Corp"]
+    assert lines.count("Example Corp Terms of Service") == 1
+    assert text == " ".join(" ".join(lines).split())
+
+
+def test_timeout_kills_the_workers_and_the_pool_recovers(pool):
+    async def run():
+        loop = asyncio.get_running_loop()
+        with pytest.raises(IngestionException, match="timed out"):
+            await pool._run([(time.sleep, (30,))], deadline=loop.time() + 1)
+        started = time.perf_counter()
+        pages = await pool.extract_pdf(generate_pdf(pages=2, sections_per_page=1), max_pages=10)
+        return pages, time.perf_counter() - started
+
+    pages, elapsed = asyncio.run(run())
+
+    assert len(pages) == 2
+    assert elapsed < 10
+
+
+def test_uploads_are_spooled_to_disk_and_rejected_early(pool, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_spool_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "max_upload_bytes", 50_000)
+    monkeypatch.setattr(extraction_pool, "_extraction_pool", pool)
+    app = FastAPI()
+    app.include_router(ingestion.router)
+    small = generate_pdf(pages=3, sections_per_page=2)
+    large = generate_pdf(pages=40, sections_per_page=8)
+
+    async def stream(data):
+        # Chunked body without Content-Length, so only the running byte count can reject it
+        boundary = b"----test"
+        yield b"--" + boundary + b'\r\nContent-Disposition: form-data; name="file"; filename="big.pdf"\r\n\r\n'
+        for i in range(0, len(data), 8192):
+            yield data[i:i + 8192]
+        yield b"\r\n--" + boundary + b"--\r\n"
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            ok = await client.post(
+                "/ingest/file",
+                params={"include_text": "true"},
+                files={"file": ("terms.pdf", small, "application/pdf")}
+            )
+            by_length = await client.post("/ingest/file", files={"file": ("terms.pdf", large, "application/pdf")})
+            chunked = await client.post(
+                "/ingest/file",
+                content=stream(large),
+                headers={"Content-Type": "multipart/form-data; boundary=----test"}
+            )
+            wrong_type = await client.post("/ingest/file", files={"file": ("terms.txt", b"hello", "text/plain")})
+            renamed = await client.post("/ingest/file", files={"file": ("terms.docx", small, "application/pdf")})
+            empty = await client.post("/ingest/file", files={"file": ("terms.pdf", b"", "application/pdf")})
+            return ok, by_length, chunked, wrong_type, renamed, empty
+
+    ok, by_length, chunked, wrong_type, renamed, empty = asyncio.run(run())
+
+    assert ok.status_code == 200
+    assert ok.json()["text"] == " ".join(extract_pdf_pages(small, 0, 3))
+    assert by_length.status_code == 413
+    assert chunked.status_code == 413
+    assert wrong_type.status_code == 400
+    assert "Unsupported file type" in wrong_type.json()["detail"]
+    # A PDF renamed to .docx is rejected on its first bytes, before extraction
+    assert renamed.status_code == 400
+    assert "does not match its .docx extension" in renamed.json()["detail"]
+    assert empty.status_code == 400
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,156 @@
+import asyncio
+
+from app.core.config import settings
+from app.schemas.jurisdiction import Jurisdiction
+from app.services.job_service import (
+    COMPLETED,
+    FAILED,
+    PENDING,
+    RUNNING,
+    JobService,
+    SQLiteJobStore,
+    summarize_job,
+)
+
+
+class StubAnalysisService:
+    """Records calls and fails on texts containing 'broken'."""
+
+    calls = []
+
+    async def analyze_contract_text(self, text, jurisdiction):
+        self.calls.append((text, jurisdiction))
+        await asyncio.sleep(0.01)
+        if "broken" in text:
+            raise ValueError("model exploded")
+        return {"analysis_result": {"document_summary": text, "overall_danger_score": 10, "clauses": []}}
+
+
+async def wait_for_job(service, job_id, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await service.get_job(job_id)
+        if summarize_job(job)["status"] == COMPLETED:
+            return job
+        assert asyncio.get_running_loop().time() < deadline, "job did not finish"
+        await asyncio.sleep(0.01)
+
+
+def test_job_runs_every_document(tmp_path):
+    StubAnalysisService.calls = []
+    service = JobService(
+        SQLiteJobStore(str(tmp_path / "jobs.sqlite3")),
+        StubAnalysisService(),
+        max_workers=2
+    )
+
+    async def run():
+        job = await service.submit(
+            [{"text": "first"}, {"text": "broken"}, {"text": "third", "jurisdiction": Jurisdiction.EU_GDPR}],
+            Jurisdiction.US_CALIFORNIA
+        )
+        return await wait_for_job(service, job["id"])
+
+    job = asyncio.run(run())
+
+    assert [doc["status"] for doc in job["documents"]] == [COMPLETED, FAILED, COMPLETED]
+    assert job["documents"][0]["result"]["analysis_result"]["document_summary"] == "first"
+    assert job["documents"][1]["error"] == "model exploded"
+    assert ("third", Jurisdiction.EU_GDPR) in StubAnalysisService.calls
+
+
+def test_unfinished_documents_resume_after_restart(tmp_path):
+    StubAnalysisService.calls = []
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    # A previous worker accepted the job but died before finishing it
+    store.create_job({
+        "id": "job-1",
+        "created_at": 0.0,
+        "jurisdiction": Jurisdiction.US_CALIFORNIA.value,
+        "documents": [
+            {"index": 0, "source": {"text": "done already"}, "status": PENDING},
+            {"index": 1, "source": {"text": "left behind"}, "status": PENDING},
+        ],
+    })
+    store.update_document("job-1", 0, status=COMPLETED, result={"analysis_result": {}})
+
+    restarted = JobService(
+        SQLiteJobStore(str(tmp_path / "jobs.sqlite3")),
+        StubAnalysisService(),
+        max_workers=1
+    )
+
+    async def run():
+        # The lifespan starts the service; no /jobs request is needed to resume
+        await restarted.start()
+        job = await wait_for_job(restarted, "job-1")
+        await restarted.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert [doc["status"] for doc in job["documents"]] == [COMPLETED, COMPLETED]
+    assert [text for text, _ in StubAnalysisService.calls] == ["left behind"]
+
+
+def test_workers_sharing_a_store_claim_each_document_once(tmp_path):
+    StubAnalysisService.calls = []
+    path = str(tmp_path / "jobs.sqlite3")
+    store = SQLiteJobStore(path)
+    store.create_job({
+        "id": "job-1",
+        "created_at": 0.0,
+        "jurisdiction": Jurisdiction.US_CALIFORNIA.value,
+        "documents": [
+            {"index": i, "source": {"text": f"contract {i}"}, "status": PENDING} for i in range(6)
+        ] + [{"index": 6, "source": {"text": "abandoned"}, "status": PENDING}],
+    })
+    # Claimed long ago by a worker that died
+    store.update_document("job-1", 6, status=RUNNING)
+    with store._connect() as conn:
+        conn.execute("UPDATE job_documents SET updated_at = 0 WHERE idx = 6")
+
+    # A claim younger than the timeout belongs to a live worker
+    assert store.claim_document("job-1", 6, stale_before=-1.0) is None
+    # Two uvicorn workers start on the same store and both queue every document
+    workers = [JobService(SQLiteJobStore(path), StubAnalysisService(), max_workers=2) for _ in range(2)]
+
+    async def run():
+        for worker in workers:
+            await worker.start()
+        job = await wait_for_job(workers[0], "job-1")
+        for worker in workers:
+            await worker.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert [doc["status"] for doc in job["documents"]] == [COMPLETED] * 7
+    assert sorted(text for text, _ in StubAnalysisService.calls) == sorted(
+        [f"contract {i}" for i in range(6)] + ["abandoned"]
+    )
+
+
+def test_abandoned_documents_are_requeued_without_a_restart(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "jobs_requeue_interval_seconds", 0.05)
+    StubAnalysisService.calls = []
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    service = JobService(store, StubAnalysisService(), max_workers=1)
+
+    async def run():
+        await service.start()
+        # Another process claimed this document after we started, then died
+        await asyncio.to_thread(store.create_job, {
+            "id": "job-1",
+            "created_at": 0.0,
+            "jurisdiction": Jurisdiction.US_CALIFORNIA.value,
+            "documents": [{"index": 0, "source": {"text": "orphaned"}, "status": RUNNING}],
+        })
+        job = await wait_for_job(service, "job-1")
+        await service.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert job["documents"][0]["status"] == COMPLETED
+    assert [text for text, _ in StubAnalysisService.calls] == ["orphaned"]
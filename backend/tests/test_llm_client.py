@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.core.config import settings
+from app.core.exceptions import LLMUnavailableException
+from app.core.metrics import metrics
+from app.services.llm_client import LLMClient, get_latency_tracker
+from app.services.resilience import CLOSED, OPEN
+
+
+class FaultResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FaultyModel:
+    """
+    Stand-in model that replays a script of faults, one entry per call.
+
+    An exception is raised, a float is slept (latency) before answering, and
+    None answers immediately. Calls past the end of the script succeed.
+    """
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            fault = self.script[self.calls] if self.calls < len(self.script) else None
+            self.calls += 1
+        if isinstance(fault, Exception):
+            raise fault
+        if fault:
+            time.sleep(fault)
+        return FaultResponse(f"answer to {prompt}")
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "llm_retry_base_delay", 0.01)
+    monkeypatch.setattr(settings, "llm_retry_max_delay", 0.05)
+
+
+def make_client(name, script, **kwargs):
+    model = FaultyModel(script)
+    return LLMClient(f"test-{name}", model=model, **kwargs), model
+
+
+def test_transient_errors_are_retried():
+    client, model = make_client("retry", [
+        google_exceptions.ServiceUnavailable("down"),
+        google_exceptions.ResourceExhausted("quota"),
+    ], max_retries=2)
+
+    assert asyncio.run(client.generate("q")) == "answer to q"
+    assert model.calls == 3
+    assert client.breaker.state == CLOSED
+
+
+def test_client_errors_are_not_retried():
+    client, model = make_client("invalid", [google_exceptions.InvalidArgument("bad prompt")])
+
+    with pytest.raises(google_exceptions.InvalidArgument):
+        asyncio.run(client.generate("q"))
+    assert model.calls == 1
+
+
+def test_deadline_bounds_a_hung_call():
+    client, _ = make_client("hung", [2.0], timeout=0.2, max_retries=0)
+
+    start = time.perf_counter()
+    with pytest.raises(LLMUnavailableException) as excinfo:
+        asyncio.run(client.generate("q"))
+
+    assert time.perf_counter() - start < 1.0
+    assert excinfo.value.status_code == 503
+
+
+def test_circuit_opens_fails_fast_and_recovers(monkeypatch):
+    monkeypatch.setattr(settings, "llm_breaker_failure_threshold", 3)
+    monkeypatch.setattr(settings, "llm_breaker_reset_seconds", 0.2)
+    client, model = make_client(
+        "breaker", [google_exceptions.ServiceUnavailable("down")] * 3, max_retries=0
+    )
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(LLMUnavailableException):
+                await client.generate("q")
+        assert client.breaker.state == OPEN
+
+        # Open circuit: rejected without reaching the provider
+        with pytest.raises(LLMUnavailableException) as excinfo:
+            await client.generate("q")
+        assert model.calls == 3
+        assert "Retry-After" in excinfo.value.headers
+
+        # After the reset timeout a probe goes through and closes the circuit
+        await asyncio.sleep(0.25)
+        return await client.generate("q")
+
+    assert asyncio.run(run()) == "answer to q"
+    assert client.breaker.state == CLOSED
+
+
+def test_slow_call_is_hedged():
+    client, model = make_client("hedge", [1.0], hedge=True)
+    tracker = get_latency_tracker(client.model_name)
+    for _ in range(settings.llm_hedge_min_samples):
+        tracker.record(0.05)
+    wins = metrics.get(f"llm.{client.model_name}.hedge_wins")
+
+    start = time.perf_counter()
+    assert asyncio.run(client.generate("q")) == "answer to q"
+
+    assert time.perf_counter() - start < 0.5
+    assert model.calls == 2
+    assert metrics.get(f"llm.{client.model_name}.hedge_wins") == wins + 1
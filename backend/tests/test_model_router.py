@@ -0,0 +1,54 @@
+import pytest
+
+from app.core.config import settings
+from app.services.llm_client import get_circuit_breaker, get_latency_tracker
+from app.services.model_router import ModelRouter
+
+
+@pytest.fixture
+def router(monkeypatch, request):
+    # Unique model names so health state from other tests does not leak in
+    monkeypatch.setattr(settings, "model_routing_enabled", True)
+    monkeypatch.setattr(settings, "gemini_model_fast", f"fast-{request.node.name}")
+    monkeypatch.setattr(settings, "gemini_model_large", f"large-{request.node.name}")
+    return ModelRouter()
+
+
+def test_routes_by_size_risk_question_and_severity(router):
+    fast, large = settings.gemini_model_fast, settings.gemini_model_large
+
+    assert router.route_analysis(input_chars=2000) == fast
+    assert router.route_analysis(input_chars=settings.routing_long_input_chars) == large
+    assert router.route_analysis(input_chars=2000, max_risk_score=9.0) == large
+    assert router.route_chat("Can I cancel?") == fast
+    assert router.route_chat("Why? " * 100) == large
+    assert router.route_email(severity_score=5) == fast
+    assert router.route_email(severity_score=9) == large
+
+    reasons = [d["reason"] for d in router.recent_decisions()]
+    assert reasons[:3] == ["short_input", "long_input", "high_risk"]
+
+
+def test_fails_over_when_preferred_model_is_slow_or_open(router):
+    fast, large = settings.gemini_model_fast, settings.gemini_model_large
+    tracker = get_latency_tracker(fast)
+    for _ in range(settings.routing_min_samples):
+        tracker.record(settings.routing_failover_p95_ms / 1000 + 1)
+        tracker.record_outcome(True)
+
+    assert router.route_analysis(input_chars=100) == large
+    assert router.recent_decisions()[-1]["reason"] == "failover:slow"
+
+    # Both unhealthy: stay on the preferred model
+    breaker = get_circuit_breaker(large)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert router.route_analysis(input_chars=100) == fast
+    assert router.snapshot()["models"][large]["circuit"] == "open"
+
+
+def test_disabled_routing_uses_configured_models(router, monkeypatch):
+    monkeypatch.setattr(settings, "model_routing_enabled", False)
+
+    assert router.route_analysis(input_chars=10 ** 6) == settings.gemini_model_analysis
+    assert router.route_chat("Can I cancel?") == settings.gemini_model_chat
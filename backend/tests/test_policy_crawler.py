@@ -0,0 +1,133 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.routes import ingestion
+from app.services import url_fetcher
+from app.services.policy_crawler import PolicyCrawler, _site, classify_link
+from app.services.url_fetcher import UrlFetcher
+
+
+BANNER = "<div>We use cookies to improve your experience.</div>"
+FOOTER = (
+    '<footer><a href="/terms">Terms of Service</a> <a href="/privacy">Privacy</a> '
+    '<a href="/privacy?ref=footer">Privacy Policy</a> <a href="/cookies">Cookie settings</a> '
+    '<a href="/about">About us</a> <a href="https://other.example/terms">Partner terms</a> '
+    '<a href="/legal">Legal</a></footer>'
+)
+
+
+def page(body: str) -> bytes:
+    return f"<html><head><title>Example</title></head><body>{BANNER}{body}{FOOTER}</body></html>".encode()
+
+
+def site(server) -> None:
+    privacy = page("<h1>Privacy Policy</h1><p>We share data with advertisers.</p>")
+    server.pages.update({
+        "/": (page("<h1>Welcome</h1><p>The best app.</p>"), {}),
+        "/terms": (page("<h1>Terms</h1><ul><li>Fees are non-refundable.</li><li>Binding arbitration.</li></ul>"), {}),
+        "/privacy": (privacy, {}),
+        "/privacy?ref=footer": (privacy, {}),
+        "/cookies": (page("<h1>Cookies</h1><p>Third-party trackers are used.</p>"), {}),
+        "/legal": (page('<h1>Legal</h1><nav><a href="/refund">Refund policy</a></nav>'), {}),
+        "/refund": (page("<h1>Refunds</h1><p>No refunds after 14 days.</p>"), {}),
+    })
+
+
+def test_classify_link():
+    assert classify_link("Terms of Service", "https://x.com/tos") == "terms"
+    assert classify_link("Privacy & Cookies", "https://x.com/p") == "privacy"
+    assert classify_link("Manage", "https://x.com/cookie-settings") == "cookies"
+    assert classify_link("Acceptable Use", "https://x.com/aup") == "acceptable_use"
+    assert classify_link("Refunds", "https://x.com/help") == "refund"
+    assert classify_link("Blog", "https://x.com/blog") is None
+
+
+def test_site_keeps_registrable_domains_under_country_suffixes_apart():
+    assert _site("www.example.com") == _site("legal.example.com") == "example.com"
+    assert _site("www.example.co.uk") == _site("example.co.uk") == "example.co.uk"
+    assert _site("example.co.uk") != _site("foo.co.uk")
+    assert _site("shop.example.com.au") != _site("other.com.au")
+    assert _site("example.de") != _site("foo.de")
+    assert _site("127.0.0.1") != _site("10.0.0.1")
+
+
+def test_crawl_combines_deduplicated_policy_sections(server):
+    site(server)
+
+    async def run():
+        fetcher = UrlFetcher()
+        try:
+            return await PolicyCrawler(fetcher=fetcher, max_depth=2).crawl(server.url + "/")
+        finally:
+            await fetcher.close()
+
+    result = asyncio.run(run())
+
+    kinds = [document["kind"] for document in result["documents"]]
+    assert kinds == ["terms", "privacy", "cookies", "legal", "refund"]
+    text = result["text"]
+    assert text.startswith(f"## Terms of Service\nSource: {server.url}/terms\n")
+    assert "- Fees are non-refundable.\n- Binding arbitration." in text
+    assert "## Refund Policy" in text and "No refunds after 14 days." in text
+    # Shared blocks and duplicate pages appear once; the homepage and other sites are not included
+    assert text.count("We use cookies") == 1
+    assert text.count("We share data with advertisers.") == 1
+    assert "The best app." not in text
+    assert not any("other.example" in request[1].get("Host", "") for request in server.requests)
+
+
+def test_crawl_limits_depth_documents_and_per_host_concurrency(server):
+    site(server)
+    server.delay = 0.2
+
+    async def run():
+        fetcher = UrlFetcher()
+        try:
+            shallow = await PolicyCrawler(fetcher=fetcher, max_depth=1, per_host_concurrency=2).crawl(server.url + "/")
+            capped = await PolicyCrawler(fetcher=fetcher, max_documents=2).crawl(server.url + "/")
+            return shallow, capped
+        finally:
+            await fetcher.close()
+
+    shallow, capped = asyncio.run(run())
+
+    assert [document["kind"] for document in shallow["documents"]] == ["terms", "privacy", "cookies", "legal"]
+    assert server.max_in_flight == 2
+    assert len(capped["documents"]) == 2
+
+
+def test_ingest_url_crawl_mode(server, monkeypatch):
+    site(server)
+    server.pages["/plain"] = (b"<html><body><p>Just a page.</p></body></html>", {})
+    app = FastAPI()
+    app.include_router(ingestion.router)
+
+    async def run():
+        fetcher = UrlFetcher()
+        monkeypatch.setattr(url_fetcher, "_url_fetcher", fetcher)
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                crawled = await client.post(
+                    "/ingest/url",
+                    params={"url": server.url + "/", "crawl": "true", "include_text": "true"}
+                )
+                plain = await client.post(
+                    "/ingest/url",
+                    params={"url": server.url + "/plain", "crawl": "true", "include_text": "true"}
+                )
+                return crawled, plain
+        finally:
+            await fetcher.close()
+
+    crawled, plain = asyncio.run(run())
+
+    assert crawled.status_code == 200
+    body = crawled.json()
+    assert len(body["documents"]) == 5
+    assert body["text_length"] == len(body["text"])
+    # A page without legal links is returned as the only document
+    assert plain.json()["documents"][0]["kind"] == "page"
+    assert "Just a page." in plain.json()["text"]
@@ -0,0 +1,99 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.rate_limit import (
+    MemoryRateLimitBackend,
+    RateLimiter,
+    RateLimitMiddleware,
+    SQLiteRateLimitBackend,
+)
+
+
+COSTS = {
+    "POST /analyze": 5.0,
+    "/health": 0.0,
+    "/chat/sessions": 2.0,
+    "/chat": 3.0,
+    "POST /negotiations/*/generate-email": 6.0,
+}
+
+
+def test_buckets_refill_and_idle_clients_are_dropped(clock):
+    backend = MemoryRateLimitBackend(max_keys=3, clock=clock)
+    take = lambda key, cost=1.0: backend.take(key, cost, 10.0, 1.0)
+
+    allowed = [take("a") for _ in range(10)]
+    rejected = take("a", 2.0)
+    clock.now += 1.5
+    after_refill = take("a", 1.0)
+    for key in ("b", "c", "d"):
+        take(key)
+    # Over max_keys: the least recently seen client goes first
+    bounded = sorted(backend._buckets)
+    clock.now += 10
+    take("e")
+
+    assert allowed == [0.0] * 10
+    assert rejected == 2.0
+    assert after_refill == 0.0
+    assert bounded == ["b", "c", "d"]
+    # Clients idle long enough to be back at a full bucket are dropped
+    assert list(backend._buckets) == ["e"]
+
+
+def test_route_costs():
+    limiter = RateLimiter(MemoryRateLimitBackend(), capacity=10, window_seconds=10, costs=COSTS)
+
+    assert limiter.cost("POST", "/analyze/") == 5.0
+    assert limiter.cost("POST", "/api/analyze/stream") == 5.0
+    assert limiter.cost("OPTIONS", "/analyze/") == 1.0
+    assert limiter.cost("GET", "/health") == 0.0
+    assert limiter.cost("POST", "/chat/sessions/abc/messages") == 2.0
+    assert limiter.cost("POST", "/chat/") == 3.0
+    assert limiter.cost("POST", "/chatter") == 1.0
+    assert limiter.cost("POST", "/api/negotiations/n-1/generate-email/stream") == 6.0
+    assert limiter.cost("POST", "/negotiations/create") == 1.0
+
+
+def test_sqlite_buckets_are_shared_between_workers(tmp_path, clock):
+    path = str(tmp_path / "limits.sqlite3")
+    workers = [SQLiteRateLimitBackend(path, purge_every=2, clock=clock) for _ in range(2)]
+
+    waits = [workers[i % 2].take("1.2.3.4", 1.0, 4.0, 1.0) for i in range(5)]
+    clock.now += 100
+    workers[0].take("5.6.7.8", 1.0, 4.0, 1.0)
+    rows = workers[1]._connection().execute("SELECT key FROM rate_limit_buckets").fetchall()
+
+    assert waits == [0.0, 0.0, 0.0, 0.0, 1.0]
+    assert rows == [("5.6.7.8",)]
+
+
+def test_middleware_rejects_with_retry_after():
+    limiter = RateLimiter(MemoryRateLimitBackend(), capacity=10, window_seconds=60, costs=COSTS)
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+    @app.post("/analyze/")
+    async def analyze():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            analyses = [(await client.post("/analyze/")).status_code for _ in range(3)]
+            limited = await client.post("/analyze/")
+            health = [(await client.get("/health")).status_code for _ in range(50)]
+            return analyses, limited, health
+
+    analyses, limited, health = asyncio.run(run())
+
+    assert analyses == [200, 200, 429]
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "30"
+    assert set(health) == {200}
@@ -0,0 +1,63 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.routes import chat
+from app.core.container import ServiceContainer
+from app.core.dependencies import get_container, get_google_api_key
+from app.core.metrics import metrics
+from app.services import retrieval
+from app.services.retrieval import BM25Index, get_index, retrieve
+from benchmarks.corpus import generate_document
+
+
+def test_bm25_ranks_the_matching_passage_first(passages):
+    index = BM25Index(passages)
+
+    hits = index.search("Where are disputes resolved? Is there arbitration?", k=2)
+
+    assert hits[0][0] == 1
+    assert index.search("refunds for fees", k=1)[0][0] == 0
+    assert index.search("xyzzy", k=3) == []
+
+
+def test_index_is_built_once_per_document():
+    document = generate_document(seed=7, sections=40)
+    builds = metrics.get("chat.retrieval.index_builds")
+
+    first = get_index(document)
+    second = get_index(document)
+
+    assert first is second
+    assert metrics.get("chat.retrieval.index_builds") == builds + 1
+    citations = retrieve(document, "Can I cancel my subscription?", k=3)
+    assert 1 <= len(citations) <= 3
+    assert any("subscription" in c["text"].lower() for c in citations)
+
+
+def test_chat_sends_only_top_passages_and_returns_citations(recording_chat, passages, monkeypatch):
+    monkeypatch.setattr(retrieval.settings, "chat_retrieval_top_k", 1)
+    monkeypatch.setattr(retrieval.settings, "chat_passage_chars", 100)
+    app = FastAPI()
+    app.include_router(chat.router)
+    app.dependency_overrides[get_google_api_key] = lambda: "test-key"
+    app.dependency_overrides[get_container] = lambda: ServiceContainer(api_key="test-key")
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/chat/", json={
+                "history": [],
+                "current_question": "How are disputes resolved?",
+                "document_context": "\n\n".join(passages),
+            })
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    citations = response.json()["citations"]
+    assert [c["passage"] for c in citations] == [2]
+    _, sent = recording_chat[0]
+    assert "binding arbitration" in sent
+    assert "non-refundable" not in sent
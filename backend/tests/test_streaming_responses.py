@@ -0,0 +1,139 @@
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.routes import chat, negotiations
+from app.api.sse import text_events
+from app.core.config import settings
+from app.core.container import ServiceContainer
+from app.core.dependencies import get_container, get_google_api_key, get_negotiation_service
+from app.services import llm_client
+from app.services.llm_client import LLMClient
+from app.services.negotiation_service import NegotiationService
+
+
+CHUNKS = ["Disputes go ", "to arbitration ", "[Passage 2]."]
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class StreamingModel:
+    """Yields CHUNKS, or an endless slow stream when `endless` is set."""
+    endless = False
+    pulled = 0
+
+    def __init__(self, model_name=None, generation_config=None):
+        self.model_name = model_name
+
+    def _chunks(self):
+        if not self.endless:
+            yield from (Chunk(text) for text in CHUNKS)
+            return
+        while StreamingModel.pulled < 1000:
+            StreamingModel.pulled += 1
+            time.sleep(0.01)
+            yield Chunk("word ")
+
+    def start_chat(self, history=None):
+        model = self
+        return type("Session", (), {"send_message": lambda self, message, stream=False: model._chunks()})()
+
+    def generate_content(self, prompt, stream=False):
+        return self._chunks()
+
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_chat_and_email_streams_end_with_the_full_text(passages, monkeypatch):
+    monkeypatch.setattr(llm_client.genai, "GenerativeModel", StreamingModel)
+    monkeypatch.setattr("app.core.container.genai.configure", lambda **kwargs: None)
+    monkeypatch.setattr("app.services.negotiation_service.genai.configure", lambda **kwargs: None)
+    monkeypatch.setattr(settings, "chat_passage_chars", 100)
+    StreamingModel.endless = False
+    container = ServiceContainer(api_key="test-key")
+    app = FastAPI()
+    app.include_router(chat.router)
+    app.include_router(negotiations.router)
+    app.dependency_overrides[get_google_api_key] = lambda: "test-key"
+    app.dependency_overrides[get_container] = lambda: container
+    app.dependency_overrides[get_negotiation_service] = lambda: NegotiationService(api_key="test-key")
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            chat_response = await client.post("/chat/stream", json={
+                "history": [],
+                "current_question": "How are disputes resolved?",
+                "document_context": "\n\n".join(passages),
+            })
+            email_response = await client.post(
+                "/negotiations/mock-1/generate-email/stream",
+                json={"negotiation_id": "mock-1", "tone": "polite"}
+            )
+            return chat_response, email_response
+
+    chat_response, email_response = asyncio.run(run())
+
+    assert chat_response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(chat_response.text)
+    assert events[0][0] == "start"
+    assert [c["passage"] for c in events[0][1]["citations"]] == [2]
+    assert [data["text"] for name, data in events if name == "token"] == CHUNKS
+    assert events[-1] == ("done", {"text": "".join(CHUNKS)})
+
+    events = parse_events(email_response.text)
+    assert events[-1] == ("done", {"text": "".join(CHUNKS), "negotiation_id": "mock-1"})
+
+
+class DisconnectingRequest:
+    def __init__(self, after):
+        self.checks = 0
+        self.after = after
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.checks > self.after
+
+
+def test_disconnect_stops_the_model_stream(monkeypatch):
+    monkeypatch.setattr(llm_client.genai, "GenerativeModel", StreamingModel)
+    StreamingModel.endless = True
+    StreamingModel.pulled = 0
+    completed = []
+
+    async def on_complete(text):
+        completed.append(text)
+
+    async def run():
+        llm = LLMClient("stream-disconnect-model")
+        events = [
+            event async for event in text_events(
+                DisconnectingRequest(after=3),
+                llm.stream_generate("Draft an email."),
+                name="test.stream",
+                on_complete=on_complete
+            )
+        ]
+        pulled_at_disconnect = StreamingModel.pulled
+        await asyncio.sleep(0.2)
+        return events, pulled_at_disconnect
+
+    events, pulled_at_disconnect = asyncio.run(run())
+
+    assert [e.split("\n")[0] for e in events] == ["event: token"] * 3
+    assert completed == []
+    # The worker thread stopped pulling chunks once the client went away
+    assert StreamingModel.pulled <= pulled_at_disconnect + 1
+    assert StreamingModel.pulled < 100
@@ -0,0 +1,135 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.routes import ingestion
+from app.core.exceptions import IngestionException
+from app.services import url_fetcher
+from app.services.ingestion_service import IngestionService, page_text
+from app.services.url_fetcher import UrlFetcher
+
+
+POLICY = b"<html><body><nav>Menu</nav>\n<h1>Terms</h1>\n<p>All fees are non-refundable.</p></body></html>"
+
+
+def test_unchanged_pages_are_revalidated_and_reuse_extracted_text(server):
+    server.pages["/terms"] = (POLICY, {"ETag": '"v1"'})
+    server.pages["/privacy"] = (b"<p>We sell data.</p>", {"Last-Modified": "Wed, 01 Oct 2025 00:00:00 GMT"})
+    extracted = []
+
+    def extract(page):
+        extracted.append(page.url)
+        return page_text(page)
+
+    async def run():
+        fetcher = UrlFetcher()
+        try:
+            texts = [await fetcher.fetch_extracted(server.url + "/terms", extract) for _ in range(2)]
+            texts += [await fetcher.fetch_extracted(server.url + "/privacy", extract) for _ in range(2)]
+            server.pages["/terms"] = (b"<p>Fees may change.</p>", {"ETag": '"v2"'})
+            texts.append(await fetcher.fetch_extracted(server.url + "/terms", extract))
+            return texts
+        finally:
+            await fetcher.close()
+
+    texts = asyncio.run(run())
+
+    assert texts == [
+        "# Terms\nAll fees are non-refundable.", "# Terms\nAll fees are non-refundable.",
+        "We sell data.", "We sell data.",
+        "Fees may change.",
+    ]
+    assert len(extracted) == 3
+    headers = [request[1] for request in server.requests]
+    assert headers[1]["If-None-Match"] == '"v1"'
+    assert headers[3]["If-Modified-Since"] == "Wed, 01 Oct 2025 00:00:00 GMT"
+    # Every request went over the same pooled keep-alive connection
+    assert len({request[2] for request in server.requests}) == 1
+
+
+def test_oversized_pages_are_rejected_while_downloading(server):
+    large = b"<p>" + b"fee " * 20000 + b"</p>"
+    server.pages["/sized"] = (large, {})
+    server.pages["/chunked"] = (large, {"Transfer-Encoding": "chunked"})
+    server.pages["/ok"] = (POLICY, {"Cache-Control": "no-store", "ETag": '"v1"'})
+
+    async def run():
+        fetcher = UrlFetcher(max_bytes=50_000)
+        try:
+            errors = []
+            for path in ("/sized", "/chunked", "/missing"):
+                with pytest.raises(IngestionException) as exc_info:
+                    await fetcher.fetch_extracted(server.url + path, page_text)
+                errors.append(exc_info.value)
+            text = await fetcher.fetch_extracted(server.url + "/ok", page_text)
+            return errors, text, len(fetcher.cache)
+        finally:
+            await fetcher.close()
+
+    server.pages["/missing"] = None
+    errors, text, cached = asyncio.run(run())
+
+    assert [e.status_code for e in errors[:2]] == [413, 413]
+    assert "Page too large" in errors[0].detail
+    assert errors[2].status_code == 400
+    assert text == "# Terms\nAll fees are non-refundable."
+    assert cached == 0  # no-store responses are not kept
+
+
+def test_ingest_url_route_uses_the_shared_fetcher(server, monkeypatch):
+    server.pages["/terms"] = (POLICY, {"ETag": '"v1"'})
+    app = FastAPI()
+    app.include_router(ingestion.router)
+
+    async def run():
+        fetcher = UrlFetcher(max_bytes=50)
+        monkeypatch.setattr(url_fetcher, "_url_fetcher", fetcher)
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                too_large = await client.post("/ingest/url", params={"url": server.url + "/terms"})
+                fetcher.max_bytes = 10_000
+                ok = await client.post("/ingest/url", params={"url": server.url + "/terms", "include_text": "true"})
+                text = await IngestionService().extract_text_from_url(server.url + "/terms")
+                return too_large, ok, text
+        finally:
+            await fetcher.close()
+
+    too_large, ok, text = asyncio.run(run())
+
+    assert too_large.status_code == 413
+    assert ok.status_code == 200
+    assert ok.json()["text"] == text == "# Terms\nAll fees are non-refundable."
+    assert "If-None-Match" in server.requests[-1][1]
+
+
+def test_stray_304_is_refetched_and_old_clients_are_closed():
+    requests = []
+
+    def respond(request):
+        requests.append(dict(request.headers))
+        # An intermediary answers the first request from its own cache
+        if len(requests) == 1 or request.url.path == "/stale":
+            return httpx.Response(304)
+        return httpx.Response(200, content=POLICY, headers={"ETag": '"v1"'})
+
+    fetcher = UrlFetcher(transport=httpx.MockTransport(respond))
+
+    async def fetch(path):
+        return await fetcher.fetch_extracted("http://acme.test" + path, page_text)
+
+    text = asyncio.run(fetch("/terms"))
+    first_client = fetcher._client
+    # A new event loop gets a new client; the old one's pool is closed
+    again = asyncio.run(fetch("/terms"))
+    second_client = fetcher._client
+    with pytest.raises(IngestionException) as exc_info:
+        asyncio.run(fetch("/stale"))
+    asyncio.run(fetcher.close())
+
+    assert text == again == "# Terms\nAll fees are non-refundable."
+    assert "If-None-Match" not in requests[1]
+    assert "304" in exc_info.value.detail
+    assert first_client.is_closed and second_client is not first_client
@@ -11,6 +11,12 @@ type View = 'dashboard' | 'negotiations' | 'infographic' | 'chat' | 'settings'
 export default function GuardianApp() {
     const [view, setView] = useState<View>('dashboard')
     const [contractText, setContractText] = useState<string>("")
+    const [documentId, setDocumentId] = useState<string | undefined>(undefined)
+
+    const handleContractLoaded = (text: string, id?: string) => {
+        setContractText(text)
+        setDocumentId(id)
+    }
 
     return (
         <div className="relative min-h-screen w-full bg-slate-950">
@@ -24,10 +30,10 @@ export default function GuardianApp() {
 
             {/* Content */}
             <div className="relative z-10 overflow-visible">
-                {view === 'dashboard' && <Dashboard onNavigate={(v) => setView(v)} onContractLoaded={setContractText} />}
+                {view === 'dashboard' && <Dashboard onNavigate={(v) => setView(v)} onContractLoaded={handleContractLoaded} />}
                 {view === 'negotiations' && <Negotiations onBack={() => setView('dashboard')} />}
                 {view === 'infographic' && <Infographic onBack={() => setView('dashboard')} />}
-                {view === 'chat' && <Chat onBack={() => setView('dashboard')} contextText={contractText} />}
+                {view === 'chat' && <Chat onBack={() => setView('dashboard')} contextText={contractText} documentId={documentId} />}
                 {view === 'settings' && <Settings onBack={() => setView('dashboard')} />}
             </div>
         </div>
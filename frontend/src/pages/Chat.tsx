@@ -10,9 +10,10 @@ import { BackButton } from "../components/common/BackButton";
 interface ChatProps {
     onBack: () => void;
     contextText?: string; // The full contract text
+    documentId?: string; // Server-side document from /ingest, sent instead of the text
 }
 
-export default function Chat({ onBack, contextText }: ChatProps) {
+export default function Chat({ onBack, contextText, documentId }: ChatProps) {
     const [messages, setMessages] = useState<ChatMessage[]>([
         { role: "model", parts: ["Hello! I am the Paranoid Lawyer. Ask me anything about this contract."] }
     ]);
@@ -27,7 +28,7 @@ export default function Chat({ onBack, contextText }: ChatProps) {
     }, [messages]);
 
     const handleSend = async () => {
-        if (!input.trim() || !contextText) return;
+        if (!input.trim() || (!contextText && !documentId)) return;
 
         const userMsg: ChatMessage = { role: "user", parts: [input] };
         setMessages(prev => [...prev, userMsg]);
@@ -37,7 +38,7 @@ export default function Chat({ onBack, contextText }: ChatProps) {
         try {
             // Filter history to exclude initial welcome or format strictly
             const historyToSend = messages.filter(m => m.role === "user" || m.role === "model");
-            const res = await chatWithContract(historyToSend, input, contextText);
+            const res = await chatWithContract(historyToSend, input, contextText || "", documentId);
 
             const botMsg: ChatMessage = { role: "model", parts: [res.answer] };
             setMessages(prev => [...prev, botMsg]);
@@ -49,7 +50,7 @@ export default function Chat({ onBack, contextText }: ChatProps) {
         }
     };
 
-    if (!contextText) {
+    if (!contextText && !documentId) {
         return (
             <div className="min-h-screen bg-background flex flex-col items-center justify-center text-white p-4 md:p-8 text-center">
                 <h2 className="text-xl mb-4">No Contract Loaded</h2>
@@ -3,7 +3,7 @@ import { Upload, FileText, Shield, Gavel, MessageSquare, Settings, Activity, Che
 import { Card, CardContent, CardHeader, CardTitle } from "../components/ui/card";
 import { Button } from "../components/ui/button";
 import { cn } from "../lib/utils";
-import { ingestFile, analyzeText, createNegotiation } from "../services/api";
+import { ingestFile, analyzeText, analyzeDocument, createNegotiation } from "../services/api";
 import type { AnalysisResponse, Clause } from "../services/api";
 import { toast } from "sonner";
 import { useAnalysisStore } from "../stores/analysisStore";
@@ -13,7 +13,7 @@ import { BackButton } from "../components/common/BackButton";
 
 interface DashboardProps {
     onNavigate: (view: 'dashboard' | 'negotiations' | 'chat' | 'settings' | 'infographic') => void;
-    onContractLoaded?: (text: string) => void;
+    onContractLoaded?: (text: string, documentId?: string) => void;
 }
 
 // Glassmorphism design system constants
@@ -125,8 +125,10 @@ export default function Dashboard({ onNavigate, onContractLoaded }: DashboardPro
                 return;
             }
 
-            const extractedText = ingestRes.text || ingestRes.preview || "";
-            if (!extractedText) {
+            // The full text stays on the server; the document ID refers to it
+            const documentId: string = ingestRes.document_id;
+            const preview: string = ingestRes.preview || "";
+            if (!ingestRes.text_length) {
                 toast.warning("No text found in this document. Is it a scanned image?");
                 return;
             }
@@ -136,10 +138,10 @@ export default function Dashboard({ onNavigate, onContractLoaded }: DashboardPro
             const documentTitle = uploadedFile.name || "Unknown Contract";
             const companyName = "Service Provider"; // Could be extracted from document or user input
             
-            const analysisRes = await analyzeText(extractedText, currentJurisdiction);
+            const analysisRes = await analyzeDocument(documentId, currentJurisdiction);
             
             setAnalysis(analysisRes);
-            setDocumentMetadata(documentTitle, companyName, extractedText);
+            setDocumentMetadata(documentTitle, companyName, preview);
             
             // Save to session history (client-side only, wipes on tab close)
             if (analysisRes.analysis_result) {
@@ -165,7 +167,7 @@ export default function Dashboard({ onNavigate, onContractLoaded }: DashboardPro
             }
 
             if (onContractLoaded) {
-                onContractLoaded(extractedText);
+                onContractLoaded(preview, documentId);
             }
         } catch (error: any) {
             console.error("Processing failed:", error);
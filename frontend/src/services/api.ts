@@ -37,7 +37,7 @@ export const ingestFile = async (file: File) => {
             "Content-Type": "multipart/form-data",
         },
     });
-    return response.data; // Returns {status, text_length, preview}
+    return response.data; // Returns {status, document_id, text_length, preview}
 };
 
 // Jurisdiction enum values matching backend
@@ -68,6 +68,19 @@ export const analyzeText = async (
     return response.data;
 };
 
+// Analyze a document already stored by /ingest, without sending its text again
+export const analyzeDocument = async (
+    documentId: string,
+    jurisdiction: string = "US-CA"
+): Promise<AnalysisResponse> => {
+    const jurisdictionEnum = mapJurisdictionToEnum(jurisdiction);
+    const response = await api.post("/analyze", {
+        document_id: documentId,
+        jurisdiction: jurisdictionEnum
+    });
+    return response.data;
+};
+
 // Negotiations
 export interface Negotiation {
     id: string;
@@ -113,11 +126,17 @@ export interface ChatMessage {
     parts: string[];
 }
 
-export const chatWithContract = async (history: ChatMessage[], question: string, context: string) => {
+export const chatWithContract = async (
+    history: ChatMessage[],
+    question: string,
+    context: string,
+    documentId?: string
+) => {
     const response = await api.post("/chat/", {
         history,
         current_question: question,
-        document_context: context
+        // Ingested documents are referenced by ID instead of resending the text
+        ...(documentId ? { document_id: documentId } : { document_context: context })
     });
     return response.data;
 };